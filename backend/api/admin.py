@@ -1,7 +1,8 @@
 from django.contrib import admin
 from .models import (
     Category, Project, Component, Step, Comment, Message,
-    ProjectMember, WorkAttribution, BillOfMaterialItem, Attachment, UserProfile
+    ProjectMember, WorkAttribution, BillOfMaterialItem, Attachment, UserProfile,
+    CatalogComponent
 )
 
 @admin.register(UserProfile)
@@ -62,7 +63,7 @@ class ProjectAdmin(admin.ModelAdmin):
     list_display = ['title', 'author', 'category', 'difficulty', 'status', 'created_at', 'updated_at']
     list_filter = ['category', 'difficulty', 'status', 'created_at']
     search_fields = ['title', 'description', 'elevator_pitch', 'author__username']
-    readonly_fields = ['created_at', 'updated_at']
+    readonly_fields = ['created_at', 'updated_at', 'comment_count', 'bookmark_count', 'trending_score']
     fieldsets = [
         ('Basic Information', {
             'fields': ['title', 'description', 'elevator_pitch', 'cover_image']
@@ -74,6 +75,10 @@ class ProjectAdmin(admin.ModelAdmin):
             'fields': ['story_content'],
             'classes': ['collapse']
         }),
+        ('Engagement', {
+            'fields': ['comment_count', 'bookmark_count', 'trending_score'],
+            'classes': ['collapse']
+        }),
         ('Timestamps', {
             'fields': ['created_at', 'updated_at'],
             'classes': ['collapse']
@@ -114,6 +119,14 @@ class BillOfMaterialItemAdmin(admin.ModelAdmin):
     readonly_fields = ['created_at']
 
 
+@admin.register(CatalogComponent)
+class CatalogComponentAdmin(admin.ModelAdmin):
+    list_display = ['name', 'item_type', 'usage_count', 'link', 'updated_at']
+    list_filter = ['item_type']
+    search_fields = ['name', 'normalized_name', 'description']
+    readonly_fields = ['normalized_name', 'usage_count', 'created_at', 'updated_at']
+
+
 @admin.register(Attachment)
 class AttachmentAdmin(admin.ModelAdmin):
     list_display = ['project', 'title', 'attachment_type', 'created_at']
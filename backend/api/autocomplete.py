@@ -0,0 +1,149 @@
+"""
+Typeahead suggestions for users and catalog components.
+
+On PostgreSQL, candidates come from pg_trgm GIN indexes on ``UPPER(column)``
+(see migrations 0014 and 0015), so substring (``LIKE``) and fuzzy (``%``) matches are
+both index scans. Results rank prefix matches first, then by trigram
+similarity. Each lookup runs under ``SET LOCAL statement_timeout`` so a slow
+keystroke returns an empty, ``partial`` answer instead of piling up.
+
+Very short prefixes match too many rows for trigrams to help. They are served
+from a small in-process LRU cache, because the same few letters are typed
+over and over.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.postgres.search import TrigramSimilarity
+from django.db import OperationalError, connection, transaction
+from django.db.models import Case, FloatField, IntegerField, Q, Value, When
+from django.db.models.functions import Greatest, Upper
+
+from .models import CatalogComponent
+
+
+class PrefixCache:
+    """Thread-safe LRU cache with a TTL, for results of short prefixes"""
+
+    def __init__(self, max_entries=1024, ttl=60):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+prefix_cache = PrefixCache(
+    max_entries=settings.AUTOCOMPLETE_CACHE_ENTRIES,
+    ttl=settings.AUTOCOMPLETE_CACHE_TTL,
+)
+
+
+def _ranked(queryset, fields, query, tiebreak=None):
+    """Filter ``queryset`` to rows matching ``query`` on any of ``fields`` and
+    order them prefix matches first, then by similarity, then by ``tiebreak``"""
+    is_postgres = connection.vendor == 'postgresql'
+    term = query.upper()
+
+    prefix = Q()
+    candidates = Q()
+    for field in fields:
+        prefix |= Q(**{f'{field}__istartswith': query})
+        candidates |= Q(**{f'{field}__icontains': query})
+
+    if is_postgres:
+        # Compare on UPPER(column) so the expression matches the trigram indexes
+        upper_fields = {f'{field}_upper': Upper(field) for field in fields}
+        queryset = queryset.annotate(**upper_fields)
+        for alias in upper_fields:
+            candidates |= Q(**{f'{alias}__trigram_similar': term})
+        scores = [TrigramSimilarity(alias, term) for alias in upper_fields]
+        similarity = scores[0] if len(scores) == 1 else Greatest(*scores)
+    else:
+        similarity = Value(0.0, output_field=FloatField())
+
+    return queryset.filter(candidates).annotate(
+        is_prefix=Case(When(prefix, then=1), default=0, output_field=IntegerField()),
+        similarity=similarity,
+    ).order_by('-is_prefix', '-similarity', *(tiebreak or [fields[0]]))
+
+
+def _within_budget(lookup):
+    """Run ``lookup`` under the autocomplete latency budget.
+
+    Returns ``(results, partial)``; ``partial`` is True when PostgreSQL
+    cancelled the query for exceeding AUTOCOMPLETE_BUDGET_MS.
+    """
+    if connection.vendor != 'postgresql':
+        return lookup(), False
+    try:
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(f'SET LOCAL statement_timeout = {int(settings.AUTOCOMPLETE_BUDGET_MS)}')
+            return lookup(), False
+    except OperationalError:
+        return [], True
+
+
+def _cached(key, query, lookup):
+    """Serve short prefixes from the in-process cache"""
+    if len(query) > settings.AUTOCOMPLETE_CACHE_MAX_PREFIX:
+        return _within_budget(lookup)
+    cached = prefix_cache.get(key)
+    if cached is not None:
+        return cached, False
+    results, partial = _within_budget(lookup)
+    if not partial:
+        prefix_cache.set(key, results)
+    return results, partial
+
+
+def suggest_users(query, limit=10):
+    """Users whose username, name or email matches ``query``, as a list of ids"""
+    fields = ['username', 'first_name', 'last_name', 'email']
+
+    def lookup():
+        users = _ranked(User.objects.all(), fields, query)
+        return list(users.values_list('id', flat=True)[:limit])
+
+    return _cached(('users', query.lower(), limit), query, lookup)
+
+
+def suggest_components(query, item_type='', limit=20):
+    """Catalog components whose name matches ``query``, as dicts; ties are
+    broken by how many BOMs use the component"""
+
+    def lookup():
+        components = CatalogComponent.objects.filter(usage_count__gt=0)
+        if item_type:
+            components = components.filter(item_type=item_type)
+        components = _ranked(components, ['name'], query, tiebreak=('-usage_count', 'name'))
+        return list(components.values('id', 'name', 'item_type', 'description', 'link', 'usage_count')[:limit])
+
+    return _cached(('components', item_type, query.lower(), limit), query, lookup)
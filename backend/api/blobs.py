@@ -0,0 +1,137 @@
+"""
+Reference counts for content-addressed files.
+
+Slideshow files and rendered slides are stored by api.storage under the
+SHA-256 of their content, so the same PDF or slide image uploaded or rendered
+twice is one file on disk. Each stored file has a Blob row counting the model
+fields that point at it: ``pre_save``/``post_save``/``post_delete`` signals
+on the models in BLOB_FIELDS retain new names and release replaced or deleted
+ones, and code that bulk-creates rows calls ``retain_blobs`` itself.
+
+Nothing is deleted when a count drops to zero. ``manage.py gc_blobs``
+removes blobs that have been unreferenced for longer than BLOB_GC_GRACE, so
+a page still showing a replaced slide keeps working for a while, and a file
+that is being stored again is never deleted underneath it.
+"""
+
+from collections import Counter
+
+from django.db import IntegrityError
+from django.db.models import Case, F, IntegerField, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+# File fields stored with api.storage.content_storage, by model name
+BLOB_FIELDS = {
+    'ProjectSlideshow': ('original_file', 'thumbnail_strip'),
+    'SlideshowSlide': ('image', 'preview', 'thumbnail'),
+}
+
+
+def blob_names(instance):
+    """Names of the content-addressed files a model instance points at, by field"""
+    return {field: getattr(instance, field).name for field in BLOB_FIELDS[type(instance).__name__]}
+
+
+def register_blob(name, sha256, size):
+    """Record a stored file; a file stored again counts as recently used"""
+    from .models import Blob
+
+    if Blob.objects.filter(name=name).update(updated_at=timezone.now()):
+        return
+    try:
+        Blob.objects.create(name=name, sha256=sha256, size=size)
+    except IntegrityError:
+        # Stored by another request at the same time
+        pass
+
+
+def retain_blobs(names):
+    """Add a reference to each stored file in ``names`` (repeats count)"""
+    from .models import Blob
+
+    counts = Counter(name for name in names if name)
+    if not counts:
+        return
+    # Files stored before content addressing get a row the first time they are shared
+    known = set(Blob.objects.filter(name__in=counts).values_list('name', flat=True))
+    Blob.objects.bulk_create(
+        [Blob(name=name) for name in counts if name not in known], ignore_conflicts=True,
+    )
+    Blob.objects.filter(name__in=counts).update(
+        ref_count=F('ref_count') + Case(
+            *[When(name=name, then=Value(count)) for name, count in counts.items()],
+            default=Value(0), output_field=IntegerField(),
+        ),
+        updated_at=timezone.now(),
+    )
+
+
+def release_blobs(names):
+    """Drop a reference to each file in ``names``.
+
+    Files stored before content addressing have no Blob row and only ever
+    had one owner, so they are deleted straight away.
+    """
+    from .models import Blob
+    from .storage import content_storage
+
+    counts = Counter(name for name in names if name)
+    if not counts:
+        return
+    known = set(Blob.objects.filter(name__in=counts).values_list('name', flat=True))
+    for name, count in counts.items():
+        if name in known:
+            Blob.objects.filter(name=name).update(
+                ref_count=Greatest(F('ref_count') - count, Value(0)), updated_at=timezone.now(),
+            )
+        else:
+            content_storage.delete(name)
+
+
+def remember_blobs(instance, update_fields=None):
+    """pre_save: note the names an existing row points at before it is overwritten"""
+    fields = BLOB_FIELDS[type(instance).__name__]
+    if instance._state.adding:
+        instance._saved_blob_names = dict.fromkeys(fields, '')
+    elif update_fields is not None and not set(update_fields) & set(fields):
+        instance._saved_blob_names = None
+    else:
+        row = type(instance).objects.filter(pk=instance.pk).values(*fields).first() or {}
+        instance._saved_blob_names = {field: row.get(field) or '' for field in fields}
+
+
+def blobs_saved(instance):
+    """post_save: retain names that are new to the row and release the ones they replaced"""
+    saved = getattr(instance, '_saved_blob_names', None)
+    if saved is None:
+        return
+    current = blob_names(instance)
+    changed = [field for field in current if current[field] != saved[field]]
+    retain_blobs(current[field] for field in changed)
+    release_blobs(saved[field] for field in changed)
+    instance._saved_blob_names = current
+
+
+def blobs_deleted(instance):
+    release_blobs(blob_names(instance).values())
+
+
+def rebuild_blob_counts():
+    """Recount every blob's references from the model tables; returns how many changed"""
+    from django.apps import apps
+    from .models import Blob
+
+    counts = Counter()
+    for model_name, fields in BLOB_FIELDS.items():
+        model = apps.get_model('api', model_name)
+        for names in model.objects.values_list(*fields).iterator():
+            counts.update(name for name in names if name)
+
+    changed = []
+    for blob in Blob.objects.only('pk', 'name', 'ref_count').iterator():
+        if blob.ref_count != counts[blob.name]:
+            blob.ref_count = counts[blob.name]
+            changed.append(blob)
+    Blob.objects.bulk_update(changed, ['ref_count'], batch_size=1000)
+    return len(changed)
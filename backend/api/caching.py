@@ -0,0 +1,85 @@
+"""
+Response cache for anonymous GET requests.
+
+A cached response's key embeds the current version of every model it was
+built from. The receivers in models.py bump a model's version whenever one of
+its rows is saved or deleted, which makes every response built from the old
+data unreachable; stale entries then simply expire. A cache hit reads the
+versions and the response from the cache and never touches the database.
+
+Invalidation is only as shared as the configured CACHES backend: with the
+local-memory cache each process sees its own bumps, which is why Redis is the
+default outside DEBUG and check_shared_cache warns about locmem there.
+"""
+
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+from rest_framework.response import Response
+
+
+def _version_key(model):
+    return f'model-version:{model._meta.label_lower}'
+
+
+def model_versions(models):
+    """Current version of each model, in order"""
+    keys = [_version_key(model) for model in models]
+    found = cache.get_many(keys)
+    # Start missing (or evicted) versions from the clock so they can never
+    # collide with a number that older responses were cached under
+    missing = {key: time.time_ns() for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, timeout=None)
+    return [found.get(key, missing.get(key)) for key in keys]
+
+
+def bump_model_version(model):
+    key = _version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def cache_anonymous_get(*models, timeout=None):
+    """Serve anonymous GETs of a view from the cache until any of ``models`` changes.
+
+    Works on function views under @api_view and, through method_decorator, on
+    the handler methods of class-based views. Only 200 responses are stored.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET' or request.user.is_authenticated:
+                return view_func(request, *args, **kwargs)
+
+            versions = ':'.join(str(version) for version in model_versions(models))
+            url = f'{request.get_host()}{request.get_full_path()}'
+            key = 'anonymous-get:' + hashlib.md5(f'{url}|{versions}'.encode('utf-8')).hexdigest()
+            cached = cache.get(key)
+            if cached is not None:
+                return Response(cached)
+
+            response = view_func(request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, response.data, settings.ANONYMOUS_CACHE_TIMEOUT if timeout is None else timeout)
+            return response
+        return wrapper
+    return decorator
+
+
+@checks.register(checks.Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    if settings.DEBUG or settings.TESTING or not settings.CACHE_BACKEND.endswith('LocMemCache'):
+        return []
+    return [checks.Warning(
+        'CACHE_BACKEND is locmem outside DEBUG.',
+        hint='Each worker process would keep serving anonymous responses that another process '
+             'invalidated; set CACHE_BACKEND=redis (or file on a single host).',
+        id='api.W001',
+    )]
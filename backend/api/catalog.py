@@ -0,0 +1,136 @@
+"""
+Deduplicated component catalog for bills of materials.
+
+Every BillOfMaterialItem points at a CatalogComponent keyed on its normalized
+name and item type. ``attach_components`` runs before BOM rows are written
+(in one batch from the project serializer, or per row from the ``pre_save``
+signal) and ``release_components`` after they are deleted. Each catalog entry
+therefore keeps an up-to-date ``usage_count``, and component search and
+"most used" listings read the small catalog table instead of grouping the
+whole BOM history.
+"""
+
+from collections import Counter, defaultdict
+
+from django.db.models import Case, F, IntegerField, Value, When
+from django.db.models.functions import Greatest
+
+
+def normalize_component_name(name):
+    """Fold case and whitespace so "Arduino  Uno" and "arduino uno" match"""
+    return ' '.join(name.split()).casefold()
+
+
+def component_key(item):
+    return normalize_component_name(item.name), item.item_type
+
+
+def attach_components(items):
+    """Point unsaved BOM items at their catalog entries.
+
+    Missing entries are created, then every usage count is incremented in a
+    single UPDATE. Empty canonical links and descriptions are filled in from
+    the new items.
+    """
+    from .models import CatalogComponent
+
+    items = [item for item in items if item.name]
+    if not items:
+        return
+
+    by_key = defaultdict(list)
+    for item in items:
+        by_key[component_key(item)].append(item)
+
+    names = {name for name, _ in by_key}
+    entries = {
+        (entry.normalized_name, entry.item_type): entry
+        for entry in CatalogComponent.objects.filter(normalized_name__in=names)
+    }
+
+    missing = [key for key in by_key if key not in entries]
+    if missing:
+        CatalogComponent.objects.bulk_create(
+            [
+                CatalogComponent(
+                    normalized_name=key[0],
+                    item_type=key[1],
+                    name=by_key[key][0].name.strip(),
+                    link=_first(by_key[key], 'link'),
+                    description=_first(by_key[key], 'description'),
+                )
+                for key in missing
+            ],
+            ignore_conflicts=True,  # another request may have created it meanwhile
+        )
+        for entry in CatalogComponent.objects.filter(normalized_name__in={key[0] for key in missing}):
+            entries.setdefault((entry.normalized_name, entry.item_type), entry)
+
+    increments = []
+    for key, group in by_key.items():
+        entry = entries[key]
+        increments.append(When(pk=entry.pk, then=Value(len(group))))
+        for item in group:
+            item.catalog_component = entry
+
+        # Rare: an existing entry without a canonical link/description
+        changes = {}
+        if not entry.link and _first(group, 'link'):
+            changes['link'] = entry.link = _first(group, 'link')
+        if not entry.description and _first(group, 'description'):
+            changes['description'] = entry.description = _first(group, 'description')
+        if changes:
+            CatalogComponent.objects.filter(pk=entry.pk).update(**changes)
+
+    CatalogComponent.objects.filter(pk__in=[entries[key].pk for key in by_key]).update(
+        usage_count=F('usage_count') + Case(*increments, default=Value(0), output_field=IntegerField())
+    )
+
+
+def _first(items, field):
+    """First non-empty value of ``field`` among ``items``"""
+    return next((getattr(item, field) for item in items if getattr(item, field)), '')
+
+
+def release_components(items):
+    """Decrement usage counts for BOM items that were deleted or renamed away,
+    never below zero (counts that drifted are fixed by rebuild_catalog)"""
+    from .models import CatalogComponent
+
+    counts = Counter(item.catalog_component_id for item in items if item.catalog_component_id)
+    for component_id, count in counts.items():
+        CatalogComponent.objects.filter(pk=component_id).update(
+            usage_count=Greatest(F('usage_count') - count, Value(0))
+        )
+
+
+def rebuild_catalog(catalog_model, bom_model):
+    """Recompute the whole catalog from the BOM table.
+
+    Takes the model classes so data migrations can pass historical models.
+    Entries no longer used by any item are removed. Returns the number of
+    catalog entries kept.
+    """
+    groups = defaultdict(list)
+    for item in bom_model.objects.order_by('id').iterator():
+        if item.name:
+            groups[component_key(item)].append(item)
+
+    entries = {
+        (entry.normalized_name, entry.item_type): entry
+        for entry in catalog_model.objects.all()
+    }
+    kept = []
+    for key, group in groups.items():
+        entry = entries.get(key) or catalog_model(
+            normalized_name=key[0], item_type=key[1], name=group[0].name.strip()
+        )
+        entry.usage_count = len(group)
+        entry.link = entry.link or _first(group, 'link')
+        entry.description = entry.description or _first(group, 'description')
+        entry.save()
+        bom_model.objects.filter(id__in=[item.id for item in group]).update(catalog_component=entry)
+        kept.append(entry.pk)
+
+    catalog_model.objects.exclude(pk__in=kept).delete()
+    return len(kept)
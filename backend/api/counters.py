@@ -0,0 +1,57 @@
+"""
+Denormalized engagement counters.
+
+``Project.comment_count`` and ``bookmark_count`` and ``Comment.reply_count``
+are stored columns. The receivers in models.py adjust them with F() updates
+whenever a comment or bookmark is created or deleted, in the same
+transaction as the row itself. The feed sorts and serializers read these
+columns instead of counting joined rows. ``manage.py rebuild_counters``
+recomputes them all from scratch.
+"""
+
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+
+def _bump(model, pk, fields, delta):
+    """Add ``delta`` to ``fields`` of one row in a single UPDATE, never below zero"""
+    if pk is None or not fields:
+        return
+    model._default_manager.filter(pk=pk).update(**{
+        field: Greatest(F(field) + delta, Value(0)) for field in fields
+    })
+
+
+def comment_changed(comment, delta):
+    from .models import Comment, Project
+
+    _bump(Project, comment.project_id, ['comment_count'], delta)
+    if comment.parent_id:
+        _bump(Comment, comment.parent_id, ['reply_count'], delta)
+
+
+def bookmark_changed(bookmark, delta):
+    from .models import Project
+
+    _bump(Project, bookmark.project_id, ['bookmark_count'], delta)
+
+
+def _count(model, field):
+    """Correlated subquery counting ``model`` rows whose ``field`` is the outer row"""
+    rows = (
+        model._default_manager.filter(**{field: OuterRef('pk')})
+        .order_by().values(field).annotate(total=Count('pk')).values('total')
+    )
+    return Coalesce(Subquery(rows), 0)
+
+
+def rebuild_counters(project_model, comment_model, bookmark_model):
+    """Recompute every counter from the comment and bookmark tables.
+
+    Takes the model classes so data migrations can pass historical models.
+    """
+    project_model._default_manager.update(
+        comment_count=_count(comment_model, 'project'),
+        bookmark_count=_count(bookmark_model, 'project'),
+    )
+    comment_model._default_manager.update(reply_count=_count(comment_model, 'parent'))
@@ -0,0 +1,95 @@
+"""
+Precomposed project detail documents.
+
+A published project's detail payload (ProjectDetailSerializer output) is
+stored as JSON text in ProjectDocument, with the project state it was built
+from: updated_at, children_updated_at and the engagement counters.
+ProjectDetailView returns the stored text as-is while that state still
+matches the project, so a detail page costs one primary-key lookup and no
+serialization. A missing or stale document is served live, and a rebuild is
+scheduled.
+
+Rebuilds are also scheduled whenever a project or one of its children is
+saved. They are queued as ``rebuild_project_document`` jobs for the job
+worker (api.jobs), or run inline once the transaction commits when
+PROJECT_DOCUMENTS_ASYNC is off. Users, profiles and categories have no
+project of their own, so their receivers move ``children_updated_at`` on the
+projects that show them, which outdates those documents and their detail
+ETags alike. ``manage.py rebuild_project_documents`` builds every document
+from scratch.
+"""
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .jobs import enqueue, job_handler
+from .models import Project, ProjectDocument
+from .renderers import FastJSONRenderer
+
+
+def document_state(project):
+    """Everything a project's detail payload depends on"""
+    children_updated_at = project.children_updated_at.isoformat() if project.children_updated_at else ''
+    return (
+        f'{project.updated_at.isoformat()}|{children_updated_at}|'
+        f'{project.comment_count}|{project.bookmark_count}'
+    )
+
+
+def fresh_document(project):
+    """Stored JSON text of the project's detail payload, or None if missing or stale"""
+    if project.status != 'published':
+        return None
+    return ProjectDocument.objects.filter(
+        pk=project.pk, state=document_state(project)
+    ).values_list('document', flat=True).first()
+
+
+def build_document(project_id):
+    """Serialize a published project and store it; drops the document of any other"""
+    from .serializers import ProjectDetailSerializer
+
+    project = Project.objects.filter(pk=project_id, status='published').first()
+    if project is None:
+        ProjectDocument.objects.filter(pk=project_id).delete()
+        return None
+    document = FastJSONRenderer().render(ProjectDetailSerializer(project).data).decode('utf-8')
+    try:
+        ProjectDocument.objects.update_or_create(
+            project_id=project_id, defaults={'document': document, 'state': document_state(project)}
+        )
+    except IntegrityError:
+        # Another process stored the document first, or the project was just deleted
+        pass
+    return document
+
+
+def schedule_rebuild(project_id):
+    """Rebuild a project's document once the current transaction commits"""
+    if settings.PROJECT_DOCUMENTS_ASYNC:
+        # One queued rebuild per project covers any number of changes
+        enqueue('rebuild_project_document', {'project_id': project_id}, unique=True)
+    else:
+        transaction.on_commit(lambda: build_document(project_id))
+
+
+@job_handler('rebuild_project_document')
+def rebuild_project_document_job(job):
+    build_document(job.payload['project_id'])
+
+
+def touch_projects_showing_user(user_id):
+    """Outdate the projects showing a user as author, team member or commenter"""
+    _touch_projects(Q(author_id=user_id) | Q(team_members__user_id=user_id) | Q(comments__author_id=user_id))
+
+
+def touch_projects_in_category(category_id):
+    _touch_projects(Q(category_id=category_id))
+
+
+def _touch_projects(condition):
+    # update() leaves updated_at, which the payload shows, alone
+    shown = Project.objects.filter(condition).values('pk')
+    Project.objects.filter(pk__in=shown).update(children_updated_at=timezone.now())
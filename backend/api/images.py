@@ -0,0 +1,206 @@
+"""
+Upload-time processing of cover, BOM, step and avatar images.
+
+Saving a row with a new image queues a ``process_image`` job (api.jobs), so
+the request only stores the upload and the run_jobs workers do the rest.
+The job rewrites the original without its EXIF metadata (camera details,
+GPS position) and with its orientation applied, then writes the sized
+variants in IMAGE_VARIANTS as WebP files next to it. Their names are kept
+in the row's ``<field>_variants`` JSON field together with the ``source``
+they were made from, and serializers return them through ``variant_urls``.
+Until the job has run that is None and clients fall back to the original.
+"""
+
+import io
+import logging
+import posixpath
+
+from django.apps import apps
+from django.core.files.base import ContentFile
+from django.db import transaction
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .jobs import PermanentJobError, enqueue, job_handler
+from .pdf_render import DERIVATIVE_EXTENSION, DERIVATIVE_FORMAT, DERIVATIVE_QUALITY
+
+logger = logging.getLogger(__name__)
+
+# Variants per image field: name -> (width, height, crop). Without crop the
+# image is scaled to fit the box; with it, it is cropped to the box's shape.
+# Nothing is ever scaled up.
+IMAGE_VARIANTS = {
+    ('Project', 'cover_image'): {'card': (640, 480, False), 'detail': (1600, 1200, False)},
+    ('BillOfMaterialItem', 'image'): {'card': (480, 360, False), 'detail': (1200, 1200, False)},
+    ('Step', 'image'): {'card': (640, 480, False), 'detail': (1600, 1200, False)},
+    ('UserProfile', 'avatar'): {'small': (96, 96, True), 'medium': (256, 256, True)},
+}
+
+# Formats an original is re-encoded in when it carries EXIF metadata
+# (MPO is how Pillow opens many phone JPEGs)
+REWRITE_FORMATS = {'JPEG': 'JPEG', 'MPO': 'JPEG', 'PNG': 'PNG', 'WEBP': 'WEBP'}
+ORIGINAL_JPEG_QUALITY = 90
+
+
+def variants_field(field):
+    return f'{field}_variants'
+
+
+def image_fields(model):
+    return [field for model_name, field in IMAGE_VARIANTS if model_name == model.__name__]
+
+
+def variant_urls(instance, field):
+    """URLs of the current variants of ``instance.<field>``, or None if there are none yet"""
+    file = getattr(instance, field)
+    spec = IMAGE_VARIANTS[type(instance).__name__, field]
+    return stored_variant_urls(file.storage, spec, file.name, getattr(instance, variants_field(field)))
+
+
+def stored_variant_urls(storage, spec, name, variants):
+    """``variant_urls`` from stored values, for callers working on ``.values()`` rows"""
+    variants = variants or {}
+    if not name or variants.get('source') != name:
+        return None
+    return {variant: storage.url(variants[variant]) if variants.get(variant) else None for variant in spec}
+
+
+def queue_processing(instances):
+    """Queue a ``process_image`` job for every image field whose variants are
+    out of date (a new image, or a removed one whose variants remain)"""
+    for instance in instances:
+        if instance.pk is None:
+            continue
+        for field in image_fields(type(instance)):
+            name = getattr(instance, field).name or ''
+            variants = getattr(instance, variants_field(field)) or {}
+            if name != variants.get('source', ''):
+                enqueue('process_image', {
+                    'model': type(instance).__name__, 'pk': instance.pk, 'field': field,
+                }, unique=True)
+
+
+def delete_variants(storage, variants):
+    for variant, name in variants.items():
+        if variant != 'source' and name:
+            storage.delete(name)
+
+
+def _open(file):
+    try:
+        with file.open('rb'):
+            image = Image.open(file)
+            image.load()
+    except FileNotFoundError as exc:
+        raise PermanentJobError(f'{file.name} does not exist') from exc
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as exc:
+        raise PermanentJobError(f'{file.name} is not a readable image: {exc}') from exc
+    return image
+
+
+def _encode(image, image_format, **params):
+    if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    buffer = io.BytesIO()
+    image.save(buffer, image_format, **params)
+    return buffer.getvalue()
+
+
+def _clean_original(image):
+    """Encoded original without EXIF, or None if it has none (or can't be rewritten)"""
+    image_format = REWRITE_FORMATS.get(image.format)
+    if image_format is None or not image.getexif() or getattr(image, 'n_frames', 1) > 1:
+        return None
+    params = {'icc_profile': image.info['icc_profile']} if image.info.get('icc_profile') else {}
+    if image_format == 'JPEG':
+        params['quality'] = ORIGINAL_JPEG_QUALITY
+    elif image_format == 'WEBP':
+        params['quality'] = DERIVATIVE_QUALITY
+    # exif_transpose applies the orientation tag, and re-encoding drops the rest
+    return _encode(ImageOps.exif_transpose(image), image_format, **params)
+
+
+def make_variant(image, width, height, crop):
+    if image.mode not in ('RGB', 'RGBA'):
+        transparent = 'A' in image.getbands() or 'transparency' in image.info
+        image = image.convert('RGBA' if transparent else 'RGB')
+    if crop:
+        scale = min(1, image.width / width, image.height / height)
+        return ImageOps.fit(image, (max(1, round(width * scale)), max(1, round(height * scale))), Image.LANCZOS)
+    image = image.copy()
+    image.thumbnail((width, height), Image.LANCZOS)
+    return image
+
+
+def build_variants(file, spec):
+    """Store a clean original and the variants of ``file``.
+
+    Returns the name of the rewritten original (the current name if it
+    needed no rewrite) and the variant names by variant.
+    """
+    image = _open(file)
+    storage = file.storage
+    directory, filename = posixpath.split(file.name)
+    stem = posixpath.splitext(filename)[0]
+    source, names = file.name, {}
+    try:
+        cleaned = _clean_original(image)
+        if cleaned is not None:
+            source = storage.save(file.name, ContentFile(cleaned))
+        upright = ImageOps.exif_transpose(image)
+        for variant, (width, height, crop) in spec.items():
+            data = _encode(make_variant(upright, width, height, crop), DERIVATIVE_FORMAT, quality=DERIVATIVE_QUALITY)
+            name = posixpath.join(directory, 'variants', f'{stem}-{variant}.{DERIVATIVE_EXTENSION}')
+            names[variant] = storage.save(name, ContentFile(data))
+    except BaseException:
+        delete_variants(storage, names)
+        if source != file.name:
+            storage.delete(source)
+        raise
+    return source, names
+
+
+def process_image(model_name, pk, field):
+    """Bring ``<field>_variants`` of one row up to date with its image"""
+    model = apps.get_model('api', model_name)
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None:
+        return
+    file = getattr(instance, field)
+    storage = file.storage
+    original = file.name or ''
+    previous = getattr(instance, variants_field(field)) or {}
+    if original == previous.get('source', ''):
+        return
+
+    source, names = build_variants(file, IMAGE_VARIANTS[model_name, field]) if original else ('', {})
+    with transaction.atomic():
+        instance = model.objects.select_for_update().filter(pk=pk).first()
+        if instance is None or (getattr(instance, field).name or '') != original:
+            # Replaced or deleted while we worked; its own job takes over
+            current = None
+        else:
+            current = getattr(instance, variants_field(field)) or {}
+            setattr(instance, variants_field(field), {'source': source, **names} if source else {})
+            update_fields = [variants_field(field)]
+            if source != original:
+                setattr(instance, field, source)
+                update_fields.append(field)
+            if any(f.name == 'updated_at' for f in model._meta.concrete_fields):
+                update_fields.append('updated_at')
+            # A full save, so caches, documents and the search index follow
+            instance.save(update_fields=update_fields)
+
+    if current is None:
+        delete_variants(storage, names)
+        if source != original:
+            storage.delete(source)
+        return
+    delete_variants(storage, current)
+    if source != original:
+        storage.delete(original)
+    logger.info('Processed %s of %s %s', field, model_name, pk)
+
+
+@job_handler('process_image')
+def process_image_job(job):
+    process_image(job.payload['model'], job.payload['pk'], job.payload['field'])
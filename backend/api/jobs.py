@@ -0,0 +1,152 @@
+"""
+Database-backed background jobs.
+
+``enqueue()`` stores a Job row and ``manage.py run_jobs`` works through them
+with a fixed number of worker threads, so no broker is needed and a burst of
+requests can only ever grow the queue, never the number of processes. Jobs
+are claimed with a conditional UPDATE, which lets several workers (on one
+host or many) share the table safely.
+
+Jobs of the same kind with the same payload never run at the same time: a
+queued job waits while an identical one is running. So a job queued because
+something changed during a run still runs, but only after that run is over.
+
+A job whose handler raises is retried after JOB_RETRY_BACKOFF seconds,
+doubling on each attempt, until it has run JOB_MAX_ATTEMPTS times. Raising
+PermanentJobError fails it straight away. A job whose worker died is put back
+in the queue once its lock is older than JOB_LOCK_TIMEOUT; handlers that can
+run longer than that call ``heartbeat()`` as they go.
+
+Handlers register themselves with ``@job_handler('kind')``. The modules
+defining them are imported by ApiConfig.ready().
+"""
+
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Exists, F, OuterRef
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+HANDLERS = {}
+
+# How many due jobs a worker looks at when trying to claim one
+CLAIM_BATCH = 10
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler when retrying cannot help"""
+
+
+def job_handler(kind):
+    def decorator(func):
+        HANDLERS[kind] = func
+        return func
+    return decorator
+
+
+def enqueue(kind, payload=None, delay=0, unique=False, max_attempts=None):
+    """Queue a job. Workers see it once the current transaction commits.
+
+    With ``unique`` no new job is created while an identical one (same kind
+    and payload) is still queued. An identical job that is already running
+    does not count: it may have read its data before the change that queues
+    this one, so the new job runs after it instead. Returns the job, or None
+    when deduplicated.
+    """
+    payload = payload or {}
+    if unique and Job.objects.filter(kind=kind, payload=payload, status='queued').exists():
+        return None
+    return Job.objects.create(
+        kind=kind,
+        payload=payload,
+        run_at=timezone.now() + timedelta(seconds=delay),
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+    )
+
+
+def retry_delay(attempts):
+    """Seconds to wait before the next attempt of a job that failed ``attempts`` times"""
+    return settings.JOB_RETRY_BACKOFF * 2 ** max(attempts - 1, 0)
+
+
+def _identical_running():
+    return Exists(Job.objects.filter(kind=OuterRef('kind'), payload=OuterRef('payload'), status='running'))
+
+
+def claim_job(worker_id):
+    """Mark the next due job as running for ``worker_id`` and return it, or None.
+
+    Jobs with an identical job running are skipped until it finishes.
+    """
+    now = timezone.now()
+    due = (
+        Job.objects.filter(status='queued', run_at__lte=now)
+        .exclude(_identical_running())
+        .order_by('run_at', 'id')
+    )
+    for job_id in due.values_list('pk', flat=True)[:CLAIM_BATCH]:
+        claimed = Job.objects.filter(pk=job_id, status='queued').exclude(_identical_running()).update(
+            status='running', locked_by=worker_id, locked_at=now, attempts=F('attempts') + 1,
+        )
+        if claimed:
+            return Job.objects.get(pk=job_id)
+    return None
+
+
+def heartbeat(job):
+    """Renew the lock of a running job, so a long run isn't taken for one whose
+    worker died. Returns False if the job was given up meanwhile."""
+    now = timezone.now()
+    renewed = Job.objects.filter(pk=job.pk, status='running', locked_by=job.locked_by).update(locked_at=now)
+    if renewed:
+        job.locked_at = now
+    return bool(renewed)
+
+
+def run_job(job):
+    """Run a claimed job and record the outcome; returns True on success.
+
+    The outcome is not recorded if the job was given up meanwhile: it is
+    queued again, or another worker runs it now.
+    """
+    handler = HANDLERS.get(job.kind)
+    owned = Job.objects.filter(pk=job.pk, status='running', locked_by=job.locked_by)
+    try:
+        if handler is None:
+            raise PermanentJobError(f'No handler for job kind "{job.kind}"')
+        handler(job)
+    except Exception as exc:
+        retry = not isinstance(exc, PermanentJobError) and job.attempts < job.max_attempts
+        logger.warning('Job %s (%s) failed on attempt %s%s', job.pk, job.kind, job.attempts,
+                       ', will retry' if retry else '', exc_info=True)
+        owned.update(
+            status='queued' if retry else 'failed',
+            run_at=timezone.now() + timedelta(seconds=retry_delay(job.attempts)),
+            locked_by='',
+            locked_at=None,
+            last_error=traceback.format_exc(),
+            finished_at=None if retry else timezone.now(),
+        )
+        return False
+    owned.update(
+        status='succeeded', locked_by='', locked_at=None, finished_at=timezone.now(),
+    )
+    return True
+
+
+def requeue_stale_jobs():
+    """Give up the locks of jobs whose worker stopped responding; returns how many"""
+    cutoff = timezone.now() - timedelta(seconds=settings.JOB_LOCK_TIMEOUT)
+    stale = Job.objects.filter(status='running', locked_at__lt=cutoff)
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status='failed', locked_by='', locked_at=None, finished_at=timezone.now(),
+        last_error='Worker stopped while running the job',
+    )
+    requeued = stale.update(status='queued', locked_by='', locked_at=None, run_at=timezone.now())
+    return failed + requeued
@@ -0,0 +1,40 @@
+import os
+import shutil
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.models import Upload
+
+
+class Command(BaseCommand):
+    help = 'Remove chunked uploads that have been idle for UPLOAD_EXPIRY seconds, with their chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--expiry', type=int, default=settings.UPLOAD_EXPIRY,
+            help='seconds since the last chunk after which an upload is removed',
+        )
+
+    def handle(self, *args, expiry, **options):
+        cutoff = timezone.now() - timedelta(seconds=expiry)
+        # Chunks are removed by the post_delete signal of each upload
+        removed = 0
+        for upload in Upload.objects.filter(updated_at__lt=cutoff).iterator():
+            upload.delete()
+            removed += 1
+
+        # Chunk directories whose upload row is gone (e.g. a crash mid-delete)
+        orphans = 0
+        if os.path.isdir(settings.UPLOAD_CHUNK_DIR):
+            names = set(os.listdir(settings.UPLOAD_CHUNK_DIR))
+            known = {str(pk) for pk in Upload.objects.values_list('pk', flat=True)}
+            for name in names - known:
+                path = os.path.join(settings.UPLOAD_CHUNK_DIR, name)
+                if os.path.getmtime(path) < cutoff.timestamp():
+                    shutil.rmtree(path, ignore_errors=True)
+                    orphans += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Removed {removed} uploads and {orphans} orphaned chunk directories'))
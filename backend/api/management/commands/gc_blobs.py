@@ -0,0 +1,42 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.blobs import rebuild_blob_counts
+from api.models import Blob
+from api.storage import content_storage
+
+
+class Command(BaseCommand):
+    help = 'Delete stored files (slideshows, slides) that nothing has referenced for BLOB_GC_GRACE seconds'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace', type=int, default=settings.BLOB_GC_GRACE,
+            help='seconds a file must have been unreferenced before it is deleted',
+        )
+        parser.add_argument('--recount', action='store_true', help='recount all references first')
+        parser.add_argument('--dry-run', action='store_true', help='only report what would be deleted')
+
+    def handle(self, *args, grace, recount, dry_run, **options):
+        if recount:
+            self.stdout.write(f'Corrected the reference count of {rebuild_blob_counts()} files')
+
+        cutoff = timezone.now() - timedelta(seconds=grace)
+        unused = Blob.objects.filter(ref_count=0, updated_at__lt=cutoff)
+        deleted = freed = 0
+        for blob in unused.only('pk', 'name', 'size').iterator():
+            if dry_run:
+                self.stdout.write(f'Would delete {blob.name}')
+            # Re-checked in the DELETE, in case the file was stored or retained again meanwhile
+            elif unused.filter(pk=blob.pk).delete()[0]:
+                content_storage.delete(blob.name)
+            else:
+                continue
+            deleted += 1
+            freed += blob.size
+
+        verb = 'Would delete' if dry_run else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {deleted} files ({freed / 1024 / 1024:.1f} MB)'))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.catalog import rebuild_catalog
+from api.models import BillOfMaterialItem, CatalogComponent
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the deduplicated component catalog and its usage counts from all BOM items'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            count = rebuild_catalog(CatalogComponent, BillOfMaterialItem)
+
+        self.stdout.write(self.style.SUCCESS(f'Catalog rebuilt with {count} components'))
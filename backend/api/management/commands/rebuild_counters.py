@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.caching import bump_model_version
+from api.counters import rebuild_counters
+from api.models import Bookmark, Comment, Project
+
+
+class Command(BaseCommand):
+    help = 'Recompute comment, reply and bookmark counters'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            rebuild_counters(Project, Comment, Bookmark)
+        # Cached feed pages carry the old counts
+        bump_model_version(Project)
+
+        self.stdout.write(self.style.SUCCESS('Counters rebuilt'))
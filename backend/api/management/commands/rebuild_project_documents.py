@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from api.documents import build_document
+from api.models import Project, ProjectDocument
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the stored detail document of every published project'
+
+    def handle(self, *args, **options):
+        ProjectDocument.objects.exclude(project__status='published').delete()
+        project_ids = list(Project.objects.filter(status='published').values_list('pk', flat=True))
+        for project_id in project_ids:
+            build_document(project_id)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt documents for {len(project_ids)} projects'))
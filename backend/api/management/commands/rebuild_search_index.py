@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from api.models import Project
+from api.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index for all projects'
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        backend.setup()
+
+        count = 0
+        for project in Project.objects.select_related('author', 'category').iterator():
+            backend.index_project(project)
+            count += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Indexed {count} projects'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api.trending import refresh_trending_scores
+
+
+class Command(BaseCommand):
+    help = 'Recompute time-decayed trending scores from recent comments, bookmarks and views'
+
+    def handle(self, *args, **options):
+        count = refresh_trending_scores()
+        self.stdout.write(self.style.SUCCESS(f'Trending scores refreshed for {count} projects'))
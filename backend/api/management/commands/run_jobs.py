@@ -0,0 +1,59 @@
+import os
+import signal
+import socket
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from api.jobs import claim_job, requeue_stale_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs (slideshow conversion, ...) with a fixed number of worker threads'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency', type=int, default=settings.JOB_WORKER_CONCURRENCY,
+            help='number of jobs run at the same time',
+        )
+        parser.add_argument('--once', action='store_true', help='exit once no job is due instead of polling')
+
+    def handle(self, *args, concurrency, once, **options):
+        self.stop = threading.Event()
+        if threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(signum, lambda *_: self.stop.set())
+
+        requeued = requeue_stale_jobs()
+        if requeued:
+            self.stdout.write(f'Requeued {requeued} jobs left running by a stopped worker')
+
+        prefix = f'{socket.gethostname()}:{os.getpid()}'
+        threads = [
+            threading.Thread(target=self.work, args=(f'{prefix}:{index}', once), daemon=True)
+            for index in range(max(concurrency, 1))
+        ]
+        self.stdout.write(f'Running jobs with {len(threads)} workers')
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.stdout.write(self.style.SUCCESS('Worker stopped'))
+
+    def work(self, worker_id, once):
+        try:
+            while not self.stop.is_set():
+                close_old_connections()
+                job = claim_job(worker_id)
+                if job is None:
+                    if once:
+                        return
+                    self.stop.wait(settings.JOB_POLL_INTERVAL)
+                    requeue_stale_jobs()
+                    continue
+                ok = run_job(job)
+                self.stdout.write(f'[{worker_id}] {job.kind} job {job.pk}: {"done" if ok else "failed"}')
+        finally:
+            connections.close_all()
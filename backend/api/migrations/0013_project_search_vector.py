@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:06
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    from api.search import get_search_backend
+
+    backend = get_search_backend(schema_editor.connection)
+    backend.setup()
+
+    Project = apps.get_model('api', 'Project')
+    for project in Project.objects.select_related('author', 'category').iterator():
+        backend.index_project(project)
+
+
+def drop_search_index(apps, schema_editor):
+    from api.search import get_search_backend
+
+    get_search_backend(schema_editor.connection).teardown()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_userprofile_companies_userprofile_education'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def build_catalog(apps, schema_editor):
+    from api.catalog import rebuild_catalog
+
+    rebuild_catalog(apps.get_model('api', 'CatalogComponent'), apps.get_model('api', 'BillOfMaterialItem'))
+
+
+def create_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS api_catalog_name_trgm '
+            'ON api_catalogcomponent USING gin (UPPER(name) gin_trgm_ops)'
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogComponent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('item_type', models.CharField(choices=[('Hardware', 'Hardware'), ('Software', 'Software'), ('Tool', 'Tool')], max_length=20)),
+                ('name', models.CharField(help_text='Display name, as first entered', max_length=200)),
+                ('normalized_name', models.CharField(editable=False, help_text='Case- and whitespace-folded name', max_length=200)),
+                ('description', models.TextField(blank=True)),
+                ('link', models.URLField(blank=True, help_text='Canonical purchase or reference link')),
+                ('usage_count', models.PositiveIntegerField(default=0, help_text='Number of BOM items using this component')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['-usage_count', 'name'],
+                'indexes': [models.Index(fields=['item_type', '-usage_count'], name='api_catalog_type_usage_idx'), models.Index(fields=['-usage_count'], name='api_catalog_usage_idx')],
+                'unique_together': {('normalized_name', 'item_type')},
+            },
+        ),
+        migrations.AddField(
+            model_name='billofmaterialitem',
+            name='catalog_component',
+            field=models.ForeignKey(blank=True, editable=False, help_text='Deduplicated catalog entry for this item', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='bom_items', to='api.catalogcomponent'),
+        ),
+        migrations.RunPython(build_catalog, migrations.RunPython.noop),
+        # Dropped together with the table when migrating backwards
+        migrations.RunPython(create_trigram_index, migrations.RunPython.noop),
+    ]
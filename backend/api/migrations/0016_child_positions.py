@@ -0,0 +1,49 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_component_catalog'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='attachment',
+            options={'ordering': ['position', 'attachment_type', 'title']},
+        ),
+        migrations.AlterModelOptions(
+            name='billofmaterialitem',
+            options={'ordering': ['position', 'item_type', 'name']},
+        ),
+        migrations.AlterModelOptions(
+            name='projectmember',
+            options={'ordering': ['position', 'id']},
+        ),
+        migrations.AlterModelOptions(
+            name='workattribution',
+            options={'ordering': ['position', 'id']},
+        ),
+        migrations.AddField(
+            model_name='attachment',
+            name='position',
+            field=models.PositiveIntegerField(default=0, help_text='Display order within the project'),
+        ),
+        migrations.AddField(
+            model_name='billofmaterialitem',
+            name='position',
+            field=models.PositiveIntegerField(default=0, help_text='Display order within the project'),
+        ),
+        migrations.AddField(
+            model_name='projectmember',
+            name='position',
+            field=models.PositiveIntegerField(default=0, help_text='Display order within the project'),
+        ),
+        migrations.AddField(
+            model_name='workattribution',
+            name='position',
+            field=models.PositiveIntegerField(default=0, help_text='Display order within the project'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:18
+
+from django.db import migrations, models
+
+
+def backfill_counters(apps, schema_editor):
+    from api.counters import rebuild_counters
+
+    rebuild_counters(
+        apps.get_model('api', 'Project'), apps.get_model('api', 'Comment'), apps.get_model('api', 'Bookmark')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_child_positions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='reply_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='activity_score',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Comments and bookmarks in the recent activity window'),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='bookmark_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['-comment_count', '-created_at'], name='api_project_comments_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['-bookmark_count', '-created_at'], name='api_project_bookmarks_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['-activity_score', '-created_at'], name='api_project_activity_idx'),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
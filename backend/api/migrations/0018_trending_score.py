@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_engagement_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectViewCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('views', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='trending_score',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['-trending_score', '-id'], name='api_project_trending_idx'),
+        ),
+        migrations.AddField(
+            model_name='projectviewcount',
+            name='project',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='view_counts', to='api.project'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='projectviewcount',
+            unique_together={('project', 'date')},
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_trending_score'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='project',
+            name='api_project_comments_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='project',
+            name='api_project_bookmarks_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='project',
+            name='api_project_activity_idx',
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['-created_at', '-id'], name='api_project_newest_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['-comment_count', '-id'], name='api_project_comments_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['-bookmark_count', '-id'], name='api_project_bookmarks_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0020_visibility_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='children_updated_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:37
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0021_project_children_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectDocument',
+            fields=[
+                ('project', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='document', serialize=False, to='api.project')),
+                ('document', models.TextField()),
+                ('state', models.CharField(max_length=100)),
+                ('built_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:40
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+def mark_existing_slideshows(apps, schema_editor):
+    # Slideshows uploaded before status tracking: converted if they have slides
+    ProjectSlideshow = apps.get_model('api', 'ProjectSlideshow')
+    SlideshowSlide = apps.get_model('api', 'SlideshowSlide')
+    converted = SlideshowSlide.objects.values('slideshow_id')
+    ProjectSlideshow.objects.filter(pk__in=converted).update(conversion_status='ready', conversion_progress=100)
+    ProjectSlideshow.objects.exclude(pk__in=converted).update(
+        conversion_status='failed', conversion_error='No slides were produced. Please upload the file again.'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0022_project_documents'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectslideshow',
+            name='conversion_error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='projectslideshow',
+            name='conversion_progress',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Percentage of pages converted'),
+        ),
+        migrations.AddField(
+            model_name='projectslideshow',
+            name='conversion_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('ready', 'Ready'), ('failed', 'Failed')], default='pending', max_length=20),
+        ),
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=50)),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], default='queued', max_length=20)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('max_attempts', models.PositiveSmallIntegerField(default=3)),
+                ('run_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('locked_by', models.CharField(blank=True, max_length=100)),
+                ('locked_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['run_at', 'id'],
+                'indexes': [models.Index(fields=['status', 'run_at'], name='api_job_due_idx')],
+            },
+        ),
+        migrations.RunPython(mark_existing_slideshows, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0023_job_queue'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='slideshowslide',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='projectslideshow',
+            name='generation',
+            field=models.PositiveIntegerField(default=0, help_text='Generation of the slides currently shown'),
+        ),
+        migrations.AddField(
+            model_name='slideshowslide',
+            name='generation',
+            field=models.PositiveIntegerField(default=0, help_text='Conversion run that produced the slide'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='slideshowslide',
+            unique_together={('slideshow', 'generation', 'slide_number')},
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:52
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+def queue_reconversions(apps, schema_editor):
+    # Slides converted before derivatives existed: convert their decks again.
+    # The current slides stay up until the new generation is swapped in.
+    Job = apps.get_model('api', 'Job')
+    ProjectSlideshow = apps.get_model('api', 'ProjectSlideshow')
+    now = django.utils.timezone.now()
+    Job.objects.bulk_create([
+        Job(kind='convert_slideshow', payload={'slideshow_id': pk}, run_at=now)
+        for pk in ProjectSlideshow.objects.filter(conversion_status='ready').values_list('pk', flat=True)
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0024_slide_generations'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectslideshow',
+            name='strip_tile_height',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='projectslideshow',
+            name='thumbnail_strip',
+            field=models.ImageField(blank=True, upload_to='slideshow_strips/'),
+        ),
+        migrations.AddField(
+            model_name='slideshowslide',
+            name='height',
+            field=models.PositiveIntegerField(default=0, help_text='Height of the full-size image in pixels'),
+        ),
+        migrations.AddField(
+            model_name='slideshowslide',
+            name='preview',
+            field=models.ImageField(blank=True, help_text='Mid-size copy (WebP or JPEG)', upload_to='slideshow_slides/'),
+        ),
+        migrations.AddField(
+            model_name='slideshowslide',
+            name='thumbnail',
+            field=models.ImageField(blank=True, help_text='Thumbnail (WebP or JPEG)', upload_to='slideshow_slides/'),
+        ),
+        migrations.AddField(
+            model_name='slideshowslide',
+            name='width',
+            field=models.PositiveIntegerField(default=0, help_text='Width of the full-size image in pixels'),
+        ),
+        migrations.RunPython(queue_reconversions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:57
+
+import api.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0025_slide_derivatives'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectslideshow',
+            name='rendered_from',
+            field=models.CharField(blank=True, help_text='original_file the current slides were rendered from', max_length=100),
+        ),
+        migrations.AlterField(
+            model_name='projectslideshow',
+            name='original_file',
+            field=models.FileField(help_text='Original PowerPoint (.ppt/.pptx) or PDF file', storage=api.storage.ContentAddressedStorage(), upload_to='project_slideshows/'),
+        ),
+        migrations.AlterField(
+            model_name='projectslideshow',
+            name='thumbnail_strip',
+            field=models.ImageField(blank=True, storage=api.storage.ContentAddressedStorage(), upload_to='slideshow_strips/'),
+        ),
+        migrations.AlterField(
+            model_name='slideshowslide',
+            name='image',
+            field=models.ImageField(help_text='Converted slide image', storage=api.storage.ContentAddressedStorage(), upload_to='slideshow_slides/'),
+        ),
+        migrations.AlterField(
+            model_name='slideshowslide',
+            name='preview',
+            field=models.ImageField(blank=True, help_text='Mid-size copy (WebP or JPEG)', storage=api.storage.ContentAddressedStorage(), upload_to='slideshow_slides/'),
+        ),
+        migrations.AlterField(
+            model_name='slideshowslide',
+            name='thumbnail',
+            field=models.ImageField(blank=True, help_text='Thumbnail (WebP or JPEG)', storage=api.storage.ContentAddressedStorage(), upload_to='slideshow_slides/'),
+        ),
+        migrations.CreateModel(
+            name='Blob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(help_text='Storage name', max_length=255, unique=True)),
+                ('sha256', models.CharField(blank=True, max_length=64)),
+                ('size', models.BigIntegerField(default=0, help_text='Size in bytes')),
+                ('ref_count', models.PositiveIntegerField(default=0, help_text='Number of file fields using this file')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['ref_count', 'updated_at'], name='api_blob_unused_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.7 on 2026-10-18 04:07
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+def queue_image_processing(apps, schema_editor):
+    # Images uploaded before variants existed get them from the job workers
+    Job = apps.get_model('api', 'Job')
+    now = django.utils.timezone.now()
+    jobs = []
+    for model_name, field in [
+        ('Project', 'cover_image'), ('BillOfMaterialItem', 'image'), ('Step', 'image'), ('UserProfile', 'avatar'),
+    ]:
+        model = apps.get_model('api', model_name)
+        pks = model.objects.exclude(**{f'{field}__isnull': True}).exclude(**{field: ''}).values_list('pk', flat=True)
+        jobs.extend(
+            Job(kind='process_image', payload={'model': model_name, 'pk': pk, 'field': field}, run_at=now)
+            for pk in pks
+        )
+    Job.objects.bulk_create(jobs, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0026_content_addressed_storage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='billofmaterialitem',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='cover_image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='step',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='avatar_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.RunPython(queue_image_processing, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-18 04:24
+
+import api.search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0028_chunked_uploads'),
+    ]
+
+    operations = [
+        # Databases migrated before the index was declared got it from raw SQL
+        # in 0013; replace it with the tracked one
+        migrations.RunSQL(
+            'DROP INDEX IF EXISTS api_project_search_vector_gin', reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=api.search.SearchVectorIndex(fields=['search_vector'], name='api_project_search_vector_gin'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 04:25
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0029_search_vector_index'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='project',
+            name='activity_score',
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-18 04:40
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce, Greatest
+
+
+def claim_existing_generations(apps, schema_editor):
+    # Including those of runs that were interrupted before swapping their slides in
+    ProjectSlideshow = apps.get_model('api', 'ProjectSlideshow')
+    SlideshowSlide = apps.get_model('api', 'SlideshowSlide')
+    latest = SlideshowSlide.objects.filter(slideshow=models.OuterRef('pk')).order_by('-generation').values('generation')[:1]
+    ProjectSlideshow.objects.update(
+        last_generation=Greatest(models.F('generation'), Coalesce(models.Subquery(latest), 0)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0030_remove_project_activity_score'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectslideshow',
+            name='last_generation',
+            field=models.PositiveIntegerField(default=0, help_text='Latest generation claimed by a conversion'),
+        ),
+        migrations.RunPython(claim_existing_generations, migrations.RunPython.noop),
+    ]
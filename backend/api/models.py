@@ -1,6 +1,13 @@
-from django.db import models
+import uuid
+
+from django.db import models, transaction
 from django.contrib.auth.models import User
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator
+from django.utils import timezone
+
+from .search import SearchVectorIndex
+from .storage import content_storage
 
 
 class Category(models.Model):
@@ -15,6 +22,30 @@ class Category(models.Model):
         ordering = ['name']  # Order alphabetically by name
 
 
+class ProjectQuerySet(models.QuerySet):
+    """Visibility filters. Membership is checked with an EXISTS subquery, so
+    listings need neither a join on team members nor DISTINCT."""
+    
+    def _membership(self, user):
+        return models.Exists(ProjectMember.objects.filter(project=models.OuterRef('pk'), user=user))
+    
+    def visible_to(self, user):
+        """Projects listed to ``user``: published ones, their own and those they
+        are a member of. Anonymous visitors get published projects only and
+        staff get everything."""
+        if user is None or not user.is_authenticated:
+            return self.filter(status='published')
+        if user.is_staff:
+            return self
+        return self.filter(
+            models.Q(status='published') | models.Q(author=user) | models.Q(self._membership(user))
+        )
+    
+    def involving(self, user):
+        """Projects ``user`` authored or is a team member of"""
+        return self.filter(models.Q(author=user) | models.Q(self._membership(user)))
+
+
 class Project(models.Model):
     """Main project model"""
     DIFFICULTY_CHOICES = [
@@ -36,18 +67,40 @@ class Project(models.Model):
     elevator_pitch = models.TextField(blank=True, help_text="Brief description of your project")
     story_content = models.TextField(blank=True, help_text="Rich text content for project story")
     cover_image = models.ImageField(upload_to='project_covers/', blank=True, null=True)
+    # Sized copies of the cover, maintained by api.images
+    cover_image_variants = models.JSONField(default=dict, blank=True, editable=False)
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='projects')
     category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='projects')
     difficulty = models.CharField(max_length=20, choices=DIFFICULTY_CHOICES)
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='draft')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Last change to any row shown on the detail page (members, BOM, comments...)
+    children_updated_at = models.DateTimeField(null=True, blank=True, editable=False)
+    # Weighted full-text document, maintained by api.search (PostgreSQL only)
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Engagement counters, maintained by api.counters
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    bookmark_count = models.PositiveIntegerField(default=0, editable=False)
+    # Time-decayed activity, refreshed periodically by api.trending
+    trending_score = models.FloatField(default=0, editable=False)
+    
+    objects = ProjectQuerySet.as_manager()
     
     def __str__(self):
         return self.title
     
     class Meta:
         ordering = ['-created_at']
+        # One index per feed sort, ending in id to match the keyset ordering
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='api_project_newest_idx'),
+            models.Index(fields=['status', '-created_at', '-id'], name='api_project_status_created_idx'),
+            models.Index(fields=['-comment_count', '-id'], name='api_project_comments_idx'),
+            models.Index(fields=['-bookmark_count', '-id'], name='api_project_bookmarks_idx'),
+            models.Index(fields=['-trending_score', '-id'], name='api_project_trending_idx'),
+            SearchVectorIndex(fields=['search_vector'], name='api_project_search_vector_gin'),
+        ]
 
 
 class ProjectMember(models.Model):
@@ -61,6 +114,7 @@ class ProjectMember(models.Model):
 
     role = models.CharField(max_length=10, choices=ROLE_CHOICES, default='Read')
     contribution = models.TextField(help_text="Describe this member's contribution to the project")
+    position = models.PositiveIntegerField(default=0, help_text="Display order within the project")
     joined_at = models.DateTimeField(auto_now_add=True)
     
     def __str__(self):
@@ -68,6 +122,11 @@ class ProjectMember(models.Model):
     
     class Meta:
         unique_together = ['project', 'user']
+        ordering = ['position', 'id']
+        indexes = [
+            # Membership lookups by user (the unique index leads with project)
+            models.Index(fields=['user', 'project'], name='api_member_user_project_idx'),
+        ]
 
 
 class WorkAttribution(models.Model):
@@ -76,10 +135,14 @@ class WorkAttribution(models.Model):
     contributor_name = models.CharField(max_length=200, help_text="Name of the external contributor")
     credit_description = models.TextField(help_text="Description of their contribution")
     link = models.URLField(blank=True, help_text="Optional link to their work or profile")
+    position = models.PositiveIntegerField(default=0, help_text="Display order within the project")
     created_at = models.DateTimeField(auto_now_add=True)
     
     def __str__(self):
         return f"{self.contributor_name} - {self.project.title}"
+    
+    class Meta:
+        ordering = ['position', 'id']
 
 
 class BillOfMaterialItem(models.Model):
@@ -96,14 +159,44 @@ class BillOfMaterialItem(models.Model):
     description = models.TextField(blank=True, help_text="Optional description of the item")
     quantity = models.IntegerField(default=1, validators=[MinValueValidator(1)])
     image = models.ImageField(upload_to='bom_images/', blank=True, null=True, help_text="Optional image of the item")
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     link = models.URLField(blank=True, help_text="Optional purchase or reference link")
+    catalog_component = models.ForeignKey(
+        'CatalogComponent', on_delete=models.SET_NULL, null=True, blank=True, editable=False,
+        related_name='bom_items', help_text="Deduplicated catalog entry for this item"
+    )
+    position = models.PositiveIntegerField(default=0, help_text="Display order within the project")
     created_at = models.DateTimeField(auto_now_add=True)
     
     def __str__(self):
         return f"{self.name} ({self.item_type}) - {self.project.title}"
     
     class Meta:
-        ordering = ['item_type', 'name']
+        ordering = ['position', 'item_type', 'name']
+
+
+class CatalogComponent(models.Model):
+    """Deduplicated component shared by bill of materials items with the same
+    normalized name and type. Maintained incrementally by api.catalog."""
+    item_type = models.CharField(max_length=20, choices=BillOfMaterialItem.ITEM_TYPE_CHOICES)
+    name = models.CharField(max_length=200, help_text="Display name, as first entered")
+    normalized_name = models.CharField(max_length=200, editable=False, help_text="Case- and whitespace-folded name")
+    description = models.TextField(blank=True)
+    link = models.URLField(blank=True, help_text="Canonical purchase or reference link")
+    usage_count = models.PositiveIntegerField(default=0, help_text="Number of BOM items using this component")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.name} ({self.item_type})"
+    
+    class Meta:
+        unique_together = ['normalized_name', 'item_type']
+        ordering = ['-usage_count', 'name']
+        indexes = [
+            models.Index(fields=['item_type', '-usage_count'], name='api_catalog_type_usage_idx'),
+            models.Index(fields=['-usage_count'], name='api_catalog_usage_idx'),
+        ]
 
 
 class Attachment(models.Model):
@@ -120,13 +213,14 @@ class Attachment(models.Model):
     file_upload = models.FileField(upload_to='attachments/', blank=True, null=True)
     repository_link = models.URLField(blank=True, help_text="Link to external repository (e.g., GitHub)")
     description = models.TextField(blank=True, help_text="Optional description of the attachment")
+    position = models.PositiveIntegerField(default=0, help_text="Display order within the project")
     created_at = models.DateTimeField(auto_now_add=True)
     
     def __str__(self):
         return f"{self.title} ({self.attachment_type}) - {self.project.title}"
     
     class Meta:
-        ordering = ['attachment_type', 'title']
+        ordering = ['position', 'attachment_type', 'title']
 
 
 # Keep existing models for backward compatibility
@@ -146,6 +240,7 @@ class Step(models.Model):
     title = models.CharField(max_length=200)
     instructions = models.TextField()
     image = models.ImageField(upload_to='step_images/', blank=True, null=True)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     
     def __str__(self):
         return f"Step {self.step_number}: {self.title} - {self.project.title}"
@@ -161,18 +256,21 @@ class Comment(models.Model):
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='comments')
     parent = models.ForeignKey('self', on_delete=models.CASCADE, null=True, blank=True, related_name='replies')
     body = models.TextField()
+    # Number of direct replies, maintained by api.counters
+    reply_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     
     def __str__(self):
         return f"Comment by {self.author.username} on {self.project.title}"
     
-    @property
-    def is_reply(self):
-        return self.parent is not None
+    def save(self, *args, **kwargs):
+        # Counter updates from post_save commit or roll back with the row
+        with transaction.atomic():
+            super().save(*args, **kwargs)
     
     @property
-    def reply_count(self):
-        return self.replies.count()
+    def is_reply(self):
+        return self.parent_id is not None
     
     class Meta:
         ordering = ['-created_at']
@@ -210,6 +308,7 @@ class UserProfile(models.Model):
     skills = models.JSONField(default=list, blank=True)
     location = models.CharField(max_length=100, blank=True)
     avatar = models.ImageField(upload_to='avatars/', blank=True, null=True)
+    avatar_variants = models.JSONField(default=dict, blank=True, editable=False)
     
     # Education and Company information
     education = models.JSONField(default=list, blank=True, help_text="List of education entries with university and major")
@@ -231,6 +330,37 @@ class Bookmark(models.Model):
     
     def __str__(self):
         return f"{self.user.username} bookmarked {self.project.title}"
+    
+    def save(self, *args, **kwargs):
+        # Counter updates from post_save commit or roll back with the row
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+
+class ProjectViewCount(models.Model):
+    """Number of detail page views of a project on one day"""
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='view_counts')
+    date = models.DateField()
+    views = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        unique_together = ['project', 'date']
+        ordering = ['-date']
+    
+    def __str__(self):
+        return f"{self.project.title} - {self.date}: {self.views} views"
+
+
+class ProjectDocument(models.Model):
+    """Prebuilt JSON detail payload of a published project (see api.documents)"""
+    project = models.OneToOneField(Project, on_delete=models.CASCADE, primary_key=True, related_name='document')
+    document = models.TextField()
+    # Project state the document was built from; a mismatch means it is stale
+    state = models.CharField(max_length=100)
+    built_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Document for project {self.project_id}"
 
 
 class ProjectSlideshow(models.Model):
@@ -238,16 +368,43 @@ class ProjectSlideshow(models.Model):
     project = models.OneToOneField(Project, on_delete=models.CASCADE, related_name='slideshow')
     original_file = models.FileField(
         upload_to='project_slideshows/',
+        storage=content_storage,
         help_text="Original PowerPoint (.ppt/.pptx) or PDF file"
     )
     title = models.CharField(max_length=200, blank=True, help_text="Optional title for the slideshow")
     description = models.TextField(blank=True, help_text="Optional description of the slideshow")
+    CONVERSION_STATUSES = [
+        ('pending', 'Pending'),
+        ('processing', 'Processing'),
+        ('ready', 'Ready'),
+        ('failed', 'Failed'),
+    ]
+    # Kept up to date by the convert_slideshow job (api.slides)
+    conversion_status = models.CharField(max_length=20, choices=CONVERSION_STATUSES, default='pending')
+    conversion_progress = models.PositiveSmallIntegerField(default=0, help_text="Percentage of pages converted")
+    conversion_error = models.TextField(blank=True)
+    # Slides are converted under a new generation number and swapped in by
+    # pointing this at it once every page is saved
+    generation = models.PositiveIntegerField(default=0, help_text="Generation of the slides currently shown")
+    # Each conversion run claims the next generation number; only the run
+    # holding the latest one may swap its slides in
+    last_generation = models.PositiveIntegerField(default=0, help_text="Latest generation claimed by a conversion")
+    # Sprite of the current generation's thumbnails for the slide rail (api.pdf_render.ThumbnailStrip)
+    thumbnail_strip = models.ImageField(upload_to='slideshow_strips/', storage=content_storage, blank=True)
+    strip_tile_height = models.PositiveSmallIntegerField(default=0)
+    # Conversion is skipped for a file that has already been rendered, here or for another slideshow
+    rendered_from = models.CharField(
+        max_length=100, blank=True, help_text="original_file the current slides were rendered from"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     def __str__(self):
         return f"Slideshow for {self.project.title}"
     
+    def current_slides(self):
+        return self.slides.filter(generation=self.generation)
+    
     class Meta:
         ordering = ['-created_at']
 
@@ -256,10 +413,20 @@ class SlideshowSlide(models.Model):
     """Individual slide images converted from PowerPoint/PDF"""
     slideshow = models.ForeignKey(ProjectSlideshow, on_delete=models.CASCADE, related_name='slides')
     slide_number = models.IntegerField(help_text="Order of the slide in the presentation")
+    generation = models.PositiveIntegerField(default=0, help_text="Conversion run that produced the slide")
     image = models.ImageField(
         upload_to='slideshow_slides/',
+        storage=content_storage,
         help_text="Converted slide image"
     )
+    width = models.PositiveIntegerField(default=0, help_text="Width of the full-size image in pixels")
+    height = models.PositiveIntegerField(default=0, help_text="Height of the full-size image in pixels")
+    preview = models.ImageField(
+        upload_to='slideshow_slides/', storage=content_storage, blank=True, help_text="Mid-size copy (WebP or JPEG)"
+    )
+    thumbnail = models.ImageField(
+        upload_to='slideshow_slides/', storage=content_storage, blank=True, help_text="Thumbnail (WebP or JPEG)"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     
     def __str__(self):
@@ -267,11 +434,124 @@ class SlideshowSlide(models.Model):
     
     class Meta:
         ordering = ['slide_number']
-        unique_together = ['slideshow', 'slide_number']
+        unique_together = ['slideshow', 'generation', 'slide_number']
+
+
+class Job(models.Model):
+    """Background job, run by ``manage.py run_jobs`` (see api.jobs)"""
+    STATUSES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+    
+    kind = models.CharField(max_length=50)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUSES, default='queued')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    # Not run before this time; pushed back after each failed attempt
+    run_at = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    def __str__(self):
+        return f"{self.kind} job {self.pk} ({self.status})"
+    
+    class Meta:
+        ordering = ['run_at', 'id']
+        indexes = [
+            # Workers look for due queued jobs, oldest first
+            models.Index(fields=['status', 'run_at'], name='api_job_due_idx'),
+        ]
+
+
+class Blob(models.Model):
+    """File stored by content hash (api.storage), with the number of file
+    fields pointing at it. Maintained by api.blobs."""
+    name = models.CharField(max_length=255, unique=True, help_text="Storage name")
+    sha256 = models.CharField(max_length=64, blank=True)
+    size = models.BigIntegerField(default=0, help_text="Size in bytes")
+    ref_count = models.PositiveIntegerField(default=0, help_text="Number of file fields using this file")
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Last stored, retained or released; unreferenced blobs are collected a grace period after this
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} references)"
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['ref_count', 'updated_at'], name='api_blob_unused_idx'),
+        ]
+
+
+class Upload(models.Model):
+    """File sent in chunks, assembled onto its target when complete (see api.uploads)"""
+    TARGETS = [
+        ('attachment', 'Attachment file'),
+        ('slideshow', 'Project slideshow'),
+    ]
+    STATUSES = [
+        ('uploading', 'Uploading'),
+        ('assembling', 'Assembling'),
+        ('complete', 'Complete'),
+        ('failed', 'Failed'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='uploads')
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='uploads')
+    target = models.CharField(max_length=20, choices=TARGETS)
+    attachment = models.ForeignKey(
+        Attachment, on_delete=models.CASCADE, null=True, blank=True, related_name='uploads',
+        help_text="Row receiving the file when the target is an attachment"
+    )
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField(help_text="Size of the whole file in bytes")
+    chunk_size = models.PositiveIntegerField(help_text="Size of every chunk but the last")
+    # Of the whole file: checked on completion when the client sends one, recorded either way
+    sha256 = models.CharField(max_length=64, blank=True)
+    status = models.CharField(max_length=20, choices=STATUSES, default='uploading')
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Last chunk received; uploads idle for UPLOAD_EXPIRY are removed by clean_uploads
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.filename} ({self.status})"
+    
+    @property
+    def chunk_count(self):
+        return -(-self.size // self.chunk_size)
+    
+    def received_chunks(self):
+        """Indexes of the chunks stored so far"""
+        return list(self.chunks.values_list('index', flat=True))
+
+
+class UploadChunk(models.Model):
+    """Chunk of an Upload that has been stored and checked"""
+    upload = models.ForeignKey(Upload, on_delete=models.CASCADE, related_name='chunks')
+    index = models.PositiveIntegerField()
+    size = models.PositiveIntegerField()
+    sha256 = models.CharField(max_length=64)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"Chunk {self.index} of {self.upload_id}"
+    
+    class Meta:
+        ordering = ['index']
+        unique_together = ['upload', 'index']
 
 
 # Signals to auto-create/update profile
-from django.db.models.signals import post_save
+from django.db.models.signals import pre_save, post_save, post_delete
 from django.dispatch import receiver
 
 @receiver(post_save, sender=User)
@@ -279,4 +559,191 @@ def create_or_update_user_profile(sender, instance, created, **kwargs):
     if created:
         UserProfile.objects.create(user=instance)
     else:
-        instance.profile.save()
\ No newline at end of file
+        instance.profile.save()
+
+
+@receiver(post_save, sender=Project)
+def update_project_search_index(sender, instance, **kwargs):
+    from .search import get_search_backend
+    get_search_backend().index_project(instance)
+
+
+@receiver(post_delete, sender=Project)
+def remove_project_search_index(sender, instance, **kwargs):
+    from .search import get_search_backend
+    get_search_backend().remove_project(instance.pk)
+
+
+@receiver(pre_save, sender=Project)
+@receiver(pre_save, sender=ProjectMember)
+def remember_project_access_owner(sender, instance, raw=False, update_fields=None, **kwargs):
+    # A membership moved to another user must revoke the previous user's access too
+    if not raw:
+        from .permissions import remember_access_owner
+        remember_access_owner(instance, update_fields)
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+@receiver(post_save, sender=ProjectMember)
+@receiver(post_delete, sender=ProjectMember)
+def invalidate_project_access_cache(sender, instance, **kwargs):
+    from .permissions import access_changed
+    access_changed(instance)
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=Bookmark)
+@receiver(post_delete, sender=Bookmark)
+@receiver(post_save, sender=ProjectSlideshow)
+@receiver(post_delete, sender=ProjectSlideshow)
+@receiver(post_save, sender=SlideshowSlide)
+@receiver(post_delete, sender=SlideshowSlide)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def bump_cached_model_version(sender, **kwargs):
+    # Responses cached by api.caching that were built from this model go stale
+    from .caching import bump_model_version
+    bump_model_version(ProjectSlideshow if sender is SlideshowSlide else sender)
+
+
+@receiver(post_save, sender=ProjectMember)
+@receiver(post_delete, sender=ProjectMember)
+@receiver(post_save, sender=WorkAttribution)
+@receiver(post_delete, sender=WorkAttribution)
+@receiver(post_save, sender=BillOfMaterialItem)
+@receiver(post_delete, sender=BillOfMaterialItem)
+@receiver(post_save, sender=Attachment)
+@receiver(post_delete, sender=Attachment)
+@receiver(post_save, sender=Component)
+@receiver(post_delete, sender=Component)
+@receiver(post_save, sender=Step)
+@receiver(post_delete, sender=Step)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def touch_project_children(sender, instance, raw=False, **kwargs):
+    # Feeds the detail page's ETag without touching updated_at
+    if not raw:
+        Project.objects.filter(pk=instance.project_id).update(children_updated_at=timezone.now())
+        from .documents import schedule_rebuild
+        schedule_rebuild(instance.project_id)
+
+
+@receiver(post_save, sender=Project)
+def rebuild_project_document(sender, instance, raw=False, **kwargs):
+    if not raw:
+        from .documents import schedule_rebuild
+        schedule_rebuild(instance.pk)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=UserProfile)
+@receiver(post_save, sender=Category)
+def touch_projects_showing(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    # Embedded users, profiles and categories feed the detail page's ETag and
+    # document state through children_updated_at, like project children
+    if raw or created or update_fields == frozenset(['last_login']):
+        return
+    from .documents import touch_projects_in_category, touch_projects_showing_user
+    if sender is Category:
+        touch_projects_in_category(instance.pk)
+    else:
+        touch_projects_showing_user(instance.pk if sender is User else instance.user_id)
+
+
+@receiver(pre_save, sender=BillOfMaterialItem)
+def attach_catalog_component(sender, instance, raw=False, **kwargs):
+    # Items written through the project serializer are attached in one batch
+    if raw or not instance._state.adding or instance.catalog_component_id:
+        return
+    from .catalog import attach_components
+    attach_components([instance])
+
+
+@receiver(post_delete, sender=BillOfMaterialItem)
+def release_catalog_component(sender, instance, **kwargs):
+    from .catalog import release_components
+    release_components([instance])
+
+
+@receiver(post_save, sender=Comment)
+def count_comment(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        from .counters import comment_changed
+        comment_changed(instance, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def uncount_comment(sender, instance, **kwargs):
+    from .counters import comment_changed
+    comment_changed(instance, -1)
+
+
+@receiver(post_save, sender=Bookmark)
+def count_bookmark(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        from .counters import bookmark_changed
+        bookmark_changed(instance, 1)
+
+
+@receiver(post_delete, sender=Bookmark)
+def uncount_bookmark(sender, instance, **kwargs):
+    from .counters import bookmark_changed
+    bookmark_changed(instance, -1)
+
+
+@receiver(pre_save, sender=ProjectSlideshow)
+@receiver(pre_save, sender=SlideshowSlide)
+def remember_blob_names(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw:
+        from .blobs import remember_blobs
+        remember_blobs(instance, update_fields)
+
+
+@receiver(post_save, sender=ProjectSlideshow)
+@receiver(post_save, sender=SlideshowSlide)
+def count_blob_references(sender, instance, raw=False, **kwargs):
+    if not raw:
+        from .blobs import blobs_saved
+        blobs_saved(instance)
+
+
+@receiver(post_delete, sender=ProjectSlideshow)
+@receiver(post_delete, sender=SlideshowSlide)
+def release_blob_references(sender, instance, **kwargs):
+    from .blobs import blobs_deleted
+    blobs_deleted(instance)
+
+
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=BillOfMaterialItem)
+@receiver(post_save, sender=Step)
+@receiver(post_save, sender=UserProfile)
+def queue_image_processing(sender, instance, raw=False, **kwargs):
+    # Rows written with bulk_create/bulk_update are queued by their writer
+    if not raw:
+        from .images import queue_processing
+        queue_processing([instance])
+
+
+@receiver(post_delete, sender=Project)
+@receiver(post_delete, sender=BillOfMaterialItem)
+@receiver(post_delete, sender=Step)
+@receiver(post_delete, sender=UserProfile)
+def delete_image_variants(sender, instance, **kwargs):
+    from .images import delete_variants, image_fields, variants_field
+    for field in image_fields(sender):
+        delete_variants(getattr(instance, field).storage, getattr(instance, variants_field(field)) or {})
+
+
+@receiver(post_delete, sender=Upload)
+def discard_upload_chunks(sender, instance, **kwargs):
+    from .uploads import discard_chunks
+    discard_chunks(instance)
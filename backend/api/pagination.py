@@ -0,0 +1,187 @@
+import base64
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import connections
+from django.db.models import Q
+from django.urls import reverse
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def encode_cursor(values):
+    """Encode the ordering values of the last row of a page as an opaque token"""
+    raw = json.dumps([value.isoformat() if hasattr(value, 'isoformat') else value for value in values])
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(token, model, fields):
+    """Decode a cursor token back into typed ordering values for ``fields``"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(token.encode('ascii')).decode('utf-8'))
+    except (TypeError, ValueError, UnicodeError):
+        raise NotFound('Invalid cursor')
+    if not isinstance(values, list) or len(values) != len(fields):
+        raise NotFound('Invalid cursor')
+
+    decoded = []
+    for field_name, value in zip(fields, values):
+        try:
+            field = model._meta.get_field(field_name)
+        except FieldDoesNotExist:
+            # Annotations (e.g. scores) are stored as plain JSON numbers
+            decoded.append(value)
+            continue
+        try:
+            decoded.append(field.to_python(value))
+        except ValidationError:
+            raise NotFound('Invalid cursor')
+    return decoded
+
+
+def keyset_filter(ordering, values):
+    """Build the WHERE clause selecting rows strictly after ``values``.
+
+    For ordering (a, b) this is ``a > x OR (a = x AND b > y)``, with the
+    comparison flipped for descending fields.
+    """
+    condition = Q()
+    for index, term in enumerate(ordering):
+        field_name = term.lstrip('-')
+        lookup = 'lt' if term.startswith('-') else 'gt'
+        clause = Q(**{f'{field_name}__{lookup}': values[index]})
+        for previous, value in zip(ordering[:index], values[:index]):
+            clause &= Q(**{previous.lstrip('-'): value})
+        condition |= clause
+    return condition
+
+
+class KeysetPagination(BasePagination):
+    """Forward-only cursor pagination on a unique ordering such as
+    ('-created_at', '-id'). Pages are fetched with a WHERE clause on the last
+    seen row instead of OFFSET, and no COUNT(*) is issued."""
+    ordering = ('-created_at', '-id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+
+    def __init__(self, ordering=None, page_size=None):
+        if ordering is not None:
+            self.ordering = tuple(ordering)
+        if page_size is not None:
+            self.page_size = page_size
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.fields = [term.lstrip('-') for term in self.ordering]
+        size = self.get_page_size(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        token = request.query_params.get(self.cursor_query_param)
+        if token:
+            values = decode_cursor(token, queryset.model, self.fields)
+            queryset = queryset.filter(keyset_filter(self.ordering, values))
+
+        # Fetch one extra row to know whether another page exists
+        rows = list(queryset[:size + 1])
+        self.has_next = len(rows) > size
+        self.page = rows[:size]
+        return self.page
+
+    def get_next_cursor(self):
+        if not self.has_next or not self.page:
+            return None
+        last = self.page[-1]
+        if isinstance(last, dict):
+            # Pages of .values() rows
+            return encode_cursor([last[field] for field in self.fields])
+        return encode_cursor([getattr(last, field) for field in self.fields])
+
+    def get_next_link(self):
+        cursor = self.get_next_cursor()
+        if cursor is None:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+def estimate_count(queryset):
+    """Row estimate from the PostgreSQL planner, which costs no scan.
+    Other databases fall back to an exact COUNT(*)."""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class CountingKeysetPagination(KeysetPagination):
+    """KeysetPagination that can also report the size of the whole result set.
+    ``?count=exact`` runs a COUNT(*), ``?count=estimate`` asks the query
+    planner; by default no count is returned."""
+    count_query_param = 'count'
+    
+    def paginate_queryset(self, queryset, request, view=None):
+        mode = request.query_params.get(self.count_query_param)
+        if mode == 'exact':
+            self.count = queryset.count()
+        elif mode == 'estimate':
+            self.count = estimate_count(queryset)
+        else:
+            self.count = None
+        return super().paginate_queryset(queryset, request, view)
+    
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        if self.count is not None:
+            response.data['count'] = self.count
+            response.data.move_to_end('count', last=False)
+        return response
+    
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count'] = {'type': 'integer', 'nullable': True}
+        return response_schema
+
+
+def replies_link(request, comment_id, cursor=None):
+    """Absolute URL of the "load more replies" page for a comment thread"""
+    url = request.build_absolute_uri(reverse('comment_replies', args=[comment_id]))
+    # Carry the thread shape options over so deeper pages render the same way
+    for param in ('depth', 'replies'):
+        if param in request.query_params:
+            url = replace_query_param(url, param, request.query_params[param])
+    if cursor is not None:
+        url = replace_query_param(url, 'cursor', cursor)
+    return url
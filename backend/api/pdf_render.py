@@ -0,0 +1,201 @@
+"""
+PDF page rendering for slideshow conversion.
+
+Pages are rendered with PyMuPDF and each pixmap is written straight to disk
+in the output format, with no PIL decode/re-encode in between. Decks large
+enough to be worth it are split into contiguous ranges of RANGE_PAGES pages,
+rendered by a pool of worker processes that open the document once per
+range. ``iter_pages`` hands pages back in order as they are ready and keeps
+only a couple of ranges per worker in flight, so the pages waiting on disk
+stay bounded whatever the size of the deck.
+
+With ``derivatives`` each page also gets a mid-size preview and a small
+thumbnail, downscaled from the rendered pixmap in the same worker, and
+``ThumbnailStrip`` packs the thumbnails into one sprite for the slide rail.
+
+This module must not import Django: worker processes are spawned fresh and
+only import what they need to render.
+"""
+
+import math
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import fitz  # PyMuPDF for PDF processing
+from PIL import Image, ImageOps, features
+
+# 2x zoom renders slides at 144 dpi
+ZOOM = 2.0
+
+# Pages per task handed to a worker process. Decks of fewer than two ranges
+# are rendered in-process; starting a worker costs more than a few pages.
+RANGE_PAGES = 4
+
+# Ranges queued or rendering per worker
+RANGES_IN_FLIGHT = 2
+
+# Smaller copies of each page, largest first: name -> maximum width. They are
+# WebP where Pillow supports it and JPEG otherwise.
+DERIVATIVE_WIDTHS = {'preview': 960, 'thumbnail': 240}
+DERIVATIVE_FORMAT, DERIVATIVE_EXTENSION = ('WEBP', 'webp') if features.check('webp') else ('JPEG', 'jpg')
+DERIVATIVE_QUALITY = 80
+
+# Thumbnail strip: tile width, tiles per row and how many pages it covers
+STRIP_TILE_WIDTH = 160
+STRIP_COLUMNS = 10
+STRIP_MAX_TILES = 300
+
+
+def page_count(pdf_path):
+    with fitz.open(pdf_path) as doc:
+        return len(doc)
+
+
+def page_ranges(total, parts):
+    """Split pages 0..total-1 into ``parts`` contiguous (start, stop) ranges of near-equal size"""
+    parts = max(min(parts, total), 1)
+    size, extra = divmod(total, parts)
+    ranges = []
+    start = 0
+    for index in range(parts):
+        stop = start + size + (1 if index < extra else 0)
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def page_filename(page_number, fmt='png'):
+    """File name of a 0-based page"""
+    return f'slide_{page_number + 1}.{fmt}'
+
+
+def scaled_width(width, max_width):
+    return min(width, max_width)
+
+
+def write_derivatives(pix, page_number, output_dir):
+    """Save downscaled copies of a rendered page; returns their paths by name"""
+    image = Image.frombytes('RGB', (pix.width, pix.height), pix.samples)
+    paths = {}
+    for name, max_width in DERIVATIVE_WIDTHS.items():
+        # Each copy is scaled down from the previous, larger one
+        width = scaled_width(image.width, max_width)
+        if width < image.width:
+            image = image.resize((width, max(round(image.height * width / image.width), 1)), Image.LANCZOS)
+        path = os.path.join(output_dir, f'slide_{page_number + 1}_{name}.{DERIVATIVE_EXTENSION}')
+        image.save(path, DERIVATIVE_FORMAT, quality=DERIVATIVE_QUALITY)
+        paths[name] = path
+    return paths
+
+
+def render_range(pdf_path, start, stop, output_dir, zoom=ZOOM, fmt='png', derivatives=False):
+    """Render pages start..stop-1 into ``output_dir``.
+
+    Returns a dict per page, in page order: the rendered ``image`` path, its
+    ``width`` and ``height``, and with ``derivatives`` the path of each copy
+    in DERIVATIVE_WIDTHS.
+    """
+    matrix = fitz.Matrix(zoom, zoom)
+    pages = []
+    with fitz.open(pdf_path) as doc:
+        for page_number in range(start, stop):
+            pix = doc.load_page(page_number).get_pixmap(matrix=matrix, alpha=False)
+            path = os.path.join(output_dir, page_filename(page_number, fmt))
+            pix.save(path, output=fmt)
+            page = {'image': path, 'width': pix.width, 'height': pix.height}
+            if derivatives:
+                page.update(write_derivatives(pix, page_number, output_dir))
+            pages.append(page)
+    return pages
+
+
+def workers_for(total, workers):
+    """Worker processes worth starting for a ``total``-page deck"""
+    return max(min(workers, total // RANGE_PAGES), 1)
+
+
+def iter_pages(pdf_path, output_dir, workers=1, zoom=ZOOM, fmt='png', derivatives=False):
+    """Render every page of a PDF into ``output_dir``, yielding (page_number, page)
+    in page order as soon as each page is ready; ``page`` is as returned by
+    render_range.
+
+    The caller owns the files and should remove them when done with a page.
+    With more than one worker, at most RANGES_IN_FLIGHT ranges per worker
+    are rendered ahead of the page being consumed.
+    """
+    total = page_count(pdf_path)
+    workers = workers_for(total, workers)
+    if workers == 1:
+        for page_number in range(total):
+            yield page_number, render_range(pdf_path, page_number, page_number + 1, output_dir, zoom, fmt, derivatives)[0]
+        return
+
+    ranges = iter(page_ranges(total, math.ceil(total / RANGE_PAGES)))
+    # Spawned rather than forked: the job worker calling this runs several threads
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        in_flight = deque()
+
+        def submit_next():
+            page_range = next(ranges, None)
+            if page_range is not None:
+                future = pool.submit(render_range, pdf_path, *page_range, output_dir, zoom, fmt, derivatives)
+                in_flight.append((page_range[0], future))
+
+        for _ in range(workers * RANGES_IN_FLIGHT):
+            submit_next()
+        while in_flight:
+            start, future = in_flight.popleft()
+            pages = future.result()
+            submit_next()
+            for offset, page in enumerate(pages):
+                yield start + offset, page
+
+
+def render_pages(pdf_path, output_dir, workers=1, zoom=ZOOM, fmt='png', progress=None):
+    """Render every page of a PDF into ``output_dir``; returns the paths in page order.
+    ``progress(done, total)`` is called after each page."""
+    total = page_count(pdf_path)
+    paths = []
+    for _, page in iter_pages(pdf_path, output_dir, workers, zoom, fmt):
+        paths.append(page['image'])
+        if progress:
+            progress(len(paths), total)
+    return paths
+
+
+class ThumbnailStrip:
+    """One sprite image holding the thumbnails of a deck's first STRIP_MAX_TILES pages.
+
+    Tiles are STRIP_TILE_WIDTH wide, as tall as the first page's aspect ratio
+    makes them, and laid out STRIP_COLUMNS to a row; pages of another shape
+    are fitted and centred in their tile.
+    """
+
+    def __init__(self, total):
+        self.count = min(total, STRIP_MAX_TILES)
+        self.tile_height = 0
+        self.canvas = None
+
+    def add(self, page_number, thumbnail_path):
+        if page_number >= self.count:
+            return
+        with Image.open(thumbnail_path) as thumbnail:
+            if self.canvas is None:
+                self.tile_height = max(round(thumbnail.height * STRIP_TILE_WIDTH / thumbnail.width), 1)
+                rows = math.ceil(self.count / STRIP_COLUMNS)
+                size = (STRIP_TILE_WIDTH * min(self.count, STRIP_COLUMNS), self.tile_height * rows)
+                self.canvas = Image.new('RGB', size, 'white')
+            tile = ImageOps.contain(thumbnail.convert('RGB'), (STRIP_TILE_WIDTH, self.tile_height), Image.LANCZOS)
+        x = (page_number % STRIP_COLUMNS) * STRIP_TILE_WIDTH + (STRIP_TILE_WIDTH - tile.width) // 2
+        y = (page_number // STRIP_COLUMNS) * self.tile_height + (self.tile_height - tile.height) // 2
+        self.canvas.paste(tile, (x, y))
+
+    def save(self, path):
+        """Write the strip; returns False if no thumbnail was added"""
+        if self.canvas is None:
+            return False
+        self.canvas.save(path, DERIVATIVE_FORMAT, quality=DERIVATIVE_QUALITY)
+        return True
@@ -0,0 +1,96 @@
+"""
+Project access checks.
+
+The ids of projects a user authored or is a member of are cached per user
+in the Django cache for PROJECT_ACCESS_CACHE_TTL seconds, so checks on hot
+paths are set lookups rather than membership queries. The receivers in
+models.py drop the entries of the users a membership or authored project
+granted access to, before and after the change. Bulk writes, which send no
+signals, call invalidate_project_access themselves. A TTL of 0 turns the
+cache off, the default when the cache is per process (CACHE_BACKEND=locmem)
+and one worker could not drop another's entries.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Project, ProjectMember
+
+
+def _access_key(user_id):
+    return f'project-access:{user_id}'
+
+
+def project_access(user):
+    """``{'accessible': ids, 'manageable': ids}`` for an authenticated user"""
+    key = _access_key(user.id)
+    ttl = settings.PROJECT_ACCESS_CACHE_TTL
+    access = cache.get(key) if ttl else None
+    if access is None:
+        authored = set(Project.objects.filter(author=user).values_list('id', flat=True))
+        memberships = list(ProjectMember.objects.filter(user=user).values_list('project_id', 'role'))
+        access = {
+            'accessible': authored | {project_id for project_id, _ in memberships},
+            'manageable': authored | {project_id for project_id, role in memberships if role == 'Manage'},
+        }
+        if ttl:
+            cache.set(key, access, ttl)
+    return access
+
+
+def invalidate_project_access(*user_ids):
+    """Drop the users' cached access now and again once the transaction
+    commits, so a request that cached the old rows meanwhile can't keep them"""
+    keys = [_access_key(user_id) for user_id in set(user_ids) if user_id is not None]
+    if keys:
+        cache.delete_many(keys)
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def _access_owner_field(model):
+    return 'author_id' if model is Project else 'user_id'
+
+
+def remember_access_owner(instance, update_fields=None):
+    """pre_save: note who a project or membership row granted access to before it is overwritten"""
+    field = _access_owner_field(type(instance))
+    if instance._state.adding or (update_fields is not None and not {field, field[:-3]} & set(update_fields)):
+        instance._access_owner = None
+    else:
+        instance._access_owner = type(instance).objects.filter(pk=instance.pk).values_list(field, flat=True).first()
+
+
+def access_changed(instance):
+    """post_save/post_delete: drop the access of the row's current and previous user"""
+    previous = getattr(instance, '_access_owner', None)
+    invalidate_project_access(getattr(instance, _access_owner_field(type(instance))), previous)
+
+
+def can_manage_project(user, project):
+    """Authors, staff and members with the Manage role may edit a project"""
+    if not user.is_authenticated:
+        return False
+    if user.is_staff or project.author_id == user.id:
+        return True
+    return project.id in project_access(user)['manageable']
+
+
+def can_view_project(user, project):
+    """Published projects are public; private ones are visible to their members,
+    drafts and pending projects only to their author and staff"""
+    if project.status == 'published':
+        return True
+    if not user.is_authenticated:
+        return False
+    if user.is_staff or project.author_id == user.id:
+        return True
+    if project.status == 'private':
+        return project.id in project_access(user)['accessible']
+    return False
+
+
+def view_denied_message(project):
+    if project.status == 'private':
+        return 'This project is private and you are not a member.'
+    return 'This project is not published.'
@@ -0,0 +1,228 @@
+"""
+Read-only serialization straight from ``.values()`` rows.
+
+Building a list through a ModelSerializer costs a model instance per row and
+per related object, plus a field lookup chain and an OrderedDict for every
+nested object. The classes here select just the columns a response needs
+with ``.values()`` and build plain dicts of exactly the shape
+ProjectListSerializer, MessageSerializer and BookmarkSerializer produce, so
+the hot list endpoints can skip both. They must be kept in step with those
+serializers.
+"""
+
+from rest_framework import serializers
+
+from .images import IMAGE_VARIANTS, stored_variant_urls
+from .models import Project, UserProfile
+from .serializers import ProjectListSerializer, requested_fields, truncate_chars
+
+_datetime = serializers.DateTimeField()
+_avatar = UserProfile._meta.get_field('avatar')
+_cover_image = Project._meta.get_field('cover_image')
+
+
+def file_url(field, name):
+    """URL of a stored file, as FieldFile.url would build it"""
+    return field.storage.url(name) if name else None
+
+
+def avatar_variant_urls(name, variants):
+    return stored_variant_urls(_avatar.storage, IMAGE_VARIANTS['UserProfile', 'avatar'], name, variants)
+
+
+def format_datetime(value):
+    return _datetime.to_representation(value)
+
+
+class Rows:
+    """Base class: ``columns()`` to select, ``to_representation(row)`` to build.
+    ``prefix`` is the lookup path when the object is nested in another row."""
+
+    def __init__(self, prefix=''):
+        self.prefix = prefix
+
+    def column(self, name):
+        return self.prefix + name
+
+    def columns(self):
+        raise NotImplementedError
+
+    def to_representation(self, row):
+        raise NotImplementedError
+
+    def values(self, queryset, *extra):
+        """``queryset.values()`` with the needed columns plus ``extra`` ones"""
+        columns = self.columns()
+        return queryset.values(*columns, *(name for name in extra if name not in columns))
+
+    def data(self, rows):
+        return [self.to_representation(row) for row in rows]
+
+
+class UserRows(Rows):
+    """UserSerializer output, or UserCardSerializer output when ``card``"""
+    user_fields = ['id', 'username', 'email', 'first_name', 'last_name', 'date_joined']
+    profile_fields = ['bio', 'location', 'skills', 'education', 'companies']
+
+    def __init__(self, prefix='', card=False):
+        super().__init__(prefix)
+        self.card = card
+
+    def columns(self):
+        if self.card:
+            return [
+                self.column('id'), self.column('username'), self.column('profile__avatar'),
+                self.column('profile__avatar_variants'),
+            ]
+        return (
+            [self.column(name) for name in self.user_fields + ['is_staff', 'is_active', 'profile__id']]
+            + [self.column(f'profile__{name}') for name in self.profile_fields + ['avatar', 'avatar_variants']]
+        )
+
+    def to_representation(self, row):
+        column = self.column
+        if row[column('id')] is None:
+            # Nullable foreign key
+            return None
+        if self.card:
+            return {
+                'id': row[column('id')],
+                'username': row[column('username')],
+                'avatar': file_url(_avatar, row[column('profile__avatar')]),
+                'avatar_variants': avatar_variant_urls(
+                    row[column('profile__avatar')], row[column('profile__avatar_variants')],
+                ),
+            }
+        user = {name: row[column(name)] for name in self.user_fields}
+        user['date_joined'] = format_datetime(user['date_joined'])
+        user['profile'] = None
+        if row[column('profile__id')] is not None:
+            user['profile'] = {
+                'bio': row[column('profile__bio')],
+                'skills': row[column('profile__skills')] or [],
+                'location': row[column('profile__location')],
+                'avatar': file_url(_avatar, row[column('profile__avatar')]),
+                'avatar_variants': avatar_variant_urls(
+                    row[column('profile__avatar')], row[column('profile__avatar_variants')],
+                ),
+                'education': row[column('profile__education')],
+                'companies': row[column('profile__companies')],
+            }
+        user['is_staff'] = row[column('is_staff')]
+        user['is_active'] = row[column('is_active')]
+        return user
+
+
+class ProjectCardRows(Rows):
+    """ProjectListSerializer output, honouring ``?fields=`` and ``?expand=``"""
+    plain_fields = {
+        'id': 'id', 'title': 'title', 'difficulty': 'difficulty', 'status': 'status',
+        'comments_count': 'comment_count', 'bookmarks_count': 'bookmark_count',
+        'story_content': 'story_content',
+    }
+    truncated_fields = {
+        name: ProjectListSerializer._declared_fields[name].length for name in ('description', 'elevator_pitch')
+    }
+
+    def __init__(self, request=None, prefix=''):
+        super().__init__(prefix)
+        declared = ProjectListSerializer.Meta.fields
+        expand = requested_fields(request, 'expand') & set(ProjectListSerializer.expandable_fields)
+        only = requested_fields(request, 'fields')
+        names = list(declared) + sorted(expand - set(declared))
+        self.names = [name for name in names if name in only] if only else names
+        self.expand = expand
+        self.author = UserRows(self.column('author__'), card='author' not in expand)
+
+    def field_columns(self, name):
+        if name in self.plain_fields:
+            return [self.column(self.plain_fields[name])]
+        if name == 'author':
+            return self.author.columns()
+        if name == 'category':
+            return [self.column('category_id'), self.column('category__name')]
+        if name == 'cover_image_variants':
+            return [self.column('cover_image'), self.column('cover_image_variants')]
+        return [self.column(name)]
+
+    def columns(self):
+        # The cover and its variants share a column
+        return list(dict.fromkeys(column for name in self.names for column in self.field_columns(name)))
+
+    def field_value(self, name, row):
+        column = self.column
+        if name in self.plain_fields:
+            return row[column(self.plain_fields[name])]
+        if name in self.truncated_fields:
+            value = row[column(name)]
+            return value if name in self.expand else truncate_chars(value, self.truncated_fields[name])
+        if name == 'author':
+            return self.author.to_representation(row)
+        if name == 'category':
+            return {'id': row[column('category_id')], 'name': row[column('category__name')]}
+        if name == 'cover_image':
+            return file_url(_cover_image, row[column('cover_image')])
+        if name == 'cover_image_variants':
+            return stored_variant_urls(
+                _cover_image.storage, IMAGE_VARIANTS['Project', 'cover_image'],
+                row[column('cover_image')], row[column('cover_image_variants')],
+            )
+        if name == 'created_at':
+            return format_datetime(row[column('created_at')])
+        raise KeyError(name)
+
+    def to_representation(self, row):
+        return {name: self.field_value(name, row) for name in self.names}
+
+
+class MessageRows(Rows):
+    """MessageSerializer output"""
+
+    def __init__(self, prefix=''):
+        super().__init__(prefix)
+        self.sender = UserRows(self.column('sender__'))
+        self.recipient = UserRows(self.column('recipient__'))
+
+    def columns(self):
+        return (
+            [self.column('id')] + self.sender.columns() + self.recipient.columns()
+            + [self.column(name) for name in (
+                'message_type', 'title', 'content', 'related_project_id', 'related_comment_id',
+                'is_read', 'created_at',
+            )]
+        )
+
+    def to_representation(self, row):
+        column = self.column
+        return {
+            'id': row[column('id')],
+            'sender': self.sender.to_representation(row),
+            'recipient': self.recipient.to_representation(row),
+            'message_type': row[column('message_type')],
+            'title': row[column('title')],
+            'content': row[column('content')],
+            'related_project': row[column('related_project_id')],
+            'related_comment': row[column('related_comment_id')],
+            'is_read': row[column('is_read')],
+            'created_at': format_datetime(row[column('created_at')]),
+        }
+
+
+class BookmarkRows(Rows):
+    """BookmarkSerializer output; the request shapes the nested project card"""
+
+    def __init__(self, request=None, prefix=''):
+        super().__init__(prefix)
+        self.user = UserRows(self.column('user__'))
+        self.project = ProjectCardRows(request, self.column('project__'))
+
+    def columns(self):
+        return [self.column('id')] + self.user.columns() + self.project.columns() + [self.column('created_at')]
+
+    def to_representation(self, row):
+        return {
+            'id': row[self.column('id')],
+            'user': self.user.to_representation(row),
+            'project': self.project.to_representation(row),
+            'created_at': format_datetime(row[self.column('created_at')]),
+        }
@@ -0,0 +1,195 @@
+"""
+Full-text search over projects.
+
+On PostgreSQL every project keeps a weighted tsvector in the
+``Project.search_vector`` column, GIN-indexed by SearchVectorIndex. On SQLite
+(``USE_SQLITE``) the same document is stored in the ``api_project_search``
+FTS5 virtual table instead. Either way the index is refreshed from the
+``post_save`` / ``post_delete`` signals in models.py and can be rebuilt with
+``manage.py rebuild_search_index``.
+"""
+
+import re
+
+from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank, SearchVector
+from django.db import connection as default_connection
+from django.db.models import F, FloatField, Index, TextField, Value
+from django.db.models.expressions import RawSQL
+from django.utils.html import strip_tags
+
+HIGHLIGHT_START = '<mark>'
+HIGHLIGHT_STOP = '</mark>'
+
+# Column order of the FTS5 table; bm25 weights mirror Postgres' A/B/C/D weights
+FTS_TABLE = 'api_project_search'
+FTS_COLUMNS = ['title', 'summary', 'description', 'story']
+FTS_WEIGHTS = [10.0, 4.0, 2.0, 1.0]
+
+
+def query_terms(query):
+    """Words of a user query. Both backends AND these together as prefix
+    matches, and only ever see plain word characters, so user input can't be
+    parsed as tsquery/FTS5 syntax."""
+    return re.findall(r'\w+', query)
+
+
+def project_document(project):
+    """Indexed text for a project, keyed by ranking weight (A is strongest)"""
+    return {
+        'A': project.title,
+        'B': ' '.join([project.elevator_pitch, project.author.username, project.category.name]),
+        'C': project.description,
+        'D': strip_tags(project.story_content),
+    }
+
+
+class SearchVectorIndex(GinIndex):
+    """GIN index on a tsvector column (declared in Project.Meta.indexes).
+
+    Other databases have no GIN; there the column stays empty and a plain
+    index is created instead, so the same migrations run on SQLite.
+    """
+
+    def create_sql(self, model, schema_editor, using='', **kwargs):
+        if schema_editor.connection.vendor != 'postgresql':
+            return Index.create_sql(self, model, schema_editor, using=using, **kwargs)
+        return super().create_sql(model, schema_editor, using=using, **kwargs)
+
+
+class PostgresSearchBackend:
+    """tsvector/tsquery search ranked with ts_rank and highlighted with ts_headline"""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def setup(self):
+        # The GIN index is part of the schema (Project.Meta.indexes)
+        pass
+
+    def teardown(self):
+        pass
+
+    def index_project(self, project):
+        vector = None
+        for weight, text in project_document(project).items():
+            part = SearchVector(
+                Value(text, output_field=TextField()),
+                weight=weight,
+                config=settings.SEARCH_TEXT_CONFIG,
+            )
+            vector = part if vector is None else vector + part
+        type(project)._default_manager.filter(pk=project.pk).update(search_vector=vector)
+
+    def remove_project(self, project_id):
+        # The vector lives on the project row and is deleted with it
+        pass
+
+    def _query(self, query):
+        terms = query_terms(query)
+        if not terms:
+            return None
+        return SearchQuery(
+            ' & '.join(f'{term}:*' for term in terms),
+            search_type='raw',
+            config=settings.SEARCH_TEXT_CONFIG,
+        )
+
+    def filter(self, queryset, query):
+        search_query = self._query(query)
+        if search_query is None:
+            return queryset.none()
+        return queryset.filter(search_vector=search_query)
+
+    def rank(self, queryset, query):
+        search_query = self._query(query)
+        if search_query is None:
+            return queryset.none()
+        return queryset.filter(search_vector=search_query).annotate(
+            search_rank=SearchRank(F('search_vector'), search_query),
+            search_snippet=SearchHeadline(
+                'description',
+                search_query,
+                config=settings.SEARCH_TEXT_CONFIG,
+                start_sel=HIGHLIGHT_START,
+                stop_sel=HIGHLIGHT_STOP,
+                max_words=35,
+                min_words=15,
+            ),
+        ).order_by('-search_rank', '-created_at', '-id')
+
+
+class SQLiteSearchBackend:
+    """FTS5 fallback ranked with bm25() and highlighted with snippet()"""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def setup(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} "
+                f"USING fts5({', '.join(FTS_COLUMNS)}, tokenize='porter unicode61')"
+            )
+
+    def teardown(self):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+    def index_project(self, project):
+        document = project_document(project)
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [project.pk])
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(FTS_COLUMNS)}) VALUES (%s, %s, %s, %s, %s)",
+                [project.pk, document['A'], document['B'], document['C'], document['D']],
+            )
+
+    def remove_project(self, project_id):
+        with self.connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [project_id])
+
+    def _match(self, query):
+        terms = query_terms(query)
+        if not terms:
+            return None
+        return ' '.join(f'"{term}"*' for term in terms)
+
+    def filter(self, queryset, query):
+        match = self._match(query)
+        if match is None:
+            return queryset.none()
+        return queryset.filter(
+            id__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match])
+        )
+
+    def rank(self, queryset, query):
+        match = self._match(query)
+        if match is None:
+            return queryset.none()
+        table = queryset.model._meta.db_table
+        weights = ', '.join(str(weight) for weight in FTS_WEIGHTS)
+        lookup = f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s AND {FTS_TABLE}.rowid = {table}.id'
+        snippet_column = FTS_COLUMNS.index('description')
+        return self.filter(queryset, query).annotate(
+            # bm25() is lower-is-better; negate it to sort like ts_rank
+            search_rank=RawSQL(
+                f'SELECT -bm25({FTS_TABLE}, {weights}) {lookup}', [match], output_field=FloatField()
+            ),
+            search_snippet=RawSQL(
+                f"SELECT snippet({FTS_TABLE}, {snippet_column}, %s, %s, '…', 24) {lookup}",
+                [HIGHLIGHT_START, HIGHLIGHT_STOP, match],
+                output_field=TextField(),
+            ),
+        ).order_by('-search_rank', '-created_at', '-id')
+
+
+def get_search_backend(connection=None):
+    """Search backend matching the vendor of ``connection`` (default database)"""
+    connection = connection or default_connection
+    if connection.vendor == 'postgresql':
+        return PostgresSearchBackend(connection)
+    if connection.vendor == 'sqlite':
+        return SQLiteSearchBackend(connection)
+    raise NotImplementedError(f'Full-text search is not supported on {connection.vendor}')
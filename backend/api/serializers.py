@@ -1,11 +1,24 @@
 from rest_framework import serializers
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from django.utils.functional import cached_property
+from django.utils.text import Truncator
+from collections import defaultdict
 import json
+import unicodedata
 from .models import (
     Category, Project, Component, Step, Comment, 
     ProjectMember, WorkAttribution, BillOfMaterialItem, Attachment, UserProfile, Message, Bookmark,
-    ProjectSlideshow, SlideshowSlide
+    ProjectSlideshow, SlideshowSlide, CatalogComponent, Upload
 )
+from .catalog import attach_components, component_key, release_components
+from .images import queue_processing, variant_urls
+from .pagination import encode_cursor, replies_link
+from .pdf_render import DERIVATIVE_WIDTHS, STRIP_COLUMNS, STRIP_MAX_TILES, STRIP_TILE_WIDTH, scaled_width
+from .permissions import invalidate_project_access
 
 class SkillsField(serializers.Field):
     """Custom field to handle skills as comma-separated string input, JSON array storage"""
@@ -24,16 +37,20 @@ class SkillsField(serializers.Field):
 class UserProfileSerializer(serializers.ModelSerializer):
     skills = SkillsField(required=False)
     avatar = serializers.SerializerMethodField()
+    avatar_variants = serializers.SerializerMethodField()
     
     class Meta:
         model = UserProfile
-        fields = ['bio', 'skills', 'location', 'avatar', 'education', 'companies']
+        fields = ['bio', 'skills', 'location', 'avatar', 'avatar_variants', 'education', 'companies']
     
     def get_avatar(self, obj):
         if obj.avatar:
             return obj.avatar.url
         return None
     
+    def get_avatar_variants(self, obj):
+        return variant_urls(obj, 'avatar')
+    
     def to_internal_value(self, data):
         # Handle JSON fields from form data
         data = data.copy() if isinstance(data, dict) else data
@@ -114,22 +131,107 @@ class ComponentSerializer(serializers.ModelSerializer):
 class StepSerializer(serializers.ModelSerializer):
     """Serializer for Step model"""
     image = serializers.SerializerMethodField()
+    image_variants = serializers.SerializerMethodField()
     
     class Meta:
         model = Step
-        fields = ['id', 'step_number', 'title', 'instructions', 'image']
+        fields = ['id', 'step_number', 'title', 'instructions', 'image', 'image_variants']
     
     def get_image(self, obj):
         if obj.image:
             return obj.image.url
         return None
+    
+    def get_image_variants(self, obj):
+        return variant_urls(obj, 'image')
+
+
+class CommentTree:
+    """All comments of a project loaded with one flat query and grouped by parent_id"""
+    
+    def __init__(self, queryset):
+        self.queryset = queryset
+    
+    @classmethod
+    def for_project(cls, project_id):
+        return cls(
+            Comment.objects.filter(project_id=project_id)
+            .select_related('author__profile')
+            .order_by('created_at', 'id')
+        )
+    
+    @cached_property
+    def comments(self):
+        return list(self.queryset)
+    
+    @cached_property
+    def children(self):
+        # Single pass over the flat list; replies keep oldest-first order
+        children = defaultdict(list)
+        for comment in self.comments:
+            children[comment.parent_id].append(comment)
+        return children
+    
+    def replies(self, comment):
+        return self.children.get(comment.id, [])
+    
+    def reply_count(self, comment):
+        return len(self.replies(comment))
+
+
+class CommentThreadSlice:
+    """A page of comments with only the first few replies of each thread.
+
+    Levels are loaded one query at a time down to ``depth``; a window function
+    keeps at most ``replies_per_thread`` replies per parent, oldest first.
+    Exposes the same replies()/reply_count() interface as CommentTree.
+    """
+    
+    def __init__(self, comments, depth, replies_per_thread):
+        self.children = defaultdict(list)
+        self.counts = {}
+        level = list(comments)
+        for comment in level:
+            self.counts[comment.id] = comment.reply_count
+        
+        for _ in range(depth):
+            parent_ids = [comment.id for comment in level if self.counts[comment.id]]
+            if not parent_ids:
+                break
+            level = list(
+                Comment.objects.filter(parent_id__in=parent_ids)
+                .select_related('author__profile')
+                .annotate(thread_rank=Window(
+                    expression=RowNumber(),
+                    partition_by=[F('parent_id')],
+                    order_by=[F('created_at').asc(), F('id').asc()],
+                ))
+                .filter(thread_rank__lte=replies_per_thread)
+                .order_by('created_at', 'id')
+            )
+            for reply in level:
+                self.children[reply.parent_id].append(reply)
+                self.counts[reply.id] = reply.reply_count
+    
+    def replies(self, comment):
+        return self.children.get(comment.id, [])
+    
+    def reply_count(self, comment):
+        return self.counts.get(comment.id, 0)
+    
+    def has_more_replies(self, comment):
+        return self.reply_count(comment) > len(self.replies(comment))
 
 
 class CommentSerializer(serializers.ModelSerializer):
-    """Serializer for Comment model with recursive nested replies"""
+    """Serializer for Comment model with recursive nested replies.
+
+    When a ``comment_tree`` (CommentTree) is present in the context, replies and
+    reply counts are read from it instead of querying per node.
+    """
     author = UserSerializer(read_only=True)
     replies = serializers.SerializerMethodField()
-    reply_count = serializers.ReadOnlyField()
+    reply_count = serializers.SerializerMethodField()
     is_reply = serializers.ReadOnlyField()
     
     class Meta:
@@ -137,9 +239,23 @@ class CommentSerializer(serializers.ModelSerializer):
         fields = ['id', 'author', 'body', 'created_at', 'parent', 'replies', 'reply_count', 'is_reply']
     
     def get_replies(self, obj):
-        # Recursively serialize all replies
-        replies = obj.replies.all().order_by('created_at')
-        return CommentSerializer(replies, many=True, context=self.context).data
+        depth = self.context.get('comment_depth', 0)
+        if depth >= settings.COMMENT_TREE_MAX_DEPTH:
+            # Deeper replies are still reflected in reply_count
+            return []
+        tree = self.context.get('comment_tree')
+        if tree is not None:
+            replies = tree.replies(obj)
+        else:
+            replies = obj.replies.select_related('author__profile').order_by('created_at')
+        context = {**self.context, 'comment_depth': depth + 1}
+        return self.__class__(replies, many=True, context=context).data
+    
+    def get_reply_count(self, obj):
+        tree = self.context.get('comment_tree')
+        if tree is not None:
+            return tree.reply_count(obj)
+        return obj.reply_count
     
     def create(self, validated_data):
         # Set the author from the request
@@ -147,6 +263,23 @@ class CommentSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
+class CommentThreadSerializer(CommentSerializer):
+    """Comment with a bounded reply subtree (see CommentThreadSlice) and a
+    cursor link to fetch the replies that were left out"""
+    replies_next = serializers.SerializerMethodField()
+    
+    class Meta(CommentSerializer.Meta):
+        fields = CommentSerializer.Meta.fields + ['replies_next']
+    
+    def get_replies_next(self, obj):
+        tree = self.context['comment_tree']
+        if not tree.has_more_replies(obj):
+            return None
+        shown = tree.replies(obj)
+        cursor = encode_cursor([shown[-1].created_at, shown[-1].id]) if shown else None
+        return replies_link(self.context['request'], obj.id, cursor)
+
+
 class CommentReplySerializer(serializers.ModelSerializer):
     """Serializer for comment replies (simplified version)"""
     author = UserSerializer(read_only=True)
@@ -171,51 +304,103 @@ class MessageSerializer(serializers.ModelSerializer):
         ]
 
 
+class ProjectMemberListSerializer(serializers.ListSerializer):
+    """Checks a whole submitted member list against the users table in one query"""
+    
+    def validate(self, attrs):
+        user_ids = [item['user_id'] for item in attrs]
+        if len(set(user_ids)) != len(user_ids):
+            raise serializers.ValidationError("Each user can be listed only once.")
+        missing = set(user_ids) - set(User.objects.filter(pk__in=user_ids).values_list('pk', flat=True))
+        if missing:
+            raise serializers.ValidationError(f"No user with id {min(missing)}.")
+        return attrs
+
+
 class ProjectMemberSerializer(serializers.ModelSerializer):
     """Serializer for ProjectMember model"""
+    # Optional on writes: identifies the existing row in diff-based nested updates
+    id = serializers.IntegerField(required=False)
     user = UserSerializer(read_only=True)
     user_id = serializers.IntegerField(write_only=True)
     role = serializers.CharField()
     
     class Meta:
         model = ProjectMember
-        fields = ['id', 'user', 'user_id', 'role', 'contribution', 'joined_at']
+        fields = ['id', 'user', 'user_id', 'role', 'contribution', 'position', 'joined_at']
+        read_only_fields = ['position']
+        list_serializer_class = ProjectMemberListSerializer
+    
+    def validate_user_id(self, value):
+        # Rows of a submitted list are checked together by the list serializer
+        if not isinstance(self.parent, serializers.ListSerializer) and not User.objects.filter(pk=value).exists():
+            raise serializers.ValidationError(f"No user with id {value}.")
+        return value
 
 
 class WorkAttributionSerializer(serializers.ModelSerializer):
     """Serializer for WorkAttribution model"""
+    id = serializers.IntegerField(required=False)
+    
     class Meta:
         model = WorkAttribution
-        fields = ['id', 'contributor_name', 'credit_description', 'link', 'created_at']
+        fields = ['id', 'contributor_name', 'credit_description', 'link', 'position', 'created_at']
+        read_only_fields = ['position']
 
 
 class BillOfMaterialItemSerializer(serializers.ModelSerializer):
     """Serializer for BillOfMaterialItem model"""
+    id = serializers.IntegerField(required=False)
     image = serializers.SerializerMethodField()
+    image_variants = serializers.SerializerMethodField()
     
     class Meta:
         model = BillOfMaterialItem
         fields = [
             'id', 'item_type', 'name', 'description', 'quantity', 
-            'image', 'link', 'created_at'
+            'image', 'image_variants', 'link', 'position', 'created_at'
         ]
+        read_only_fields = ['position']
     
     def get_image(self, obj):
         if obj.image:
             return obj.image.url
         return None
+    
+    def get_image_variants(self, obj):
+        return variant_urls(obj, 'image')
+    
+    def update(self, instance, validated_data):
+        old_key = component_key(instance)
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        if component_key(instance) != old_key:
+            # Move a renamed line to its new catalog component
+            release_components([instance])
+            attach_components([instance])
+        instance.save()
+        return instance
+
+
+class CatalogComponentSerializer(serializers.ModelSerializer):
+    """Serializer for deduplicated catalog components"""
+    class Meta:
+        model = CatalogComponent
+        fields = ['id', 'name', 'item_type', 'description', 'link', 'usage_count']
 
 
 class AttachmentSerializer(serializers.ModelSerializer):
     """Serializer for Attachment model"""
+    id = serializers.IntegerField(required=False)
     file_upload = serializers.SerializerMethodField()
     
     class Meta:
         model = Attachment
         fields = [
             'id', 'attachment_type', 'title', 'file_upload', 
-            'repository_link', 'description', 'created_at'
+            'repository_link', 'description', 'position', 'created_at'
         ]
+        read_only_fields = ['position']
     
     def get_file_upload(self, obj):
         if obj.file_upload:
@@ -223,34 +408,143 @@ class AttachmentSerializer(serializers.ModelSerializer):
         return None
 
 
-class ProjectListSerializer(serializers.ModelSerializer):
-    """Lightweight serializer for project lists"""
-    author = UserSerializer(read_only=True)
+def requested_fields(request, name):
+    """Names in a comma-separated ``?fields=`` / ``?expand=`` query parameter"""
+    if request is None:
+        return set()
+    value = request.query_params.get(name, '')
+    return {field.strip() for field in value.split(',') if field.strip()}
+
+
+class SparseFieldsMixin:
+    """Lets clients shape the response through the request's query string.
+    
+    ``?expand=a,b`` swaps the listed fields for the richer variants built by
+    ``expandable_fields`` and ``?fields=a,b`` keeps only the listed fields.
+    Fields are resolved when first accessed, so this also works on nested
+    serializers, which only see the request once bound to their parent.
+    """
+    expandable_fields = {}
+    
+    def get_fields(self):
+        fields = super().get_fields()
+        request = self.context.get('request')
+        for name in requested_fields(request, 'expand') & set(self.expandable_fields):
+            fields[name] = self.expandable_fields[name]()
+        only = requested_fields(request, 'fields')
+        if only:
+            fields = {name: field for name, field in fields.items() if name in only}
+        return fields
+
+
+def truncate_chars(value, length):
+    """``Truncator(value).chars(length)``, without its per-character scan for
+    text that already fits"""
+    text = unicodedata.normalize('NFC', value)
+    if len(text) <= length:
+        return text
+    return Truncator(text).chars(length)
+
+
+class TruncatedCharField(serializers.CharField):
+    """Read-only text cut to ``length`` characters on a word boundary"""
+    
+    def __init__(self, length, **kwargs):
+        self.length = length
+        super().__init__(read_only=True, **kwargs)
+    
+    def to_representation(self, value):
+        return truncate_chars(value, self.length)
+
+
+class UserCardSerializer(serializers.ModelSerializer):
+    """Just enough of a user to render a byline"""
+    avatar = serializers.SerializerMethodField()
+    avatar_variants = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = User
+        fields = ['id', 'username', 'avatar', 'avatar_variants']
+    
+    def get_avatar(self, obj):
+        profile = getattr(obj, 'profile', None)
+        if profile is not None and profile.avatar:
+            return profile.avatar.url
+        return None
+    
+    def get_avatar_variants(self, obj):
+        profile = getattr(obj, 'profile', None)
+        return variant_urls(profile, 'avatar') if profile is not None else None
+
+
+class ProjectListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """Compact project card for lists.
+    
+    Texts are truncated and the author is only a byline by default;
+    ``?expand=description,elevator_pitch,story_content,author`` returns them
+    in full.
+    """
+    author = UserCardSerializer(read_only=True)
     category = CategorySerializer(read_only=True)
     cover_image = serializers.SerializerMethodField()
-    comments_count = serializers.SerializerMethodField()
+    cover_image_variants = serializers.SerializerMethodField()
+    description = TruncatedCharField(200)
+    elevator_pitch = TruncatedCharField(140)
+    comments_count = serializers.IntegerField(source='comment_count', read_only=True)
+    bookmarks_count = serializers.IntegerField(source='bookmark_count', read_only=True)
+    
+    expandable_fields = {
+        'author': lambda: UserSerializer(read_only=True),
+        'description': lambda: serializers.CharField(read_only=True),
+        'elevator_pitch': lambda: serializers.CharField(read_only=True),
+        'story_content': lambda: serializers.CharField(read_only=True),
+    }
     
     class Meta:
         model = Project
         fields = [
-            'id', 'title', 'description', 'elevator_pitch', 'cover_image', 
-            'author', 'category', 'difficulty', 'status', 'created_at', 'comments_count', 'story_content'
+            'id', 'title', 'description', 'elevator_pitch', 'cover_image', 'cover_image_variants',
+            'author', 'category', 'difficulty', 'status', 'created_at', 'comments_count', 'bookmarks_count'
         ]
     
+    @staticmethod
+    def setup_eager_loading(queryset, request=None):
+        """Load authors, profiles and categories up front and skip the story
+        body unless the request expands it"""
+        queryset = queryset.select_related('author__profile', 'category')
+        if 'story_content' not in requested_fields(request, 'expand'):
+            queryset = queryset.defer('story_content')
+        return queryset
+    
     def get_cover_image(self, obj):
         if obj.cover_image:
             return obj.cover_image.url
         return None
     
-    def get_comments_count(self, obj):
-        return obj.comments.count()
+    def get_cover_image_variants(self, obj):
+        return variant_urls(obj, 'cover_image')
+    
+
+
+class ProjectSearchResultSerializer(ProjectListSerializer):
+    """Project card with its full-text rank and highlighted snippet"""
+    search_rank = serializers.FloatField(read_only=True)
+    search_snippet = serializers.CharField(read_only=True)
+    
+    class Meta(ProjectListSerializer.Meta):
+        fields = ProjectListSerializer.Meta.fields + ['search_rank', 'search_snippet']
 
 
-class ProjectDetailSerializer(serializers.ModelSerializer):
-    """Detailed serializer for individual projects with all related data"""
+class ProjectDetailSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """Detailed serializer for individual projects with all related data.
+    
+    ``?fields=`` limits the response (and the queries behind it) to the
+    listed fields.
+    """
     author = UserSerializer(read_only=True)
     category = CategorySerializer(read_only=True)
     cover_image = serializers.SerializerMethodField()
+    cover_image_variants = serializers.SerializerMethodField()
     
     # Related models
     team_members = ProjectMemberSerializer(many=True, read_only=True)
@@ -261,17 +555,18 @@ class ProjectDetailSerializer(serializers.ModelSerializer):
     # Legacy models for backward compatibility
     components = ComponentSerializer(many=True, read_only=True)
     steps = StepSerializer(many=True, read_only=True)
-    comments = CommentSerializer(many=True, read_only=True)
+    comments = serializers.SerializerMethodField()
     
-    comments_count = serializers.SerializerMethodField()
+    comments_count = serializers.IntegerField(source='comment_count', read_only=True)
+    bookmarks_count = serializers.IntegerField(source='bookmark_count', read_only=True)
     
     class Meta:
         model = Project
         fields = [
             'id', 'title', 'description', 'elevator_pitch', 'story_content',
-            'cover_image', 'author', 'category', 'difficulty', 'status', 'created_at', 'updated_at',
-            'team_members', 'work_attributions', 'bill_of_materials', 'attachments',
-            'components', 'steps', 'comments', 'comments_count'
+            'cover_image', 'cover_image_variants', 'author', 'category', 'difficulty', 'status', 'created_at',
+            'updated_at', 'team_members', 'work_attributions', 'bill_of_materials', 'attachments',
+            'components', 'steps', 'comments', 'comments_count', 'bookmarks_count'
         ]
     
     def get_cover_image(self, obj):
@@ -279,8 +574,14 @@ class ProjectDetailSerializer(serializers.ModelSerializer):
             return obj.cover_image.url
         return None
     
-    def get_comments_count(self, obj):
-        return obj.comments.count()
+    def get_cover_image_variants(self, obj):
+        return variant_urls(obj, 'cover_image')
+    
+    def get_comments(self, obj):
+        # Every comment of the project, newest first, each with its reply subtree
+        tree = CommentTree.for_project(obj.id)
+        context = {**self.context, 'comment_tree': tree}
+        return CommentSerializer(tree.comments[::-1], many=True, context=context).data
 
 
 class ProjectCreateUpdateSerializer(serializers.ModelSerializer):
@@ -296,6 +597,14 @@ class ProjectCreateUpdateSerializer(serializers.ModelSerializer):
     author_id = serializers.IntegerField(write_only=True, required=False)
     category_id = serializers.IntegerField(write_only=True)
     
+    # Nested data key -> (related name, fields matching existing rows sent without an id)
+    NESTED_RELATIONS = {
+        'team_members_data': ('team_members', ('user_id',)),
+        'work_attributions_data': ('work_attributions', ('contributor_name',)),
+        'bill_of_materials_data': ('bill_of_materials', ('item_type', 'name')),
+        'attachments_data': ('attachments', ('attachment_type', 'title')),
+    }
+    
     class Meta:
         model = Project
         fields = [
@@ -381,12 +690,13 @@ class ProjectCreateUpdateSerializer(serializers.ModelSerializer):
         if attachments_data is None:
             attachments_data = self._parse_flattened_list('attachments_data')
         
-        # Create project
-        project = Project.objects.create(**validated_data)
-        
-        # Create related objects
-        self._create_related_objects(project, team_members_data, work_attributions_data, 
-                                   bill_of_materials_data, attachments_data)
+        with transaction.atomic():
+            # Create project
+            project = Project.objects.create(**validated_data)
+            
+            # Create related objects
+            self._create_related_objects(project, team_members_data, work_attributions_data, 
+                                       bill_of_materials_data, attachments_data)
         
         return project
     
@@ -397,27 +707,92 @@ class ProjectCreateUpdateSerializer(serializers.ModelSerializer):
         bill_of_materials_data = validated_data.pop('bill_of_materials_data', None)
         attachments_data = validated_data.pop('attachments_data', None)
 
-        # Update main fields
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
-        instance.save()
+        with transaction.atomic():
+            # Update main fields
+            for attr, value in validated_data.items():
+                setattr(instance, attr, value)
+            instance.save()
 
-        # Only update nested fields if they are present in the PATCH data
-        if team_members_data is not None:
-            instance.team_members.all().delete()
-            self._create_team_members(instance, team_members_data)
-        if work_attributions_data is not None:
-            instance.work_attributions.all().delete()
-            self._create_work_attributions(instance, work_attributions_data)
-        if bill_of_materials_data is not None:
-            instance.bill_of_materials.all().delete()
-            self._create_bill_of_materials(instance, bill_of_materials_data)
-        if attachments_data is not None:
-            instance.attachments.all().delete()
-            self._create_attachments(instance, attachments_data)
+            # Only sync nested fields if they are present in the PATCH data
+            nested_data = {
+                'team_members_data': team_members_data,
+                'work_attributions_data': work_attributions_data,
+                'bill_of_materials_data': bill_of_materials_data,
+                'attachments_data': attachments_data,
+            }
+            for data_key, items_data in nested_data.items():
+                if items_data is not None:
+                    related_name, match_on = self.NESTED_RELATIONS[data_key]
+                    self._sync_related(instance, related_name, items_data, match_on)
 
         return instance
     
+    def _sync_related(self, project, related_name, items_data, match_on):
+        """Diff submitted child rows against the project's existing ones.
+        
+        Rows are matched by ``id``, or by the ``match_on`` fields when the
+        client sends no id. Matched rows are written only if a field changed,
+        unmatched existing rows are deleted and the rest are bulk-created, so
+        unchanged rows keep their ids. The submitted order becomes ``position``.
+        """
+        manager = getattr(project, related_name)
+        model = manager.model
+        existing = {row.id: row for row in manager.all()}
+        if model is ProjectMember:
+            # Rows are updated in place below, so note who had access first
+            affected_users = {row.user_id for row in existing.values()}
+        by_key = defaultdict(list)
+        for row in existing.values():
+            by_key[tuple(getattr(row, field) for field in match_on)].append(row)
+        
+        kept = set()
+        to_create, to_update, changed_fields = [], [], set()
+        renamed = []
+        for position, item_data in enumerate(items_data):
+            item_data = dict(item_data, position=position)
+            row = existing.get(item_data.pop('id', None))
+            if row is None or row.id in kept:
+                key = tuple(item_data.get(field) for field in match_on)
+                row = next((row for row in by_key.get(key, []) if row.id not in kept), None)
+            if row is None:
+                to_create.append(model(project=project, **item_data))
+                continue
+            
+            kept.add(row.id)
+            changed = [field for field, value in item_data.items() if getattr(row, field) != value]
+            if not changed:
+                continue
+            if model is BillOfMaterialItem:
+                old_key = component_key(row)
+            for field in changed:
+                setattr(row, field, item_data[field])
+            if model is BillOfMaterialItem and component_key(row) != old_key:
+                renamed.append(row)
+            to_update.append(row)
+            changed_fields.update(changed)
+        
+        removed = [row_id for row_id in existing if row_id not in kept]
+        if removed:
+            model.objects.filter(id__in=removed).delete()
+        if renamed:
+            # Move renamed BOM lines to their new catalog component
+            release_components(renamed)
+            attach_components(renamed)
+            changed_fields.add('catalog_component')
+        if to_update:
+            model.objects.bulk_update(to_update, sorted(changed_fields))
+        if to_create:
+            if model is BillOfMaterialItem:
+                attach_components(to_create)
+            model.objects.bulk_create(to_create)
+        if model is ProjectMember:
+            # Bulk writes send no signals: drop the cached access of every user
+            # who was or now is a member, now and again once the writes commit
+            affected_users.update(item_data.get('user_id') for item_data in items_data)
+            invalidate_project_access(*affected_users)
+        # Bulk writes send no signals, so changed images are queued here
+        queue_processing(to_update + to_create)
+    
     def _create_related_objects(self, project, team_members_data, work_attributions_data, 
                               bill_of_materials_data, attachments_data):
         """Helper method to create all related objects"""
@@ -426,25 +801,37 @@ class ProjectCreateUpdateSerializer(serializers.ModelSerializer):
         self._create_bill_of_materials(project, bill_of_materials_data)
         self._create_attachments(project, attachments_data)
     
+    @staticmethod
+    def _build_rows(model, project, items_data):
+        """Unsaved child rows for ``project`` in submitted order; ids sent by the
+        client are ignored"""
+        return [
+            model(
+                project=project, position=position,
+                **{key: value for key, value in item_data.items() if key != 'id'}
+            )
+            for position, item_data in enumerate(items_data)
+        ]
+    
     def _create_team_members(self, project, team_members_data):
         """Create team members for the project"""
-        for member_data in team_members_data:
-            ProjectMember.objects.create(project=project, **member_data)
+        members = ProjectMember.objects.bulk_create(self._build_rows(ProjectMember, project, team_members_data))
+        invalidate_project_access(*{member.user_id for member in members})
     
     def _create_work_attributions(self, project, work_attributions_data):
         """Create work attributions for the project"""
-        for attribution_data in work_attributions_data:
-            WorkAttribution.objects.create(project=project, **attribution_data)
+        WorkAttribution.objects.bulk_create(self._build_rows(WorkAttribution, project, work_attributions_data))
     
     def _create_bill_of_materials(self, project, bill_of_materials_data):
         """Create bill of materials items for the project"""
-        for bom_data in bill_of_materials_data:
-            BillOfMaterialItem.objects.create(project=project, **bom_data)
+        items = self._build_rows(BillOfMaterialItem, project, bill_of_materials_data)
+        attach_components(items)
+        BillOfMaterialItem.objects.bulk_create(items)
+        queue_processing(items)
     
     def _create_attachments(self, project, attachments_data):
         """Create attachments for the project"""
-        for attachment_data in attachments_data:
-            Attachment.objects.create(project=project, **attachment_data) 
+        Attachment.objects.bulk_create(self._build_rows(Attachment, project, attachments_data))
 
     ############################################################
     # Helper: flatten form-data keys into list[dict] structures #
@@ -490,7 +877,8 @@ class AdminUserSerializer(serializers.ModelSerializer):
 
 
 class BookmarkSerializer(serializers.ModelSerializer):
-    """Serializer for Bookmark model"""
+    """Serializer for Bookmark model; ``?fields=`` and ``?expand=`` shape the
+    nested project card"""
     project = ProjectListSerializer(read_only=True)
     user = UserSerializer(read_only=True)
     
@@ -503,26 +891,46 @@ class BookmarkSerializer(serializers.ModelSerializer):
 class SlideshowSlideSerializer(serializers.ModelSerializer):
     """Serializer for individual slideshow slides"""
     image = serializers.SerializerMethodField()
+    preview = serializers.SerializerMethodField()
+    thumbnail = serializers.SerializerMethodField()
+    srcset = serializers.SerializerMethodField()
     
     class Meta:
         model = SlideshowSlide
-        fields = ['id', 'slide_number', 'image', 'created_at']
+        fields = ['id', 'slide_number', 'image', 'preview', 'thumbnail', 'srcset', 'width', 'height', 'created_at']
     
     def get_image(self, obj):
         if obj.image:
             return obj.image.url
         return None
+    
+    def get_preview(self, obj):
+        return obj.preview.url if obj.preview else None
+    
+    def get_thumbnail(self, obj):
+        return obj.thumbnail.url if obj.thumbnail else None
+    
+    def get_srcset(self, obj):
+        """<img srcset> of the preview and the full-size image; empty for slides without derivatives"""
+        if not (obj.preview and obj.width):
+            return ''
+        preview_width = scaled_width(obj.width, DERIVATIVE_WIDTHS['preview'])
+        return f'{obj.preview.url} {preview_width}w, {obj.image.url} {obj.width}w'
 
 
 class ProjectSlideshowSerializer(serializers.ModelSerializer):
     """Serializer for project slideshows"""
-    slides = SlideshowSlideSerializer(many=True, read_only=True)
+    slides = SlideshowSlideSerializer(source='current_slides', many=True, read_only=True)
     original_file = serializers.SerializerMethodField()
     slides_count = serializers.SerializerMethodField()
+    thumbnail_strip = serializers.SerializerMethodField()
     
     class Meta:
         model = ProjectSlideshow
-        fields = ['id', 'title', 'description', 'original_file', 'slides', 'slides_count', 'created_at', 'updated_at']
+        fields = [
+            'id', 'title', 'description', 'original_file', 'slides', 'slides_count', 'thumbnail_strip',
+            'conversion_status', 'conversion_progress', 'conversion_error', 'created_at', 'updated_at'
+        ]
     
     def get_original_file(self, obj):
         if obj.original_file:
@@ -530,7 +938,20 @@ class ProjectSlideshowSerializer(serializers.ModelSerializer):
         return None
     
     def get_slides_count(self, obj):
-        return obj.slides.count()
+        return obj.current_slides().count()
+    
+    def get_thumbnail_strip(self, obj):
+        """Sprite of the slide thumbnails: slide i is the tile at column i % columns,
+        row i // columns, for the first ``count`` slides"""
+        if not obj.thumbnail_strip:
+            return None
+        return {
+            'url': obj.thumbnail_strip.url,
+            'columns': STRIP_COLUMNS,
+            'tile_width': STRIP_TILE_WIDTH,
+            'tile_height': obj.strip_tile_height,
+            'count': min(self.get_slides_count(obj), STRIP_MAX_TILES),
+        }
 
 
 class SlideshowUploadSerializer(serializers.ModelSerializer):
@@ -553,8 +974,55 @@ class SlideshowUploadSerializer(serializers.ModelSerializer):
                 "Only PDF files are supported."
             )
         
-        # Check file size (20MB limit)
-        if value.size > 20 * 1024 * 1024:  # 20MB
-            raise serializers.ValidationError("File size must be less than 20MB.")
+        # Same limit as chunked slideshow uploads (UploadSerializer)
+        if value.size > settings.SLIDESHOW_MAX_SIZE:
+            raise serializers.ValidationError(
+                f"File size must be less than {settings.SLIDESHOW_MAX_SIZE // (1024 * 1024)}MB."
+            )
         
-        return value 
\ No newline at end of file
+        return value 
+
+
+class UploadSerializer(serializers.ModelSerializer):
+    """A chunked upload (api.uploads) and the chunks received so far"""
+    project_id = serializers.IntegerField()
+    attachment_id = serializers.IntegerField(required=False, allow_null=True)
+    chunk_count = serializers.IntegerField(read_only=True)
+    received = serializers.ListField(source='received_chunks', child=serializers.IntegerField(), read_only=True)
+    
+    class Meta:
+        model = Upload
+        fields = [
+            'id', 'project_id', 'target', 'attachment_id', 'filename', 'size', 'sha256',
+            'chunk_size', 'chunk_count', 'received', 'status', 'error', 'created_at', 'updated_at'
+        ]
+        read_only_fields = ['chunk_size', 'status', 'error']
+    
+    def validate_filename(self, value):
+        import os
+        name = os.path.basename(value.replace('\\', '/')).strip()
+        if not name:
+            raise serializers.ValidationError("A file name is required.")
+        return name
+    
+    def validate_sha256(self, value):
+        value = value.strip().lower()
+        if value and (len(value) != 64 or any(char not in '0123456789abcdef' for char in value)):
+            raise serializers.ValidationError("Must be a hex-encoded SHA-256 digest.")
+        return value
+    
+    def validate(self, attrs):
+        import os
+        if attrs['target'] == 'attachment' and not attrs.get('attachment_id'):
+            raise serializers.ValidationError({'attachment_id': "Required for attachment uploads."})
+        max_size = settings.UPLOAD_MAX_SIZE
+        if attrs['target'] == 'slideshow':
+            attrs['attachment_id'] = None
+            if os.path.splitext(attrs['filename'])[1].lower() != '.pdf':
+                raise serializers.ValidationError({'filename': "Only PDF files are supported."})
+            max_size = min(max_size, settings.SLIDESHOW_MAX_SIZE)
+        if not 0 < attrs['size'] <= max_size:
+            raise serializers.ValidationError(
+                {'size': f"File size must be between 1 byte and {max_size // (1024 * 1024)}MB."}
+            )
+        return attrs
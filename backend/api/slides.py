@@ -0,0 +1,298 @@
+"""
+Slideshow conversion.
+
+Uploading a slideshow queues a ``convert_slideshow`` job (api.jobs), which
+renders every page of the PDF to a PNG slide plus a WebP preview and
+thumbnail, and packs the thumbnails into a strip for the slide rail (all
+with api.pdf_render). Slides are saved page by page under a new generation
+number and swapped in when the last one is saved. Each run claims its own
+generation, and only the run holding the latest one may swap it in, so a
+run overtaken by a later one drops its slides instead of replacing the
+newer ones. Files are stored by content hash (api.storage), so a file that
+was already converted, for this slideshow or another, is not rendered
+again. While a conversion runs, the slideshow's conversion_status and
+conversion_progress fields are kept up to date for the status polling
+endpoint. ``convert_slides.py`` runs the same conversion from the command
+line.
+"""
+
+import logging
+import os
+import tempfile
+import time
+
+import fitz  # PyMuPDF for PDF processing
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.db.models import F
+
+from .blobs import retain_blobs
+from .jobs import PermanentJobError, enqueue, heartbeat, job_handler
+from .models import ProjectSlideshow, SlideshowSlide
+from .pdf_render import DERIVATIVE_EXTENSION, ThumbnailStrip, iter_pages, page_count
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_EXTENSIONS = ['.pdf']
+
+# Image fields of a slide: the full-size PNG and its derivatives
+SLIDE_FILE_FIELDS = ('image', 'preview', 'thumbnail')
+
+# Seconds the slides of a replaced generation are kept, so pages that are
+# already open (or cached responses) showing them don't break straight away
+OLD_GENERATION_GRACE = 300
+
+# Seconds between renewals of a conversion job's lock (api.jobs.heartbeat);
+# well under JOB_LOCK_TIMEOUT, so a long deck isn't taken for a dead worker
+HEARTBEAT_INTERVAL = 60
+
+
+class ConversionSuperseded(Exception):
+    """A later conversion of the same slideshow has taken over"""
+
+
+def queue_conversion(slideshow):
+    """Reset the slideshow's conversion status and queue its conversion.
+
+    A converted slideshow whose slides were rendered from this very file
+    (the same content, as files are stored by hash) just stays ready.
+    """
+    if (
+        slideshow.conversion_status == 'ready'
+        and slideshow.rendered_from == slideshow.original_file.name
+        and slideshow.current_slides().exists()
+    ):
+        _set_status(slideshow, 'ready', progress=100, error='')
+        return
+    _set_status(slideshow, 'pending', progress=0, error='')
+    enqueue('convert_slideshow', {'slideshow_id': slideshow.pk}, unique=True)
+
+
+def _set_status(slideshow, status, progress=None, error=None):
+    slideshow.conversion_status = status
+    fields = ['conversion_status', 'updated_at']
+    if progress is not None:
+        slideshow.conversion_progress = progress
+        fields.append('conversion_progress')
+    if error is not None:
+        slideshow.conversion_error = error
+        fields.append('conversion_error')
+    # A regular save, so cached slideshow responses are invalidated
+    slideshow.save(update_fields=fields)
+
+
+class ProgressReporter:
+    """Writes a slideshow's conversion progress, skipping unchanged percentages.
+
+    Given the conversion's job, it also renews the job's lock every
+    HEARTBEAT_INTERVAL seconds, and stops the run with ConversionSuperseded
+    if the job was given up and handed to another worker.
+    """
+
+    def __init__(self, slideshow_id, job=None):
+        self.slideshow_id = slideshow_id
+        self.job = job
+        self.reported = None
+        self.beat = time.monotonic()
+
+    def __call__(self, done, total):
+        percent = min(int(done * 100 / total), 100) if total else 0
+        if percent != self.reported:
+            ProjectSlideshow.objects.filter(pk=self.slideshow_id).update(conversion_progress=percent)
+            self.reported = percent
+        if self.job is not None and time.monotonic() - self.beat >= HEARTBEAT_INTERVAL:
+            if not heartbeat(self.job):
+                raise ConversionSuperseded(f'Job {self.job.pk} was handed to another worker')
+            self.beat = time.monotonic()
+
+
+def _save_slide(slideshow, generation, page_number, page):
+    """Store a rendered page and its derivatives as a slide, removing the temporary files"""
+    slide = SlideshowSlide(
+        slideshow=slideshow, generation=generation, slide_number=page_number + 1,
+        width=page['width'], height=page['height'],
+    )
+    for field in SLIDE_FILE_FIELDS:
+        with open(page[field], 'rb') as img_file:
+            getattr(slide, field).save(os.path.basename(page[field]), File(img_file), save=False)
+        os.remove(page[field])
+    slide.save()
+
+
+def _render_slides(slideshow, generation, report):
+    """Render the slideshow's file into ``generation``; returns the number of pages"""
+    file_path = slideshow.original_file.path
+    try:
+        total = page_count(file_path)
+    except (fitz.EmptyFileError, fitz.FileDataError, fitz.FileNotFoundError) as exc:
+        # PyMuPDF could not open or read the document; a retry won't fix it
+        raise PermanentJobError(f'Could not read the PDF: {exc}') from exc
+    if not total:
+        raise PermanentJobError('The PDF has no pages')
+    if not slideshow.current_slides().exists() and not _publish(slideshow, generation):
+        raise ConversionSuperseded(f'Generation {generation} of slideshow {slideshow.pk} was overtaken')
+
+    strip = ThumbnailStrip(total)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        pages = iter_pages(file_path, temp_dir, workers=settings.SLIDE_RENDER_WORKERS, derivatives=True)
+        for page_number, page in pages:
+            strip.add(page_number, page['thumbnail'])
+            _save_slide(slideshow, generation, page_number, page)
+            report(page_number + 1, total)
+        strip_path = os.path.join(temp_dir, f'strip.{DERIVATIVE_EXTENSION}')
+        if strip.save(strip_path):
+            with open(strip_path, 'rb') as strip_file:
+                slideshow.thumbnail_strip.save(os.path.basename(strip_path), File(strip_file), save=False)
+            slideshow.strip_tile_height = strip.tile_height
+    return total
+
+
+def _copy_slides(source, slideshow, generation):
+    """Add the current slides of ``source`` to ``slideshow`` as ``generation``,
+    sharing their files; returns the number of slides"""
+    slides = [
+        SlideshowSlide(
+            slideshow=slideshow, generation=generation, slide_number=slide.slide_number,
+            width=slide.width, height=slide.height,
+            **{field: getattr(slide, field).name for field in SLIDE_FILE_FIELDS},
+        )
+        for slide in source.current_slides()
+    ]
+    SlideshowSlide.objects.bulk_create(slides)
+    # bulk_create sends no signals
+    retain_blobs(getattr(slide, field).name for slide in slides for field in SLIDE_FILE_FIELDS)
+    slideshow.thumbnail_strip = source.thumbnail_strip.name
+    slideshow.strip_tile_height = source.strip_tile_height
+    return len(slides)
+
+
+def _claim_generation(slideshow):
+    """Claim a new generation number for a conversion run, and refresh the
+    generation ``slideshow`` shows; returns the number"""
+    with transaction.atomic():
+        claimed = ProjectSlideshow.objects.select_for_update().only('generation', 'last_generation').get(pk=slideshow.pk)
+        generation = claimed.last_generation + 1
+        ProjectSlideshow.objects.filter(pk=slideshow.pk).update(last_generation=generation)
+    slideshow.generation = claimed.generation
+    slideshow.last_generation = generation
+    return generation
+
+
+def _publish(slideshow, generation, rendered_from=''):
+    """Show ``generation``; returns False, leaving the slideshow as it is, if a
+    later run has claimed a generation since"""
+    with transaction.atomic():
+        latest = ProjectSlideshow.objects.select_for_update().filter(pk=slideshow.pk).values_list(
+            'last_generation', flat=True,
+        ).first()
+        if latest != generation:
+            return False
+        slideshow.generation = generation
+        slideshow.rendered_from = rendered_from
+        # A regular save, so cached slideshow responses are invalidated
+        slideshow.save(update_fields=[
+            'generation', 'rendered_from', 'thumbnail_strip', 'strip_tile_height', 'updated_at',
+        ])
+    return True
+
+
+def _delete_generation(slideshow_id, generation):
+    """Delete the slides of a generation unless it is the one shown. Their files
+    are released, and collected by gc_blobs."""
+    SlideshowSlide.objects.filter(slideshow_id=slideshow_id, generation=generation).exclude(
+        generation=F('slideshow__generation'),
+    ).delete()
+
+
+def convert_slideshow(slideshow, progress=None):
+    """Render a slideshow's file into a new generation of slides and swap it in.
+
+    Each page is saved with its preview and thumbnail, and so committed, as
+    soon as it is rendered and its temporary files removed, so only a few
+    pages are held at any time. The thumbnail strip is built along the way
+    and stored when the last page is in. A slideshow without slides shows
+    the new generation straight away and fills up page by page. One that has
+    slides keeps showing them until every new page is saved, then switches
+    generations in a single update; the old slides are deleted
+    OLD_GENERATION_GRACE seconds later. If another run claimed a generation
+    after this one, this run raises ConversionSuperseded instead of
+    swapping in its slides.
+
+    Files are stored by content hash, so the same file always has the same
+    name. If the current slides were rendered from it nothing is done; if
+    another slideshow's were, its slides are copied instead of rendered.
+
+    Raises PermanentJobError for missing, unsupported or unreadable files.
+    """
+    if not slideshow.original_file:
+        raise PermanentJobError(f'Slideshow {slideshow.pk} has no file')
+    source_name = slideshow.original_file.name
+    file_extension = os.path.splitext(source_name)[1].lower()
+    if file_extension not in SUPPORTED_EXTENSIONS:
+        raise PermanentJobError(f'Unsupported file type: {file_extension}. Only PDF files are supported.')
+    if slideshow.rendered_from == source_name and slideshow.current_slides().exists():
+        return slideshow.current_slides().count()
+
+    generation = _claim_generation(slideshow)
+    previous = slideshow.generation
+    # Pages of earlier runs that never got swapped in: interrupted, or
+    # overtaken by this one
+    slideshow.slides.filter(generation__lt=generation).exclude(generation=previous).delete()
+    swapped = slideshow.current_slides().exists()
+
+    report = progress or (lambda done, total: None)
+    rendered = ProjectSlideshow.objects.filter(rendered_from=source_name).exclude(pk=slideshow.pk).first()
+    total = _copy_slides(rendered, slideshow, generation) if rendered else 0
+    if total:
+        logger.info('Slideshow %s reuses the slides of slideshow %s', slideshow.pk, rendered.pk)
+        report(total, total)
+    else:
+        total = _render_slides(slideshow, generation, report)
+
+    if not _publish(slideshow, generation, rendered_from=source_name):
+        raise ConversionSuperseded(f'Generation {generation} of slideshow {slideshow.pk} was overtaken')
+    if swapped:
+        enqueue(
+            'delete_slide_generation', {'slideshow_id': slideshow.pk, 'generation': previous},
+            delay=OLD_GENERATION_GRACE,
+        )
+    return total
+
+
+def run_conversion(slideshow_id, final_attempt=True, job=None):
+    """Convert a slideshow and keep its status fields current; re-raises failures.
+
+    On a failure that will be retried the slideshow goes back to pending
+    rather than failed. Returns the number of slides, or None if the
+    slideshow no longer exists or a later run took over; ``job`` is the
+    conversion's job, if it runs as one.
+    """
+    slideshow = ProjectSlideshow.objects.filter(pk=slideshow_id).first()
+    if slideshow is None:
+        return None
+    _set_status(slideshow, 'processing', progress=0, error='')
+    try:
+        count = convert_slideshow(slideshow, ProgressReporter(slideshow.pk, job))
+    except ConversionSuperseded as exc:
+        # The later run reports the status; only this run's slides are left to drop
+        logger.info('Conversion of slideshow %s stopped: %s', slideshow_id, exc)
+        _delete_generation(slideshow.pk, slideshow.last_generation)
+        return None
+    except Exception as exc:
+        final = final_attempt or isinstance(exc, PermanentJobError)
+        _set_status(slideshow, 'failed' if final else 'pending', error=str(exc))
+        raise
+    _set_status(slideshow, 'ready', progress=100)
+    logger.info('Converted %s slides for slideshow %s', count, slideshow_id)
+    return count
+
+
+@job_handler('convert_slideshow')
+def convert_slideshow_job(job):
+    run_conversion(job.payload['slideshow_id'], final_attempt=job.attempts >= job.max_attempts, job=job)
+
+
+@job_handler('delete_slide_generation')
+def delete_slide_generation_job(job):
+    _delete_generation(job.payload['slideshow_id'], job.payload['generation'])
@@ -0,0 +1,59 @@
+import hashlib
+import os
+import posixpath
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Stores every file under the SHA-256 of its content.
+
+    The directory from the field's upload_to is kept and the extension
+    lower-cased, e.g. ``slideshow_slides/3f/3fa4...c2.png``. Saving content
+    that is already stored writes nothing and returns the existing name, so
+    identical files share one copy. Stored files are registered as Blob rows
+    (api.blobs), which count the references to them.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # The final name depends on the content and is picked in _save
+        return name
+
+    def _save(self, name, content):
+        directory = posixpath.dirname(name)
+        extension = os.path.splitext(name)[1].lower()
+        os.makedirs(self.path(directory), exist_ok=True)
+
+        # Hash while copying to a temporary file, then move it into place
+        digest = hashlib.sha256()
+        size = 0
+        fd, temp_path = tempfile.mkstemp(dir=self.path(directory), prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as temp_file:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    size += len(chunk)
+                    temp_file.write(chunk)
+            sha256 = digest.hexdigest()
+            name = posixpath.join(directory, sha256[:2], sha256 + extension)
+            full_path = self.path(name)
+            if os.path.exists(full_path):
+                os.remove(temp_path)
+            else:
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                os.chmod(temp_path, self.file_permissions_mode or 0o644)
+                os.replace(temp_path, full_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        from .blobs import register_blob
+        register_blob(name, sha256, size)
+        return name
+
+
+content_storage = ContentAddressedStorage()
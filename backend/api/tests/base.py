@@ -0,0 +1,64 @@
+import shutil
+import tempfile
+
+import fitz
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from api.models import Category, Project
+
+
+def make_user(username, **fields):
+    return User.objects.create_user(username=username, **fields)
+
+
+def make_project(author, status='published', **fields):
+    fields.setdefault('category', Category.objects.get_or_create(name='Arduino')[0])
+    fields.setdefault('title', 'Project')
+    fields.setdefault('description', 'A project')
+    fields.setdefault('difficulty', 'Beginner')
+    return Project.objects.create(author=author, status=status, **fields)
+
+
+def pdf_bytes(pages=3):
+    """A PDF with one line of text per page"""
+    document = fitz.open()
+    for number in range(pages):
+        document.new_page().insert_text((72, 72), f'Slide {number + 1}')
+    data = document.tobytes()
+    document.close()
+    return data
+
+
+class APITestBase(APITestCase):
+    """API test case starting from an empty cache, so cached responses and
+    project access lists never leak from one test into another"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+
+class TemporaryMediaMixin:
+    """Keeps the files each test uploads and generates in a MEDIA_ROOT of its own"""
+
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+
+
+def run_queued_jobs(worker_id='test-worker'):
+    """Run every due job in this thread, like ``run_jobs --once``; returns how many ran"""
+    from api.jobs import claim_job, run_job
+
+    count = 0
+    while (job := claim_job(worker_id)) is not None:
+        run_job(job)
+        count += 1
+    return count
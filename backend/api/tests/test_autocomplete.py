@@ -0,0 +1,130 @@
+from unittest import SkipTest, mock, skipUnless
+
+from django.db import OperationalError, connection
+from django.test import SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from api import autocomplete
+from api.autocomplete import PrefixCache, prefix_cache, suggest_components, suggest_users
+from api.models import CatalogComponent
+
+from .base import APITestBase, make_user
+
+
+def trigrams_available():
+    """pg_trgm is created by the migrations; SQLite ranks without trigrams"""
+    if connection.vendor != 'postgresql':
+        return True
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+class PrefixCacheTests(SimpleTestCase):
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = PrefixCache(max_entries=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertEqual((cache.get('a'), cache.get('b'), cache.get('c')), (1, None, 3))
+
+    def test_entries_expire(self):
+        cache = PrefixCache(ttl=60)
+        with mock.patch('api.autocomplete.time.monotonic', return_value=1000):
+            cache.set('a', 1)
+        with mock.patch('api.autocomplete.time.monotonic', return_value=1059):
+            self.assertEqual(cache.get('a'), 1)
+        with mock.patch('api.autocomplete.time.monotonic', return_value=1061):
+            self.assertIsNone(cache.get('a'))
+
+
+class AutocompleteTests(APITestBase):
+    @classmethod
+    def setUpClass(cls):
+        if not trigrams_available():
+            raise SkipTest('pg_trgm is not installed')
+        super().setUpClass()
+
+    def setUp(self):
+        super().setUp()
+        prefix_cache.clear()
+        self.addCleanup(prefix_cache.clear)
+        self.ann = make_user('annabel', first_name='Ann')
+        self.hannah = make_user('hannah')
+        self.bob = make_user('bob', last_name='Annesley')
+
+    def component(self, name, usage_count=1, item_type='Hardware'):
+        return CatalogComponent.objects.create(
+            name=name, normalized_name=name.lower(), item_type=item_type, usage_count=usage_count,
+        )
+
+    def autocomplete(self, query, **params):
+        response = self.client.get('/api/autocomplete/', {'q': query, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_prefix_matches_rank_first(self):
+        ids, partial = suggest_users('ann')
+        self.assertFalse(partial)
+        # A username, first name or last name starting with the query beats a match inside one
+        self.assertEqual((set(ids[:2]), ids[2:]), ({self.ann.id, self.bob.id}, [self.hannah.id]))
+        users = self.autocomplete('ann', kind='users')['results']
+        self.assertEqual(users[-1]['username'], 'hannah')
+
+    def test_components_tie_break_on_usage(self):
+        self.component('LED red', usage_count=2)
+        # Names of one length, so trigram similarity ties too
+        self.component('LED tan', usage_count=9)
+        self.component('Bright LED', usage_count=50)
+        self.component('LED unused', usage_count=0)
+        self.component('LED strip', usage_count=5, item_type='Software')
+        results = suggest_components('led', item_type='Hardware')[0]
+        self.assertEqual([row['name'] for row in results], ['LED tan', 'LED red', 'Bright LED'])
+        data = self.autocomplete('led', type='Software')
+        self.assertEqual(([row['name'] for row in data['results']], data['partial']), (['LED strip'], False))
+
+    @override_settings(AUTOCOMPLETE_CACHE_MAX_PREFIX=3)
+    def test_short_prefixes_are_cached(self):
+        self.component('LED', usage_count=3)
+        suggest_components('le')
+        with self.assertNumQueries(0):
+            self.assertEqual([row['name'] for row in suggest_components('le')[0]], ['LED'])
+        # Longer queries always go to the database
+        suggest_components('led r')
+        with CaptureQueriesContext(connection) as queries:
+            suggest_components('led r')
+        self.assertTrue(queries.captured_queries)
+
+    def test_lookups_over_budget_return_a_partial_answer(self):
+        def cancelled():
+            raise OperationalError('canceling statement due to statement timeout')
+
+        with mock.patch.object(connection, 'vendor', 'postgresql'), \
+                mock.patch.object(connection, 'cursor'), \
+                mock.patch('api.autocomplete.transaction.atomic'):
+            self.assertEqual(autocomplete._within_budget(cancelled), ([], True))
+
+        with mock.patch('api.autocomplete._within_budget', return_value=([], True)):
+            data = self.autocomplete('le')
+        self.assertEqual((data['results'], data['partial']), ([], True))
+        # Partial answers are not cached
+        self.component('LED')
+        self.assertEqual([row['name'] for row in self.autocomplete('le')['results']], ['LED'])
+
+    def test_bad_requests(self):
+        self.assertEqual(self.autocomplete('')['results'], [])
+        self.assertEqual(self.client.get('/api/autocomplete/', {'q': 'x', 'kind': 'projects'}).status_code, 400)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'statement_timeout is PostgreSQL only')
+class StatementTimeoutTests(APITestBase):
+    @override_settings(AUTOCOMPLETE_BUDGET_MS=10)
+    def test_statement_timeout_cuts_slow_lookups(self):
+        def slow():
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_sleep(1)')
+            return ['done']
+
+        self.assertEqual(autocomplete._within_budget(slow), ([], True))
+        self.assertEqual(autocomplete._within_budget(lambda: ['fast']), (['fast'], False))
@@ -0,0 +1,107 @@
+import io
+import os
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import override_settings
+
+from api import slides
+from api.blobs import rebuild_blob_counts
+from api.models import Blob, Job, ProjectSlideshow, SlideshowSlide
+
+from .base import APITestBase, TemporaryMediaMixin, make_project, make_user, pdf_bytes, run_queued_jobs
+
+
+@override_settings(SLIDE_RENDER_WORKERS=1, PROJECT_DOCUMENTS_ASYNC=False)
+class BlobTests(TemporaryMediaMixin, APITestBase):
+    def setUp(self):
+        super().setUp()
+        self.author = make_user('maker')
+        self.client.force_authenticate(self.author)
+
+    def upload(self, project, data, name='deck.pdf'):
+        return self.client.post(
+            f'/api/projects/{project.id}/slideshow/',
+            {'original_file': SimpleUploadedFile(name, data, 'application/pdf')}, format='multipart',
+        )
+
+    def files(self, directory):
+        return [
+            os.path.join(root, name)
+            for root, _, names in os.walk(os.path.join(self.media_root, directory)) for name in names
+        ]
+
+    def gc_blobs(self, **options):
+        output = io.StringIO()
+        call_command('gc_blobs', stdout=output, **options)
+        return output.getvalue()
+
+    def test_identical_files_are_stored_and_rendered_once(self):
+        first, second = make_project(self.author), make_project(self.author, title='Second')
+        deck = pdf_bytes(3)
+        self.upload(first, deck)
+        run_queued_jobs()
+        slideshow = ProjectSlideshow.objects.get(project=first)
+        self.assertRegex(slideshow.original_file.name, r'^project_slideshows/[0-9a-f]{2}/[0-9a-f]{64}\.pdf$')
+        self.assertEqual(slideshow.rendered_from, slideshow.original_file.name)
+        self.assertEqual(len(self.files('slideshow_slides')), 9)
+
+        # The same file again: nothing to convert
+        self.assertEqual(self.upload(first, deck, name='again.PDF').status_code, 201)
+        self.assertFalse(Job.objects.filter(status='queued').exists())
+        self.assertEqual(len(self.files('project_slideshows')), 1)
+        self.assertEqual(Blob.objects.get(name=slideshow.original_file.name).ref_count, 1)
+
+        # On another project: the slides are shared, not rendered again
+        self.upload(second, deck)
+        with mock.patch.object(slides, 'iter_pages', side_effect=AssertionError('rendered')):
+            run_queued_jobs()
+        copy = ProjectSlideshow.objects.get(project=second)
+        self.assertEqual((copy.conversion_status, copy.current_slides().count()), ('ready', 3))
+        self.assertEqual(len(self.files('slideshow_slides')), 9)
+        image = copy.current_slides().first().image
+        for name in (image.name, copy.original_file.name, copy.thumbnail_strip.name):
+            self.assertEqual(Blob.objects.get(name=name).ref_count, 2)
+        self.assertEqual(rebuild_blob_counts(), 0)
+
+        # Shared files outlive one of their owners
+        slideshow.delete()
+        self.assertEqual(Blob.objects.get(name=image.name).ref_count, 1)
+        self.gc_blobs(grace=0)
+        self.assertTrue(os.path.exists(image.path))
+
+    def test_replaced_files_are_collected_after_the_grace_period(self):
+        project = make_project(self.author)
+        self.upload(project, pdf_bytes(3))
+        run_queued_jobs()
+        self.upload(project, pdf_bytes(2))
+        run_queued_jobs()
+        cleanup = Job.objects.get(kind='delete_slide_generation')
+        Job.objects.filter(pk=cleanup.pk).update(run_at=cleanup.created_at)
+        run_queued_jobs()
+
+        self.assertIn('Deleted 0 files', self.gc_blobs(grace=3600))
+        # The first PDF, its strip and the third slide's files; the first two slides are identical
+        self.assertIn('Would delete 5 files', self.gc_blobs(grace=0, dry_run=True))
+        self.gc_blobs(grace=0)
+        self.assertEqual(len(self.files('slideshow_slides')), 6)
+        self.assertEqual(len(self.files('project_slideshows')), 1)
+        self.assertEqual(len(self.files('slideshow_strips')), 1)
+        self.assertEqual(Blob.objects.count(), 8)
+
+    def test_files_stored_before_content_addressing_are_deleted_with_their_row(self):
+        legacy = os.path.join(self.media_root, 'slideshow_slides', 'slide_1.png')
+        os.makedirs(os.path.dirname(legacy), exist_ok=True)
+        with open(legacy, 'wb') as image:
+            image.write(b'png')
+        # bulk_create, like rows written before reference counting
+        slideshow, = ProjectSlideshow.objects.bulk_create([
+            ProjectSlideshow(project=make_project(self.author), original_file='project_slideshows/old.pdf'),
+        ])
+        SlideshowSlide.objects.bulk_create([
+            SlideshowSlide(slideshow=slideshow, slide_number=1, image='slideshow_slides/slide_1.png'),
+        ])
+        self.assertFalse(Blob.objects.exists())
+        SlideshowSlide.objects.all().delete()
+        self.assertFalse(os.path.exists(legacy))
@@ -0,0 +1,76 @@
+from django.contrib.auth.models import User
+from django.core import checks
+from django.test import override_settings
+
+from api.caching import check_shared_cache
+from api.models import Category, Comment, Project, UserProfile
+
+from .base import APITestBase, make_project, make_user
+
+
+class AnonymousCacheTests(APITestBase):
+    def setUp(self):
+        super().setUp()
+        self.author = make_user('maker')
+        self.project = make_project(self.author, title='Robot')
+
+    def categories(self):
+        return sorted(category['name'] for category in self.client.get('/api/categories/').data)
+
+    def feed(self):
+        return self.client.get('/api/projects/').data['results']
+
+    def test_hits_never_touch_the_database(self):
+        self.client.get('/api/categories/')
+        self.client.get('/api/projects/')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/api/categories/').status_code, 200)
+            self.assertEqual(self.client.get('/api/projects/').status_code, 200)
+
+    def test_writes_invalidate_cached_responses(self):
+        self.assertEqual(self.categories(), ['Arduino'])
+        Category.objects.create(name='Robotics')
+        self.assertEqual(self.categories(), ['Arduino', 'Robotics'])
+
+        self.assertEqual(self.feed()[0]['comments_count'], 0)
+        Comment.objects.create(project=self.project, author=self.author, body='Nice')
+        self.assertEqual(self.feed()[0]['comments_count'], 1)
+
+        self.project.status = 'draft'
+        self.project.save()
+        self.assertEqual(self.feed(), [])
+
+    def test_profile_changes_reach_the_public_profile(self):
+        self.assertEqual(self.client.get('/api/users/maker/').data['profile']['bio'], '')
+        profile = UserProfile.objects.get(user=self.author)
+        profile.bio = 'Builds robots'
+        profile.save()
+        self.assertEqual(self.client.get('/api/users/maker/').data['profile']['bio'], 'Builds robots')
+
+    def test_only_anonymous_successes_are_cached(self):
+        self.assertEqual(self.client.get('/api/users/newcomer/').status_code, 404)
+        # bulk_create sends no signals, so a cached 404 would still be served
+        user, = User.objects.bulk_create([User(username='newcomer')])
+        UserProfile.objects.bulk_create([UserProfile(user=user)])
+        self.assertEqual(self.client.get('/api/users/newcomer/').status_code, 200)
+
+        self.assertEqual(self.feed()[0]['title'], 'Robot')
+        Project.objects.filter(pk=self.project.pk).update(title='Renamed')
+        self.assertEqual(self.feed()[0]['title'], 'Robot')
+        # Signed-in users always get a fresh response
+        self.client.force_authenticate(self.author)
+        self.assertEqual(self.feed()[0]['title'], 'Renamed')
+
+
+class SharedCacheCheckTests(APITestBase):
+    LOCMEM = 'django.core.cache.backends.locmem.LocMemCache'
+
+    def test_locmem_outside_debug_is_reported(self):
+        with override_settings(DEBUG=False, TESTING=False, CACHE_BACKEND=self.LOCMEM):
+            self.assertEqual([error.id for error in check_shared_cache(None)], ['api.W001'])
+        with override_settings(DEBUG=True, TESTING=False, CACHE_BACKEND=self.LOCMEM):
+            self.assertEqual(check_shared_cache(None), [])
+        redis = 'django.core.cache.backends.redis.RedisCache'
+        with override_settings(DEBUG=False, TESTING=False, CACHE_BACKEND=redis):
+            self.assertEqual(check_shared_cache(None), [])
+        self.assertIn(check_shared_cache, checks.registry.registry.get_checks())
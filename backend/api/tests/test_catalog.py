@@ -0,0 +1,34 @@
+from api.models import BillOfMaterialItem, CatalogComponent
+
+from .base import APITestBase, make_project, make_user
+
+
+class CatalogUsageCountTests(APITestBase):
+    def setUp(self):
+        super().setUp()
+        self.author = make_user('maker')
+        self.project = make_project(self.author)
+
+    def add_item(self, name, project=None):
+        return BillOfMaterialItem.objects.create(
+            project=project or self.project, item_type='Hardware', name=name,
+        )
+
+    def test_items_share_a_counted_entry(self):
+        self.add_item('Arduino  Uno')
+        self.add_item('arduino uno', project=make_project(self.author))
+        entry = CatalogComponent.objects.get()
+        self.assertEqual((entry.normalized_name, entry.usage_count), ('arduino uno', 2))
+
+        self.project.delete()
+        entry.refresh_from_db()
+        self.assertEqual(entry.usage_count, 1)
+
+    def test_release_never_goes_below_zero(self):
+        self.add_item('LED')
+        self.add_item('led')
+        # Counts that drifted, e.g. rows removed behind the catalog's back
+        CatalogComponent.objects.update(usage_count=1)
+
+        self.project.delete()
+        self.assertEqual(CatalogComponent.objects.get().usage_count, 0)
@@ -0,0 +1,125 @@
+from urllib.parse import urlparse
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from api.models import Comment, ProjectMember
+
+from .base import APITestBase, make_project, make_user
+
+
+class CommentTestBase(APITestBase):
+    def setUp(self):
+        super().setUp()
+        self.author = make_user('maker')
+        self.project = make_project(self.author)
+
+    def comment(self, body, parent=None, project=None):
+        return Comment.objects.create(
+            project=project or self.project, author=self.author, parent=parent, body=body,
+        )
+
+    def get(self, url, **params):
+        return self.client.get(url, params)
+
+    def follow(self, link):
+        """GET a ``next``/``replies_next`` link, which is absolute"""
+        url = urlparse(link)
+        return self.client.get(f'{url.path}?{url.query}')
+
+
+class CommentTreeTests(CommentTestBase):
+    def comments(self, **params):
+        response = self.get(f'/api/projects/{self.project.id}/comments/', **params)
+        self.assertEqual(response.status_code, 200)
+        return response.data['results']
+
+    def test_threads_newest_first_replies_oldest_first(self):
+        older, newer = self.comment('Older'), self.comment('Newer')
+        first, second = self.comment('First', parent=older), self.comment('Second', parent=older)
+        nested = self.comment('Nested', parent=first)
+        threads = self.comments()
+        self.assertEqual([thread['id'] for thread in threads], [newer.id, older.id])
+        replies = threads[1]['replies']
+        self.assertEqual([reply['id'] for reply in replies], [first.id, second.id])
+        self.assertEqual((replies[0]['replies'][0]['id'], replies[0]['reply_count']), (nested.id, 1))
+        self.assertTrue(replies[0]['is_reply'])
+
+    def test_tree_is_loaded_with_a_fixed_number_of_queries(self):
+        root = self.comment('Root')
+        self.comment('Reply', parent=root)
+        with CaptureQueriesContext(connection) as small:
+            self.comments()
+        parent = root
+        for n in range(10):
+            parent = self.comment(f'Level {n}', parent=parent)
+            self.comment(f'Sibling {n}', parent=root)
+        with CaptureQueriesContext(connection) as large:
+            self.comments()
+        self.assertEqual(len(large), len(small))
+
+    @override_settings(COMMENT_TREE_MAX_DEPTH=2)
+    def test_depth_is_capped(self):
+        parent = root = self.comment('Root')
+        for n in range(4):
+            parent = self.comment(f'Level {n + 1}', parent=parent)
+
+        def deepest(thread):
+            depth = 0
+            while thread['replies']:
+                thread, depth = thread['replies'][0], depth + 1
+            return depth, thread
+
+        depth, last = deepest(self.comments()[0])
+        # Replies below the cap are left out but still counted
+        self.assertEqual((depth, last['body'], last['reply_count']), (2, 'Level 2', 1))
+        depth, last = deepest(self.comments(mode='cursor', depth=10)[0])
+        self.assertEqual((depth, last['body']), (2, 'Level 2'))
+        self.assertEqual(self.comments(mode='cursor', depth=1)[0]['replies'][0]['replies'], [])
+        self.assertEqual(self.comments()[0]['id'], root.id)
+
+
+class CommentReplyTests(CommentTestBase):
+    def test_replies_are_paged_oldest_first(self):
+        root = self.comment('Root')
+        replies = [self.comment(f'Reply {n}', parent=root) for n in range(5)]
+        response = self.get(f'/api/comments/{root.id}/replies/', page_size=2)
+        self.assertEqual(response.status_code, 200)
+        seen = [reply['id'] for reply in response.data['results']]
+        while response.data['next']:
+            response = self.follow(response.data['next'])
+            seen += [reply['id'] for reply in response.data['results']]
+        self.assertEqual(seen, [reply.id for reply in replies])
+        self.assertEqual(self.get('/api/comments/0/replies/').status_code, 404)
+        self.assertEqual(self.get(f'/api/comments/{root.id}/replies/', cursor='nonsense').status_code, 404)
+
+    def test_replies_next_continues_a_cut_thread(self):
+        root = self.comment('Root')
+        replies = [self.comment(f'Reply {n}', parent=root) for n in range(4)]
+        thread = self.get(f'/api/projects/{self.project.id}/comments/', mode='cursor', replies=3).data['results'][0]
+        self.assertEqual([reply['id'] for reply in thread['replies']], [reply.id for reply in replies[:3]])
+        self.assertEqual(thread['reply_count'], 4)
+        rest = self.follow(thread['replies_next']).data['results']
+        self.assertEqual([reply['id'] for reply in rest], [replies[3].id])
+
+    def test_private_threads_are_limited_to_members(self):
+        member, outsider = make_user('member'), make_user('outsider')
+        private = make_project(self.author, status='private', title='Private')
+        ProjectMember.objects.create(project=private, user=member, contribution='Wiring')
+        root = self.comment('Root', project=private)
+        self.comment('Reply', parent=root, project=private)
+        urls = [f'/api/comments/{root.id}/replies/', f'/api/projects/{private.id}/comments/']
+
+        for url in urls:
+            self.assertEqual(self.get(url).status_code, 403)
+            self.assertEqual(self.get(url, mode='cursor').status_code, 403)
+        self.client.force_authenticate(outsider)
+        for url in urls:
+            self.assertEqual(self.get(url).status_code, 403)
+            self.assertEqual(self.client.post(url, {'body': 'Hi'}, format='json').status_code, 403)
+        self.client.force_authenticate(member)
+        for url in urls:
+            self.assertEqual(self.get(url).status_code, 200)
+        self.assertEqual(self.client.post(urls[0], {'body': 'Hi'}, format='json').status_code, 201)
+        self.assertEqual(root.replies.count(), 2)
@@ -0,0 +1,53 @@
+from io import StringIO
+
+from django.core.management import call_command
+
+from api.models import Bookmark, Comment, Project
+
+from .base import APITestBase, make_project, make_user
+
+
+class EngagementCounterTests(APITestBase):
+    def setUp(self):
+        super().setUp()
+        self.author = make_user('maker')
+        self.reader = make_user('reader')
+        self.project = make_project(self.author)
+
+    def counts(self):
+        project = Project.objects.get(pk=self.project.pk)
+        return project.comment_count, project.bookmark_count
+
+    def test_counters_follow_comments_and_bookmarks(self):
+        comment = Comment.objects.create(project=self.project, author=self.reader, body='Nice')
+        reply = Comment.objects.create(project=self.project, author=self.author, body='Thanks', parent=comment)
+        Comment.objects.create(project=self.project, author=self.author, body='Thanks', parent=reply)
+        Bookmark.objects.create(project=self.project, user=self.reader)
+        self.assertEqual(self.counts(), (3, 1))
+        comment.refresh_from_db()
+        self.assertEqual(comment.reply_count, 1)
+
+        # Deleting a comment takes its replies with it
+        reply.delete()
+        Bookmark.objects.all().delete()
+        comment.refresh_from_db()
+        self.assertEqual((self.counts(), comment.reply_count), ((1, 0), 0))
+
+    def test_counters_never_go_below_zero(self):
+        comment = Comment.objects.create(project=self.project, author=self.reader, body='Nice')
+        Project.objects.update(comment_count=0)
+        comment.delete()
+        self.assertEqual(self.counts(), (0, 0))
+
+    def test_rebuild_counters(self):
+        Comment.objects.create(project=self.project, author=self.reader, body='Nice')
+        Bookmark.objects.create(project=self.project, user=self.reader)
+        Project.objects.update(comment_count=9, bookmark_count=9)
+        call_command('rebuild_counters', stdout=StringIO())
+        self.assertEqual(self.counts(), (1, 1))
+
+    def test_feed_sorts_by_stored_counts(self):
+        quiet = make_project(self.author, title='Quiet')
+        Comment.objects.create(project=self.project, author=self.reader, body='Nice')
+        response = self.client.get('/api/projects/', {'sort': 'popular'})
+        self.assertEqual([card['id'] for card in response.data['results']], [self.project.pk, quiet.pk])
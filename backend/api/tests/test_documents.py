@@ -0,0 +1,90 @@
+import json
+
+from django.test import override_settings
+
+from api.documents import fresh_document
+from api.models import Bookmark, Comment, Job, Project, ProjectDocument, UserProfile
+from api.serializers import ProjectDetailSerializer
+
+from .base import APITestBase, make_project, make_user, run_queued_jobs
+
+
+@override_settings(PROJECT_DOCUMENTS_ASYNC=False)
+class ProjectDocumentTests(APITestBase):
+    def setUp(self):
+        super().setUp()
+        self.author = make_user('maker')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project = make_project(self.author)
+        self.url = f'/api/projects/{self.project.id}/'
+
+    def has_document(self):
+        return ProjectDocument.objects.filter(pk=self.project.pk).exists()
+
+    def test_detail_is_served_from_the_document(self):
+        self.assertTrue(self.has_document())
+        self.client.get(self.url)  # creates today's view counter
+        # The project, the view count and the document
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url)
+        self.assertEqual((response.status_code, response['Content-Type']), (200, 'application/json'))
+        self.assertFalse(hasattr(response, 'data'))
+        project = Project.objects.get(pk=self.project.pk)
+        self.assertEqual(json.loads(response.content), json.loads(json.dumps(ProjectDetailSerializer(project).data)))
+
+        response = self.client.get(self.url, {'fields': 'id'})
+        self.assertEqual(response.data, {'id': self.project.id})
+
+    def test_changes_rebuild_the_document(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Comment.objects.create(project=self.project, author=self.author, body='Hello')
+        response = self.client.get(self.url)
+        self.assertFalse(hasattr(response, 'data'))
+        self.assertEqual(json.loads(response.content)['comments'][0]['body'], 'Hello')
+
+    def test_stale_document_is_served_live_and_rebuilt(self):
+        # Counters move without a rebuild of their own
+        Bookmark.objects.create(project=self.project, user=self.author)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            response = self.client.get(self.url)
+        self.assertEqual((response.data['bookmarks_count'], len(callbacks)), (1, 1))
+        response = self.client.get(self.url)
+        self.assertFalse(hasattr(response, 'data'))
+        self.assertEqual(json.loads(response.content)['bookmarks_count'], 1)
+
+    def test_embedded_rows_and_status_outdate_the_document(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            UserProfile.objects.get(user=self.author).save()
+        self.assertIsNone(fresh_document(Project.objects.get(pk=self.project.pk)))
+        self.assertEqual(self.client.get(self.url).data['author']['username'], 'maker')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Project.objects.get(pk=self.project.pk).save()
+        self.assertTrue(self.has_document())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Project.objects.filter(pk=self.project.pk).update(status='draft')
+            Project.objects.get(pk=self.project.pk).save()
+        self.assertFalse(self.has_document())
+
+
+@override_settings(PROJECT_DOCUMENTS_ASYNC=True)
+class QueuedDocumentRebuildTests(APITestBase):
+    def test_rebuilds_are_queued_for_the_job_worker(self):
+        author = make_user('maker')
+        project = make_project(author)
+        Comment.objects.create(project=project, author=author, body='Hello')
+        Comment.objects.create(project=project, author=author, body='Again')
+        # One queued job covers every change
+        jobs = Job.objects.filter(kind='rebuild_project_document')
+        self.assertEqual(list(jobs.values_list('payload', flat=True)), [{'project_id': project.pk}])
+        self.assertFalse(ProjectDocument.objects.exists())
+
+        run_queued_jobs()
+        self.assertEqual(jobs.get().status, 'succeeded')
+        document = json.loads(ProjectDocument.objects.get(pk=project.pk).document)
+        self.assertEqual(len(document['comments']), 2)
+
+        # A change after the rebuild queues another
+        Comment.objects.create(project=project, author=author, body='Third')
+        self.assertEqual(jobs.filter(status='queued').count(), 1)
@@ -0,0 +1,94 @@
+from api.models import BillOfMaterialItem, Category, Comment, Project, ProjectMember, Step
+
+from .base import APITestBase, make_project, make_user
+
+
+class FeedQueryCountTests(APITestBase):
+    """The feed is built from one query however many rows a page holds"""
+
+    def add_projects(self, count):
+        start = getattr(self, 'created', 0)
+        for i in range(start, start + count):
+            author = make_user(f'maker{i}')
+            category = Category.objects.get_or_create(name=f'Category {i % 3}')[0]
+            project = make_project(author, title=f'Project {i}', category=category)
+            BillOfMaterialItem.objects.create(project=project, item_type='Hardware', name=f'LED {i}')
+            Step.objects.create(project=project, step_number=1, title='Wire it', instructions='...')
+            Comment.objects.create(project=project, author=author, body='Nice')
+        self.created = start + count
+
+    def assert_feed_queries(self, page_size, expected):
+        with self.assertNumQueries(expected):
+            response = self.client.get('/api/projects/', {'page_size': page_size})
+        self.assertEqual(response.status_code, 200)
+        return response.data['results']
+
+    def test_query_count_does_not_grow_with_page_size(self):
+        self.add_projects(12)
+        small = self.assert_feed_queries(3, 1)
+        large = self.assert_feed_queries(12, 1)
+        self.assertEqual((len(small), len(large)), (3, 12))
+
+        card = large[0]
+        self.assertEqual(card['title'], 'Project 11')
+        self.assertEqual(card['author']['username'], 'maker11')
+        self.assertEqual(card['category']['name'], 'Category 2')
+        self.assertEqual(card['comments_count'], 1)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        self.add_projects(5)
+        self.assert_feed_queries(20, 1)
+        self.add_projects(15)
+        self.assertEqual(len(self.assert_feed_queries(20, 1)), 20)
+
+    def test_authenticated_feed(self):
+        self.add_projects(6)
+        self.client.force_authenticate(make_user('viewer'))
+        self.assert_feed_queries(3, 1)
+        self.assert_feed_queries(6, 1)
+
+
+class FeedKeysetPaginationTests(APITestBase):
+    def setUp(self):
+        super().setUp()
+        self.author = make_user('maker')
+        self.member = make_user('member')
+        for i in range(5):
+            make_project(self.author, title=f'P{i}')
+        private = make_project(self.author, status='private', title='Private')
+        ProjectMember.objects.create(project=private, user=self.member, contribution='Wiring')
+        Project.objects.filter(title='P3').update(comment_count=5)
+        self.client.force_authenticate(self.member)
+
+    def walk(self, url):
+        titles = []
+        while url:
+            # The page and the exact count; no OFFSET, however deep the page
+            with self.assertNumQueries(2):
+                response = self.client.get(url)
+            self.assertEqual(response.data['count'], 6)
+            titles += [card['title'] for card in response.data['results']]
+            url = response.data['next']
+        return titles
+
+    def test_cursor_walks_every_row_once(self):
+        titles = self.walk('/api/projects/?sort=popular&page_size=2&count=exact')
+        self.assertEqual(titles[0], 'P3')
+        self.assertEqual(sorted(titles), ['P0', 'P1', 'P2', 'P3', 'P4', 'Private'])
+
+    def test_rows_added_meanwhile_do_not_shift_pages(self):
+        first = self.client.get('/api/projects/?page_size=3')
+        make_project(self.author, title='Newer')
+        second = self.client.get(first.data['next'])
+        titles = [card['title'] for card in first.data['results'] + second.data['results']]
+        self.assertEqual(titles, ['Private', 'P4', 'P3', 'P2', 'P1', 'P0'])
+
+    def test_counts_and_numbered_pages(self):
+        response = self.client.get('/api/projects/')
+        self.assertNotIn('count', response.data)
+        self.assertEqual(response.data['results'][0]['title'], 'Private')
+        self.assertEqual(self.client.get('/api/projects/?page=1').data['count'], 6)
+        self.assertIsInstance(self.client.get('/api/projects/?count=estimate').data['count'], int)
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get('/api/projects/?cursor=garbage').status_code, 404)
@@ -0,0 +1,173 @@
+import io
+import os
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.test import override_settings
+from PIL import Image
+
+from api import images
+from api.models import BillOfMaterialItem, Job, Project, Step, UserProfile
+
+from .base import APITestBase, TemporaryMediaMixin, make_project, make_user, run_queued_jobs
+
+
+def jpeg(size=(2000, 1000), orientation=6):
+    """A phone-style JPEG with EXIF metadata and a green top-left corner"""
+    image = Image.new('RGB', size, (200, 10, 10))
+    image.paste((0, 255, 0), (0, 0, 100, 100))
+    exif = Image.Exif()
+    if orientation:
+        exif[0x0112] = orientation
+    exif[0x010F] = 'PhoneMaker'
+    buffer = io.BytesIO()
+    image.save(buffer, 'JPEG', exif=exif.tobytes())
+    return buffer.getvalue()
+
+
+def png(size=(300, 200)):
+    buffer = io.BytesIO()
+    Image.new('RGBA', size, (0, 0, 255, 128)).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+@override_settings(PROJECT_DOCUMENTS_ASYNC=False)
+class ImageVariantTests(TemporaryMediaMixin, APITestBase):
+    def setUp(self):
+        super().setUp()
+        self.author = make_user('maker')
+        self.project = make_project(self.author)
+
+    def open(self, name):
+        return Image.open(os.path.join(self.media_root, name))
+
+    def exists(self, name):
+        return os.path.exists(os.path.join(self.media_root, name))
+
+    def test_cover_is_cleaned_and_resized(self):
+        project = self.project
+        project.cover_image.save('phone.jpg', ContentFile(jpeg()))
+        self.assertEqual(
+            list(Job.objects.values_list('payload', flat=True)),
+            [{'model': 'Project', 'pk': project.pk, 'field': 'cover_image'}],
+        )
+        original = project.cover_image.name
+        # Clients fall back to the original until the job has run
+        self.assertIsNone(self.client.get(f'/api/projects/{project.id}/').json()['cover_image_variants'])
+
+        run_queued_jobs()
+        project.refresh_from_db()
+        self.assertNotEqual(project.cover_image.name, original)
+        self.assertFalse(self.exists(original))
+        with self.open(project.cover_image.name) as clean:
+            self.assertEqual(clean.size, (1000, 2000))
+            self.assertFalse(clean.getexif())
+            # Orientation 6 turns the marked top-left corner into the top-right one
+            self.assertGreater(clean.convert('RGB').getpixel((990, 10))[1], 200)
+        variants = project.cover_image_variants
+        self.assertEqual(variants['source'], project.cover_image.name)
+        self.assertTrue(variants['card'].startswith('project_covers/variants/'))
+        with self.open(variants['card']) as card, self.open(variants['detail']) as detail:
+            self.assertEqual((card.format, card.size, detail.size), ('WEBP', (240, 480), (600, 1200)))
+
+        urls = {'card': f"/media/{variants['card']}", 'detail': f"/media/{variants['detail']}"}
+        detail = self.client.get(f'/api/projects/{project.id}/').json()
+        self.assertEqual(detail['cover_image'], f'/media/{project.cover_image.name}')
+        self.assertEqual(detail['cover_image_variants'], urls)
+        card = self.client.get('/api/projects/?fields=id,cover_image_variants').data['results'][0]
+        self.assertEqual(card['cover_image_variants'], urls)
+
+    def test_replacing_and_removing_the_image(self):
+        project = self.project
+        project.cover_image.save('phone.jpg', ContentFile(jpeg()))
+        run_queued_jobs()
+        project.refresh_from_db()
+        first = project.cover_image_variants
+
+        # Saves that leave the image alone queue nothing
+        Job.objects.all().delete()
+        project.title = 'Renamed'
+        project.save()
+        self.assertFalse(Job.objects.exists())
+
+        project.cover_image.save('flat.png', ContentFile(png()))
+        run_queued_jobs()
+        project.refresh_from_db()
+        # Nothing to strip: the original is kept as is
+        self.assertEqual(project.cover_image.name, 'project_covers/flat.png')
+        self.assertFalse(self.exists(first['card']))
+        second = project.cover_image_variants
+        with self.open(second['card']) as card:
+            self.assertEqual(card.size, (300, 200))
+
+        project.cover_image = None
+        project.save()
+        run_queued_jobs()
+        project.refresh_from_db()
+        self.assertEqual(project.cover_image_variants, {})
+        self.assertFalse(self.exists(second['card']))
+
+        project.cover_image.save('again.png', ContentFile(png()))
+        run_queued_jobs()
+        project.refresh_from_db()
+        card = project.cover_image_variants['card']
+        project.delete()
+        self.assertFalse(self.exists(card))
+
+    def test_image_replaced_while_processing(self):
+        self.project.cover_image.save('a.png', ContentFile(png()))
+        build_variants = images.build_variants
+
+        def replaced_meanwhile(file, spec):
+            built = build_variants(file, spec)
+            Project.objects.filter(pk=self.project.pk).update(cover_image='project_covers/other.png')
+            return built
+
+        with mock.patch('api.images.build_variants', replaced_meanwhile):
+            run_queued_jobs()
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.cover_image_variants, {})
+        self.assertEqual(os.listdir(os.path.join(self.media_root, 'project_covers/variants')), [])
+
+    def test_unreadable_image_fails_at_once(self):
+        self.project.cover_image.save('bad.png', ContentFile(b'not an image'))
+        with self.assertLogs('api.jobs', 'WARNING'):
+            run_queued_jobs()
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts), ('failed', 1))
+        self.assertIn('not a readable image', job.last_error)
+
+    def test_avatar_step_and_bom_variants(self):
+        profile = UserProfile.objects.get(user=self.author)
+        profile.avatar.save('me.jpg', ContentFile(jpeg(size=(500, 300), orientation=0)))
+        step = Step.objects.create(project=self.project, step_number=1, title='Solder', instructions='Solder it')
+        step.image.save('step.png', ContentFile(png((3000, 3000))))
+        item = BillOfMaterialItem.objects.create(project=self.project, item_type='Hardware', name='LED')
+        item.image.save('led.png', ContentFile(png()))
+        self.assertEqual(run_queued_jobs(), 3)
+        self.assertEqual(Job.objects.filter(status='succeeded').count(), 3)
+
+        profile.refresh_from_db()
+        step.refresh_from_db()
+        item.refresh_from_db()
+        with self.open(profile.avatar.name) as avatar:
+            self.assertFalse(avatar.getexif())
+        with self.open(profile.avatar_variants['small']) as small, self.open(profile.avatar_variants['medium']) as medium:
+            self.assertEqual((small.size, medium.size), ((96, 96), (256, 256)))
+        with self.open(step.image_variants['card']) as card:
+            self.assertEqual(card.size, (480, 480))
+
+        small_url = f"/media/{profile.avatar_variants['small']}"
+        detail = self.client.get(f'/api/projects/{self.project.id}/').json()
+        self.assertEqual(detail['author']['profile']['avatar_variants']['small'], small_url)
+        self.assertEqual(detail['steps'][0]['image_variants']['card'], f"/media/{step.image_variants['card']}")
+        self.assertEqual(
+            detail['bill_of_materials'][0]['image_variants']['detail'], f"/media/{item.image_variants['detail']}",
+        )
+        card = self.client.get('/api/projects/').data['results'][0]
+        self.assertEqual(card['author']['avatar_variants']['small'], small_url)
+        # A fresh user, as a real request has, rather than one with the profile cached before processing
+        self.client.force_authenticate(User.objects.get(pk=self.author.pk))
+        me = self.client.get('/api/auth/profile/').data
+        self.assertEqual(set(me['profile']['avatar_variants']), {'small', 'medium'})
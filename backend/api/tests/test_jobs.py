@@ -0,0 +1,164 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from api import jobs
+from api.models import Job, ProjectSlideshow
+
+from .base import APITestBase, TemporaryMediaMixin, make_project, make_user, pdf_bytes, run_queued_jobs
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        self.calls = []
+        handlers = {
+            'ok': lambda job: self.calls.append(job.payload),
+            'flaky': mock.Mock(side_effect=OSError('disk hiccup')),
+            'broken': mock.Mock(side_effect=jobs.PermanentJobError('bad input')),
+        }
+        patcher = mock.patch.dict(jobs.HANDLERS, handlers)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_failing_jobs(self):
+        with self.assertLogs('api.jobs', 'WARNING'):
+            run_queued_jobs()
+
+    def test_unique_jobs_are_deduplicated_while_queued(self):
+        first = jobs.enqueue('ok', {'id': 1}, unique=True)
+        self.assertIsNone(jobs.enqueue('ok', {'id': 1}, unique=True))
+        self.assertIsNotNone(jobs.enqueue('ok', {'id': 2}, unique=True))
+
+        # A running job may have missed the change that queues the next one
+        self.assertEqual(jobs.claim_job('w1').pk, first.pk)
+        self.assertIsNotNone(jobs.enqueue('ok', {'id': 1}, unique=True))
+
+    def test_identical_jobs_never_run_at_the_same_time(self):
+        first = jobs.enqueue('ok', {'id': 1})
+        second = jobs.enqueue('ok', {'id': 1})
+        other = jobs.enqueue('ok', {'id': 2})
+        self.assertEqual(jobs.claim_job('w1').pk, first.pk)
+        self.assertEqual(jobs.claim_job('w2').pk, other.pk)
+        self.assertIsNone(jobs.claim_job('w3'))
+
+        jobs.run_job(Job.objects.get(pk=first.pk))
+        self.assertEqual(jobs.claim_job('w3').pk, second.pk)
+
+    def test_delayed_jobs_wait(self):
+        jobs.enqueue('ok', delay=60)
+        self.assertIsNone(jobs.claim_job('w1'))
+
+    def test_success(self):
+        jobs.enqueue('ok', {'id': 1})
+        self.assertEqual(run_queued_jobs(), 1)
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts, job.locked_by), ('succeeded', 1, ''))
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(self.calls, [{'id': 1}])
+
+    @override_settings(JOB_RETRY_BACKOFF=10, JOB_MAX_ATTEMPTS=3)
+    def test_retries_back_off_until_the_last_attempt(self):
+        jobs.enqueue('flaky')
+        for attempt, backoff in ((1, 10), (2, 20)):
+            self.run_failing_jobs()
+            job = Job.objects.get()
+            self.assertEqual((job.status, job.attempts), ('queued', attempt))
+            self.assertGreater(job.run_at, timezone.now() + timedelta(seconds=backoff - 2))
+            self.assertIn('disk hiccup', job.last_error)
+            Job.objects.update(run_at=timezone.now())
+        self.run_failing_jobs()
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts), ('failed', 3))
+
+    def test_permanent_errors_are_not_retried(self):
+        jobs.enqueue('broken')
+        self.run_failing_jobs()
+        self.assertEqual(Job.objects.values_list('status', 'attempts').get(), ('failed', 1))
+
+    def test_unknown_kind_fails(self):
+        jobs.enqueue('no-such-kind')
+        self.run_failing_jobs()
+        self.assertIn('No handler', Job.objects.get().last_error)
+
+    @override_settings(JOB_LOCK_TIMEOUT=60)
+    def test_stale_locks_are_requeued(self):
+        job = jobs.enqueue('ok', max_attempts=2)
+        self.assertEqual(jobs.claim_job('w1').pk, job.pk)
+        self.assertEqual(jobs.requeue_stale_jobs(), 0)
+        Job.objects.update(locked_at=timezone.now() - timedelta(minutes=2))
+        self.assertEqual(jobs.requeue_stale_jobs(), 1)
+
+        claimed = jobs.claim_job('w2')
+        self.assertEqual((claimed.attempts, claimed.locked_by), (2, 'w2'))
+        # Out of attempts when it goes stale again
+        Job.objects.update(locked_at=timezone.now() - timedelta(minutes=2))
+        jobs.requeue_stale_jobs()
+        self.assertEqual(Job.objects.get().status, 'failed')
+
+    @override_settings(JOB_LOCK_TIMEOUT=60)
+    def test_heartbeat_keeps_long_jobs(self):
+        jobs.enqueue('ok')
+        job = jobs.claim_job('w1')
+        Job.objects.update(locked_at=timezone.now() - timedelta(minutes=2))
+        self.assertTrue(jobs.heartbeat(job))
+        self.assertEqual(jobs.requeue_stale_jobs(), 0)
+
+        # Given up and claimed by another worker: the old run is told so
+        Job.objects.update(locked_at=timezone.now() - timedelta(minutes=2))
+        jobs.requeue_stale_jobs()
+        jobs.claim_job('w2')
+        self.assertFalse(jobs.heartbeat(job))
+
+
+@override_settings(SLIDE_RENDER_WORKERS=1, JOB_RETRY_BACKOFF=10, PROJECT_DOCUMENTS_ASYNC=False)
+class SlideshowJobTests(TemporaryMediaMixin, APITestBase):
+    def setUp(self):
+        super().setUp()
+        self.author = make_user('maker')
+        self.project = make_project(self.author)
+        self.client.force_authenticate(self.author)
+
+    def upload(self, data, name='deck.pdf'):
+        return self.client.post(
+            f'/api/projects/{self.project.id}/slideshow/',
+            {'original_file': SimpleUploadedFile(name, data, 'application/pdf')}, format='multipart',
+        )
+
+    def status(self):
+        return self.client.get(f'/api/projects/{self.project.id}/slideshow/status/').data
+
+    def run_failing_jobs(self):
+        with self.assertLogs('api.jobs', 'WARNING'):
+            run_queued_jobs()
+
+    def test_upload_is_converted_by_the_worker(self):
+        self.assertEqual(self.upload(pdf_bytes()).status_code, 201)
+        self.upload(pdf_bytes())
+        self.assertEqual(Job.objects.filter(kind='convert_slideshow', status='queued').count(), 1)
+        self.assertEqual(self.status()['status'], 'pending')
+
+        run_queued_jobs()
+        status = self.status()
+        self.assertEqual((status['status'], status['progress'], status['slides_count']), ('ready', 100, 3))
+
+    def test_unreadable_file_fails_at_once(self):
+        self.upload(b'not a pdf at all')
+        self.run_failing_jobs()
+        self.assertEqual(Job.objects.values_list('status', 'attempts').get(), ('failed', 1))
+        status = self.status()
+        self.assertEqual(status['status'], 'failed')
+        self.assertIn('PDF', status['error'])
+
+    def test_retried_failures_leave_the_slideshow_pending(self):
+        self.upload(pdf_bytes(1))
+        with mock.patch('api.slides.convert_slideshow', side_effect=OSError('disk hiccup')):
+            self.run_failing_jobs()
+            self.assertEqual(ProjectSlideshow.objects.get().conversion_status, 'pending')
+            for _ in range(2):
+                Job.objects.update(run_at=timezone.now())
+                self.run_failing_jobs()
+        self.assertEqual(Job.objects.values_list('status', 'attempts').get(), ('failed', 3))
+        self.assertEqual(ProjectSlideshow.objects.get().conversion_status, 'failed')
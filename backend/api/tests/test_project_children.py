@@ -0,0 +1,122 @@
+from unittest import mock
+
+from api.models import BillOfMaterialItem, ProjectMember, WorkAttribution
+from api.serializers import ProjectMemberSerializer
+
+from .base import APITestBase, make_project, make_user
+
+
+class ProjectChildEndpointTests(APITestBase):
+    def setUp(self):
+        super().setUp()
+        self.author = make_user('maker')
+        self.mate = make_user('mate')
+        self.helper = make_user('helper')
+        self.project = make_project(self.author)
+        self.base = f'/api/projects/{self.project.id}'
+        self.client.force_authenticate(self.author)
+
+    def add_member(self, user_id, **fields):
+        return self.client.post(f'{self.base}/team-members/', {
+            'user_id': user_id, 'role': 'Read', 'contribution': 'Wiring', **fields,
+        }, format='json')
+
+    def member_value(self, contribution):
+        return {'user_id': self.mate.id, 'role': 'Read', 'contribution': contribution}
+
+    def add_credit(self, name):
+        return WorkAttribution.objects.create(
+            project=self.project, contributor_name=name, credit_description='Help',
+            position=WorkAttribution.objects.filter(project=self.project).count(),
+        )
+
+    def test_create(self):
+        first = self.add_member(self.mate.id)
+        self.assertEqual((first.status_code, first.data['position']), (201, 0))
+        self.assertEqual(self.add_member(self.helper.id).data['position'], 1)
+
+        response = self.add_member(self.mate.id)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('already exists', str(response.data))
+        response = self.add_member(999999)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('No user with id 999999', str(response.data['user_id']))
+        self.assertEqual(ProjectMember.objects.count(), 2)
+
+        self.client.force_authenticate(self.mate)
+        self.assertEqual(self.client.get(f'{self.base}/team-members/').status_code, 200)
+        self.assertEqual(self.add_member(self.mate.id).status_code, 403)
+
+    def test_update(self):
+        member_id = self.add_member(self.mate.id).data['id']
+        self.add_member(self.helper.id)
+        url = f'{self.base}/team-members/{member_id}/'
+
+        response = self.client.patch(url, {'role': 'Manage'}, format='json')
+        self.assertEqual((response.status_code, response.data['role']), (200, 'Manage'))
+        response = self.client.patch(url, {'user_id': self.helper.id}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('conflicts', str(response.data))
+        self.assertEqual(self.client.patch(url, {'user_id': 999999}, format='json').status_code, 400)
+        self.assertEqual(ProjectMember.objects.get(pk=member_id).user, self.mate)
+
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_vanished_users_are_reported_not_failed_at_commit(self):
+        # As if the user were deleted between validation and the write
+        with mock.patch.object(ProjectMemberSerializer, 'validate_user_id', lambda serializer, value: value):
+            response = self.add_member(999999)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('no longer exists', str(response.data))
+        self.assertFalse(ProjectMember.objects.exists())
+
+    def test_reorder(self):
+        credits = [self.add_credit(name) for name in ('Ann', 'Bob', 'Cy')]
+        order = [credits[2].id, credits[0].id, credits[1].id]
+        response = self.client.post(f'{self.base}/work-attributions/reorder/', {'order': order}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['contributor_name'] for row in response.data], ['Cy', 'Ann', 'Bob'])
+        listed = self.client.get(f'{self.base}/work-attributions/').data
+        self.assertEqual([row['position'] for row in listed], [0, 1, 2])
+
+        for order in ([credits[0].id], order + [order[0]], 'nonsense'):
+            response = self.client.post(f'{self.base}/work-attributions/reorder/', {'order': order}, format='json')
+            self.assertEqual(response.status_code, 400)
+
+    def test_batch_changes(self):
+        credit = self.add_credit('Ann')
+        removed = self.add_credit('Bob')
+        response = self.client.patch(f'{self.base}/changes/', [
+            {'op': 'add', 'path': '/bill_of_materials', 'value': {'item_type': 'Hardware', 'name': 'LED'}},
+            {'op': 'replace', 'path': f'/work_attributions/{credit.id}', 'value': {'contributor_name': 'Anna'}},
+            {'op': 'remove', 'path': f'/work_attributions/{removed.id}'},
+            {'op': 'add', 'path': '/team_members/-', 'value': self.member_value('Code')},
+        ], format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        results = response.data['results']
+        self.assertEqual((results[0]['name'], results[1]['contributor_name'], results[2]), ('LED', 'Anna', None))
+        self.assertEqual(list(WorkAttribution.objects.values_list('contributor_name', flat=True)), ['Anna'])
+
+        # A failing operation undoes the ones before it
+        response = self.client.patch(f'{self.base}/changes/', [
+            {'op': 'add', 'path': '/bill_of_materials', 'value': {'item_type': 'Hardware', 'name': 'Motor'}},
+            {'op': 'add', 'path': '/team_members', 'value': self.member_value('Again')},
+        ], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(1, response.data['operations'])
+        self.assertEqual(list(BillOfMaterialItem.objects.values_list('name', flat=True)), ['LED'])
+
+        invalid = ({'op': 'add'}, [{'op': 'add', 'path': '/comments'}], [{'op': 'move', 'path': '/team_members/1'}])
+        for operations in invalid:
+            self.assertEqual(self.client.patch(f'{self.base}/changes/', operations, format='json').status_code, 400)
+
+    def test_nested_member_lists_are_validated(self):
+        for team, error in (
+            ([self.member_value('Code'), self.member_value('Again')], 'only once'),
+            ([self.member_value('Code'), {**self.member_value('Code'), 'user_id': 999999}], 'No user with id 999999'),
+        ):
+            response = self.client.patch(f'{self.base}/', {'team_members_data': team}, format='json')
+            self.assertEqual(response.status_code, 400)
+            self.assertIn(error, str(response.data['team_members_data']))
+        self.assertFalse(ProjectMember.objects.exists())
@@ -0,0 +1,70 @@
+from api.models import Bookmark, Category, Comment, ProjectMember, ProjectViewCount
+
+from .base import APITestBase, make_project, make_user
+
+
+class ConditionalDetailTests(APITestBase):
+    def setUp(self):
+        super().setUp()
+        self.author = make_user('maker')
+        self.reader = make_user('reader')
+        self.project = make_project(self.author)
+        self.url = f'/api/projects/{self.project.id}/'
+
+    def test_not_modified(self):
+        response = self.client.get(self.url)
+        etag = response['ETag']
+        self.assertFalse(response.has_header('Last-Modified'))
+        # The project row only: nothing is serialized and no view is counted
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual((response.status_code, response['ETag']), (304, etag))
+        self.assertEqual(ProjectViewCount.objects.get(project=self.project).views, 1)
+
+    def test_changes_to_the_page_change_the_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        Comment.objects.create(project=self.project, author=self.reader, body='Nice')
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+        etag = response['ETag']
+        ProjectMember.objects.create(project=self.project, user=self.reader, contribution='Wiring')
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_embedded_profiles_change_the_etag(self):
+        Comment.objects.create(project=self.project, author=self.reader, body='Nice')
+        etag = self.client.get(self.url)['ETag']
+        self.reader.profile.bio = 'Builds robots'
+        self.reader.profile.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['comments'][0]['author']['profile']['bio'], 'Builds robots')
+
+        etag = response['ETag']
+        self.project.category.name = 'Microcontrollers'
+        self.project.category.save()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_unrelated_rows_keep_the_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        stranger = make_user('stranger')
+        stranger.profile.bio = 'Elsewhere'
+        stranger.profile.save()
+        Category.objects.create(name='Robotics')
+        make_project(stranger, title='Other')
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_counters_change_the_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        Bookmark.objects.create(project=self.project, user=self.reader)
+        # A future If-Modified-Since can't turn the changed ETag into a 304
+        response = self.client.get(
+            self.url, HTTP_IF_NONE_MATCH=etag, HTTP_IF_MODIFIED_SINCE='Sun, 01 Jan 2090 00:00:00 GMT',
+        )
+        self.assertEqual((response.status_code, response.data['bookmarks_count']), (200, 1))
+
+    def test_hidden_projects_are_not_revealed(self):
+        draft = make_project(self.author, status='draft')
+        response = self.client.get(f'/api/projects/{draft.id}/', HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(response.status_code, 401)
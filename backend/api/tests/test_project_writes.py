@@ -0,0 +1,78 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.models import BillOfMaterialItem, CatalogComponent, Category, ProjectMember
+
+from .base import APITestBase, make_user
+
+
+def bom_rows(count):
+    return [{'item_type': 'Hardware', 'name': f'Part {i}', 'quantity': 1} for i in range(count)]
+
+
+class NestedWriteTests(APITestBase):
+    """Nested BOM and team lists are diffed against the stored rows: unchanged
+    rows are kept as they are, and only changes are written"""
+
+    def setUp(self):
+        super().setUp()
+        self.author = make_user('maker')
+        self.mate = make_user('mate')
+        self.category = Category.objects.create(name='Robots')
+        self.client.force_authenticate(self.author)
+        self.bom = bom_rows(30)
+        self.team = [{'user_id': self.mate.id, 'role': 'Read', 'contribution': 'Wiring'}]
+        self.url = self.create_project(self.bom, self.team)
+
+    def create_project(self, bom, team=()):
+        response = self.client.post('/api/projects/', {
+            'title': 'Robot', 'description': 'A robot', 'difficulty': 'Beginner',
+            'category_id': self.category.id, 'bill_of_materials_data': bom, 'team_members_data': list(team),
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        return f"/api/projects/{response.data['id']}/"
+
+    def patch(self, url, data):
+        response = self.client.patch(url, data, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        return response
+
+    def test_unchanged_lists_keep_their_rows(self):
+        items = set(BillOfMaterialItem.objects.values_list('id', flat=True))
+        members = set(ProjectMember.objects.values_list('id', flat=True))
+        self.patch(self.url, {'bill_of_materials_data': self.bom, 'team_members_data': self.team})
+        self.assertEqual(set(BillOfMaterialItem.objects.values_list('id', flat=True)), items)
+        self.assertEqual(set(ProjectMember.objects.values_list('id', flat=True)), members)
+
+    def test_changes_are_applied_in_place(self):
+        renamed = BillOfMaterialItem.objects.get(name='Part 1')
+        bom = [dict(item) for item in self.bom[:-1]]
+        bom[0]['quantity'] = 5
+        bom[1] = {'id': renamed.id, 'item_type': 'Hardware', 'name': 'Part 1b', 'quantity': 1}
+        bom.append({'item_type': 'Tool', 'name': 'Soldering iron', 'quantity': 1})
+        self.patch(self.url, {'bill_of_materials_data': bom})
+
+        self.assertEqual(BillOfMaterialItem.objects.get(name='Part 0').quantity, 5)
+        self.assertEqual(BillOfMaterialItem.objects.get(name='Part 1b').id, renamed.id)
+        self.assertFalse(BillOfMaterialItem.objects.filter(name='Part 29').exists())
+        self.assertEqual(BillOfMaterialItem.objects.count(), 30)
+        self.assertEqual(
+            list(BillOfMaterialItem.objects.order_by('position').values_list('name', flat=True)[:2]),
+            ['Part 0', 'Part 1b'],
+        )
+        usage = dict(CatalogComponent.objects.values_list('normalized_name', 'usage_count'))
+        self.assertEqual(
+            (usage['part 1'], usage['part 1b'], usage['part 29'], usage['soldering iron']), (0, 1, 0, 1),
+        )
+        # Lists left out of the request are not touched
+        self.assertEqual(ProjectMember.objects.count(), 1)
+
+    def test_write_queries_do_not_grow_with_unchanged_rows(self):
+        counts = []
+        for url, bom in ((self.create_project(bom_rows(5)), bom_rows(5)), (self.url, self.bom)):
+            self.patch(url, {'bill_of_materials_data': bom})  # warms the access cache
+            added = {'item_type': 'Tool', 'name': f'Pliers {len(bom)}'}
+            with CaptureQueriesContext(connection) as queries:
+                self.patch(url, {'bill_of_materials_data': bom + [added]})
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
@@ -0,0 +1,92 @@
+import io
+import json
+from decimal import Decimal
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.models import Bookmark, Message, Project, UserProfile
+from api.renderers import FastJSONParser, FastJSONRenderer
+from api.rows import BookmarkRows, MessageRows, ProjectCardRows
+from api.serializers import BookmarkSerializer, MessageSerializer, ProjectListSerializer
+
+from .base import APITestBase, make_project, make_user
+
+
+def list_request(query=''):
+    return Request(APIRequestFactory().get(f'/api/projects/{query}'))
+
+
+class RowSerializationTests(APITestBase):
+    """The .values() row builders must produce exactly what the serializers do"""
+
+    def setUp(self):
+        super().setUp()
+        self.author = make_user('maker')
+        UserProfile.objects.filter(user=self.author).update(
+            bio='Builds robots', skills=['soldering'], avatar='avatars/a.png', education=[{'school': 'MIT'}],
+        )
+        self.other = make_user('other')
+        UserProfile.objects.filter(user=self.other).delete()
+        self.project = make_project(
+            self.author, description='word ' * 100, elevator_pitch='pitch ' * 90, story_content='Story',
+            cover_image='project_covers/c.png',
+        )
+        make_project(self.other)
+        Bookmark.objects.create(user=self.author, project=self.project)
+        Message.objects.create(
+            recipient=self.author, sender=self.other, message_type='admin', title='Hello', content='Hi',
+            related_project=self.project,
+        )
+        Message.objects.create(recipient=self.author, message_type='system', title='Welcome', content='Hi')
+
+    def assertSameJSON(self, rows, serialized):
+        self.assertEqual(json.loads(json.dumps(rows)), json.loads(json.dumps(serialized)))
+
+    def test_rows_match_serializers(self):
+        queries = [
+            '', '?expand=author,story_content,description,elevator_pitch',
+            '?fields=id,author,category', '?expand=author&fields=author,created_at',
+        ]
+        for query in queries:
+            with self.subTest(query=query):
+                request = list_request(query)
+                projects = Project.objects.order_by('id')
+                rows = ProjectCardRows(request)
+                self.assertSameJSON(
+                    rows.data(rows.values(projects)),
+                    ProjectListSerializer(projects, many=True, context={'request': request}).data,
+                )
+                bookmarks = Bookmark.objects.order_by('id')
+                rows = BookmarkRows(request)
+                self.assertSameJSON(
+                    rows.data(rows.values(bookmarks)),
+                    BookmarkSerializer(bookmarks, many=True, context={'request': request}).data,
+                )
+        rows = MessageRows()
+        messages = Message.objects.all()
+        self.assertSameJSON(rows.data(rows.values(messages)), MessageSerializer(messages, many=True).data)
+
+    def test_listings_take_one_query(self):
+        self.client.force_authenticate(self.author)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/messages/')
+        self.assertEqual(len(response.json()), 2)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/bookmarks/')
+        self.assertEqual(response.json()[0]['project']['id'], self.project.id)
+
+
+class FastJSONTests(APITestBase):
+    def test_renders_like_drf(self):
+        data = {'text': 'line\u2028break', 1: [1.5, None], 'price': Decimal('1.5')}
+        rendered = FastJSONRenderer().render(data)
+        self.assertEqual(json.loads(rendered), json.loads(JSONRenderer().render(data)))
+        # Safe to embed in a <script> tag, like DRF's output
+        self.assertIn(b'\\u2028', rendered)
+
+    def test_parser(self):
+        self.assertEqual(FastJSONParser().parse(io.BytesIO(b'{"a": [1]}')), {'a': [1]})
+        response = self.client.post('/api/auth/login/', '{bad', content_type='application/json')
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,84 @@
+from unittest import mock, skipUnless
+
+from django.db import connection
+from django.test import SimpleTestCase
+
+from api.search import PostgresSearchBackend, SQLiteSearchBackend, get_search_backend, query_terms
+
+from .base import APITestBase, make_project, make_user
+
+
+class ProjectSearchTests(APITestBase):
+    def setUp(self):
+        super().setUp()
+        self.author = make_user('maker')
+        self.robot = make_project(self.author, title='Line following robot', description='Uses two light sensors')
+        self.lamp = make_project(
+            self.author, title='Desk lamp', description='A warm lamp for the robot workshop bench',
+        )
+        self.station = make_project(self.author, title='Weather station', description='Measures the wind')
+
+    def search(self, query, **params):
+        response = self.client.get('/api/search/', {'q': query, 'type': 'projects', **params})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def titles(self, query):
+        return [project['title'] for project in self.search(query)['projects']]
+
+    def test_title_matches_rank_first(self):
+        self.assertEqual(self.titles('robot'), ['Line following robot', 'Desk lamp'])
+        # Terms are prefixes and are all required
+        self.assertEqual(self.titles('robo'), ['Line following robot', 'Desk lamp'])
+        self.assertEqual(self.titles('robot lamp'), ['Desk lamp'])
+        self.assertEqual(self.titles('wind'), ['Weather station'])
+        ranks = [project['search_rank'] for project in self.search('robot')['projects']]
+        self.assertGreater(ranks[0], ranks[1])
+
+    def test_snippets_highlight_the_description(self):
+        lamp = self.search('workshop')['projects'][0]
+        self.assertIn('<mark>workshop</mark>', lamp['search_snippet'])
+
+    def test_query_syntax_is_not_interpreted(self):
+        for query in ('robot:* & !lamp', '"robot', 'robot OR (', 'NEAR(robot', '*'):
+            self.search(query)
+        self.assertEqual(self.search('!!!')['projects'], [])
+
+    def test_index_follows_saves_deletes_and_visibility(self):
+        self.robot.title = 'Line following rover'
+        self.robot.save()
+        self.assertEqual(self.titles('rover'), ['Line following rover'])
+        self.assertEqual(self.titles('robot'), ['Desk lamp'])
+
+        self.lamp.status = 'private'
+        self.lamp.save()
+        self.assertEqual(self.titles('robot'), [])
+        self.client.force_authenticate(self.author)
+        self.assertEqual(self.titles('robot'), ['Desk lamp'])
+
+        self.station.delete()
+        self.assertEqual(self.titles('wind'), [])
+
+    def test_pages(self):
+        first = self.search('maker', limit=2)
+        self.assertEqual((len(first['projects']), first['has_next']), (2, True))
+        second = self.search('maker', limit=2, page=2)
+        self.assertEqual((len(second['projects']), second['has_next']), (1, False))
+        ids = {project['id'] for project in first['projects'] + second['projects']}
+        self.assertEqual(ids, {self.robot.id, self.lamp.id, self.station.id})
+
+
+class SearchBackendTests(SimpleTestCase):
+    def test_query_terms(self):
+        self.assertEqual(query_terms('robot:* & "lamp" (x)'), ['robot', 'lamp', 'x'])
+
+    def test_backend_follows_the_database(self):
+        backend = get_search_backend()
+        expected = PostgresSearchBackend if connection.vendor == 'postgresql' else SQLiteSearchBackend
+        self.assertIsInstance(backend, expected)
+        with self.assertRaises(NotImplementedError):
+            get_search_backend(mock.Mock(vendor='mysql'))
+
+    @skipUnless(connection.vendor == 'sqlite', 'SQLite fallback')
+    def test_sqlite_fallback_matches_quoted_prefixes(self):
+        self.assertEqual(SQLiteSearchBackend(connection)._match('robot "lamp'), '"robot"* "lamp"*')
@@ -0,0 +1,231 @@
+import os
+import tempfile
+from unittest import mock
+
+import fitz
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, override_settings
+from PIL import Image
+
+from api import jobs, pdf_render, slides
+from api.models import Job, ProjectSlideshow, SlideshowSlide
+from api.pdf_render import page_ranges, render_pages, workers_for
+
+from .base import APITestBase, TemporaryMediaMixin, make_project, make_user, pdf_bytes, run_queued_jobs
+
+
+class PageRenderTests(SimpleTestCase):
+    def test_ranges(self):
+        self.assertEqual(page_ranges(10, 3), [(0, 4), (4, 7), (7, 10)])
+        self.assertEqual(page_ranges(2, 5), [(0, 1), (1, 2)])
+        # Small decks aren't worth a worker process
+        self.assertEqual(workers_for(7, 4), 1)
+        self.assertEqual(workers_for(9, 4), 2)
+        self.assertEqual(workers_for(200, 4), 4)
+
+    def test_pool_renders_pages_in_order(self):
+        with tempfile.TemporaryDirectory() as directory:
+            pdf_path = os.path.join(directory, 'deck.pdf')
+            with open(pdf_path, 'wb') as pdf:
+                pdf.write(pdf_bytes(11))
+            progress = []
+            paths = render_pages(pdf_path, directory, workers=2, progress=lambda *step: progress.append(step))
+            self.assertEqual([os.path.basename(path) for path in paths], [f'slide_{n}.png' for n in range(1, 12)])
+            self.assertEqual(progress, [(n, 11) for n in range(1, 12)])
+            with Image.open(paths[0]) as image:
+                self.assertEqual((image.format, image.size), ('PNG', (1190, 1684)))
+
+    def test_pages_in_flight_are_bounded(self):
+        with tempfile.TemporaryDirectory() as directory:
+            pdf_path = os.path.join(directory, 'deck.pdf')
+            with open(pdf_path, 'wb') as pdf:
+                pdf.write(pdf_bytes(40))
+            output = os.path.join(directory, 'pages')
+            os.mkdir(output)
+            order, peak = [], 0
+            for page_number, page in pdf_render.iter_pages(pdf_path, output, workers=2):
+                peak = max(peak, len(os.listdir(output)))
+                order.append(page_number)
+                os.remove(page['image'])
+            self.assertEqual(order, list(range(40)))
+            self.assertLessEqual(peak, 2 * pdf_render.RANGES_IN_FLIGHT * pdf_render.RANGE_PAGES)
+
+    def test_strip_fits_pages_of_another_shape(self):
+        document = fitz.open()
+        document.new_page(width=960, height=540)
+        document.new_page(width=540, height=960)
+        with tempfile.TemporaryDirectory() as directory:
+            pdf_path = os.path.join(directory, 'deck.pdf')
+            document.save(pdf_path)
+            strip = pdf_render.ThumbnailStrip(2)
+            for page_number, page in pdf_render.iter_pages(pdf_path, directory, derivatives=True):
+                strip.add(page_number, page['thumbnail'])
+            strip_path = os.path.join(directory, 'strip.webp')
+            self.assertTrue(strip.save(strip_path))
+            # Tiles take the first page's shape; the portrait page is fitted into its tile
+            with Image.open(strip_path) as image:
+                self.assertEqual(image.size, (320, 90))
+
+
+@override_settings(PROJECT_DOCUMENTS_ASYNC=False)
+class SlideshowTestBase(TemporaryMediaMixin, APITestBase):
+    def setUp(self):
+        super().setUp()
+        self.author = make_user('maker')
+        self.project = make_project(self.author)
+        self.client.force_authenticate(self.author)
+
+    def upload(self, data):
+        return self.client.post(
+            f'/api/projects/{self.project.id}/slideshow/',
+            {'original_file': SimpleUploadedFile('deck.pdf', data, 'application/pdf')}, format='multipart',
+        )
+
+    def slideshow(self):
+        return self.client.get(f'/api/projects/{self.project.id}/slideshow/get/').data
+
+    def status(self):
+        return self.client.get(f'/api/projects/{self.project.id}/slideshow/status/').data
+
+
+class PooledConversionTests(SlideshowTestBase):
+    @override_settings(SLIDE_RENDER_WORKERS=3)
+    def test_large_deck_is_rendered_by_the_pool(self):
+        self.upload(pdf_bytes(13))
+        run_queued_jobs()
+        status = self.status()
+        self.assertEqual((status['status'], status['slides_count']), ('ready', 13))
+        self.assertEqual([slide['slide_number'] for slide in self.slideshow()['slides']], list(range(1, 14)))
+
+
+@override_settings(SLIDE_RENDER_WORKERS=1)
+class SlideGenerationTests(SlideshowTestBase):
+    def slides_shown_per_save(self):
+        """Run the queued jobs; returns how many slides the API showed after each slide was saved"""
+        shown = []
+        save = SlideshowSlide.save
+
+        def spy(slide, *args, **kwargs):
+            save(slide, *args, **kwargs)
+            shown.append(len(self.slideshow()['slides']))
+
+        with mock.patch.object(SlideshowSlide, 'save', spy):
+            run_queued_jobs()
+        return shown
+
+    def test_first_conversion_fills_up_then_reconversions_swap(self):
+        self.upload(pdf_bytes(3))
+        self.assertEqual(self.slides_shown_per_save(), [1, 2, 3])
+
+        # The old deck stays up until every page of the new one is saved
+        self.upload(pdf_bytes(5))
+        self.assertEqual(self.slides_shown_per_save(), [3, 3, 3, 3, 3])
+        self.assertEqual(len(self.slideshow()['slides']), 5)
+        slideshow = ProjectSlideshow.objects.get()
+        self.assertEqual((slideshow.generation, slideshow.conversion_status), (2, 'ready'))
+
+        cleanup = Job.objects.get(kind='delete_slide_generation')
+        self.assertEqual(cleanup.payload['generation'], 1)
+        Job.objects.filter(pk=cleanup.pk).update(run_at=cleanup.created_at)
+        run_queued_jobs()
+        self.assertEqual(set(SlideshowSlide.objects.values_list('generation', flat=True)), {2})
+
+    def test_leftovers_of_interrupted_runs_are_cleared(self):
+        self.upload(pdf_bytes(2))
+        run_queued_jobs()
+        slideshow = ProjectSlideshow.objects.get()
+        ProjectSlideshow.objects.update(last_generation=2)
+        SlideshowSlide.objects.create(slideshow=slideshow, generation=2, slide_number=1, image='x.png')
+
+        self.upload(pdf_bytes(3))
+        run_queued_jobs()
+        slideshow.refresh_from_db()
+        self.assertEqual((slideshow.generation, slideshow.current_slides().count()), (3, 3))
+        self.assertEqual(set(SlideshowSlide.objects.values_list('generation', flat=True)), {1, 3})
+
+    def test_overtaken_run_drops_its_slides(self):
+        self.upload(pdf_bytes(2))
+        run_queued_jobs()
+        self.upload(pdf_bytes(4))
+        reporter = slides.ProgressReporter
+        overtaken = []
+
+        def overtaking_reporter(slideshow_id, job=None):
+            report = reporter(slideshow_id, job)
+
+            def progress(done, total):
+                report(done, total)
+                if not overtaken:
+                    overtaken.append(done)
+                    # Claims generation 3 and swaps it in while the first run renders generation 2
+                    self.assertEqual(slides.run_conversion(slideshow_id), 4)
+            return progress
+
+        slideshow = ProjectSlideshow.objects.get()
+        with mock.patch('api.slides.ProgressReporter', overtaking_reporter):
+            self.assertIsNone(slides.run_conversion(slideshow.pk))
+        slideshow.refresh_from_db()
+        self.assertEqual((slideshow.generation, slideshow.conversion_status), (3, 'ready'))
+        self.assertEqual(set(slideshow.slides.values_list('generation', flat=True)), {1, 3})
+        self.assertEqual(len(self.slideshow()['slides']), 4)
+
+    @mock.patch('api.slides.HEARTBEAT_INTERVAL', 0)
+    def test_long_conversions_renew_their_job_lock(self):
+        self.upload(pdf_bytes(3))
+        with mock.patch('api.slides.heartbeat', wraps=jobs.heartbeat) as heartbeat:
+            run_queued_jobs()
+        self.assertEqual(heartbeat.call_count, 3)
+        self.assertEqual(Job.objects.get().status, 'succeeded')
+
+    @mock.patch('api.slides.HEARTBEAT_INTERVAL', 0)
+    def test_conversion_stops_once_its_job_is_given_up(self):
+        self.upload(pdf_bytes(2))
+        run_queued_jobs()
+        self.upload(pdf_bytes(3))
+        job = jobs.claim_job('w1')
+        # Presumed dead and queued again while still running
+        Job.objects.filter(pk=job.pk).update(status='queued', locked_by='', locked_at=None)
+        jobs.run_job(job)
+        self.assertEqual(Job.objects.get(pk=job.pk).status, 'queued')
+        self.assertEqual(set(SlideshowSlide.objects.values_list('generation', flat=True)), {1})
+
+        run_queued_jobs()
+        slideshow = ProjectSlideshow.objects.get()
+        self.assertEqual((slideshow.generation, slideshow.current_slides().count()), (3, 3))
+        self.assertEqual(self.status()['status'], 'ready')
+
+
+@override_settings(SLIDE_RENDER_WORKERS=2)
+class SlideDerivativeTests(SlideshowTestBase):
+    def test_slides_have_previews_thumbnails_and_a_strip(self):
+        self.upload(pdf_bytes(12))
+        run_queued_jobs()
+        data = self.slideshow()
+        self.assertEqual(len(data['slides']), 12)
+        first = data['slides'][0]
+        self.assertEqual((first['width'], first['height']), (1190, 1684))
+        self.assertTrue(first['preview'].endswith(f'.{pdf_render.DERIVATIVE_EXTENSION}'))
+        self.assertEqual(first['srcset'], f"{first['preview']} 960w, {first['image']} 1190w")
+
+        slide = SlideshowSlide.objects.get(slide_number=1)
+        with Image.open(slide.preview.path) as preview, Image.open(slide.thumbnail.path) as thumbnail:
+            self.assertEqual((preview.size, thumbnail.width), ((960, 1359), 240))
+
+        strip = data['thumbnail_strip']
+        layout = (strip['columns'], strip['tile_width'], strip['tile_height'], strip['count'])
+        self.assertEqual(layout, (10, 160, 227, 12))
+        with Image.open(ProjectSlideshow.objects.get().thumbnail_strip.path) as image:
+            self.assertEqual(image.size, (1600, 227 * 2))
+
+        self.upload(pdf_bytes(2))
+        run_queued_jobs()
+        self.assertEqual(self.slideshow()['thumbnail_strip']['count'], 2)
+
+    def test_slides_without_derivatives(self):
+        slideshow = ProjectSlideshow.objects.create(
+            project=self.project, original_file='project_slideshows/deck.pdf', conversion_status='ready',
+        )
+        SlideshowSlide.objects.create(slideshow=slideshow, slide_number=1, image='slideshow_slides/slide_1.png')
+        data = self.slideshow()
+        self.assertEqual((data['slides'][0]['srcset'], data['slides'][0]['thumbnail']), ('', None))
+        self.assertIsNone(data['thumbnail_strip'])
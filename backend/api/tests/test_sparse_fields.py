@@ -0,0 +1,44 @@
+from api.models import Bookmark
+
+from .base import APITestBase, make_project, make_user
+
+
+class SparseFieldsetTests(APITestBase):
+    def setUp(self):
+        super().setUp()
+        self.author = make_user('maker')
+        self.project = make_project(
+            self.author, title='Robot arm', description='word ' * 100, elevator_pitch='pitch ' * 50,
+            story_content='<p>The story</p>',
+        )
+
+    def card(self, query=''):
+        return self.client.get(f'/api/projects/{query}').data['results'][0]
+
+    def test_compact_card(self):
+        card = self.card()
+        self.assertEqual(set(card['author']), {'id', 'username', 'avatar', 'avatar_variants'})
+        self.assertLessEqual(len(card['description']), 200)
+        self.assertNotIn('story_content', card)
+
+    def test_expand(self):
+        card = self.card('?expand=author,story_content,description')
+        self.assertIn('profile', card['author'])
+        self.assertEqual(card['story_content'], '<p>The story</p>')
+        self.assertEqual(len(card['description']), 500)
+
+    def test_fields(self):
+        self.assertEqual(set(self.card('?fields=id,title')), {'id', 'title'})
+        response = self.client.get(f'/api/projects/{self.project.id}/?fields=id,title,comments_count')
+        self.assertEqual(set(response.data), {'id', 'title', 'comments_count'})
+
+    def test_bookmarks_and_search(self):
+        Bookmark.objects.create(user=self.author, project=self.project)
+        self.client.force_authenticate(self.author)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/bookmarks/?fields=id,title')
+        self.assertEqual(set(response.data[0]), {'id', 'user', 'project', 'created_at'})
+        self.assertEqual(set(response.data[0]['project']), {'id', 'title'})
+
+        response = self.client.get('/api/search/?q=Robot&expand=author')
+        self.assertIn('profile', response.data['projects'][0]['author'])
@@ -0,0 +1,77 @@
+import io
+from datetime import datetime, time, timedelta
+
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+
+from api.models import Bookmark, Comment, Project, ProjectViewCount
+from api.trending import compute_scores, record_view, refresh_trending_scores
+
+from .base import APITestBase, make_project, make_user
+
+
+@override_settings(TRENDING_HALF_LIFE_HOURS=48, TRENDING_HORIZON_DAYS=14)
+class TrendingScoreTests(APITestBase):
+    def setUp(self):
+        super().setUp()
+        self.author = make_user('maker')
+        self.reader = make_user('reader')
+        self.project = make_project(self.author, title='Robot')
+        self.other = make_project(self.author, title='Lamp')
+        self.now = timezone.now()
+
+    def age(self, row, hours):
+        type(row).objects.filter(pk=row.pk).update(created_at=self.now - timedelta(hours=hours))
+
+    def test_views_are_counted_per_day(self):
+        yesterday = timezone.localdate() - timedelta(days=1)
+        record_view(self.project.pk)
+        record_view(self.project.pk)
+        record_view(self.project.pk, day=yesterday)
+        counts = ProjectViewCount.objects.filter(project=self.project)
+        self.assertEqual(dict(counts.values_list('date', 'views')), {timezone.localdate(): 2, yesterday: 1})
+
+    def test_activity_halves_every_half_life(self):
+        self.age(Comment.objects.create(project=self.project, author=self.reader, body='Nice'), 0)
+        self.age(Bookmark.objects.create(project=self.project, user=self.reader), 48)
+        self.age(Comment.objects.create(project=self.other, author=self.reader, body='Old'), 24 * 15)
+        scores = compute_scores(self.now)
+        # A fresh comment (3) and a bookmark one half-life old (5 / 2)
+        self.assertAlmostEqual(scores[self.project.pk], 5.5)
+        self.assertNotIn(self.other.pk, scores)
+
+        # A day's views count as happening at noon
+        day = timezone.localdate(self.now)
+        ProjectViewCount.objects.create(project=self.other, date=day, views=4)
+        noon = datetime.combine(day, time(12), tzinfo=timezone.get_current_timezone())
+        self.assertAlmostEqual(compute_scores(noon)[self.other.pk], 4.0)
+
+    def test_refresh_writes_scores_and_resets_quiet_projects(self):
+        quiet = make_project(self.author, title='Quiet')
+        Project.objects.filter(pk=quiet.pk).update(trending_score=9.0)
+        Comment.objects.create(project=self.other, author=self.reader, body='Nice')
+        # The cached anonymous feed is refreshed along with the scores
+        self.client.get('/api/projects/', {'sort': 'trending'})
+
+        self.assertEqual(refresh_trending_scores(self.now, batch_size=1), 1)
+        scores = dict(Project.objects.values_list('title', 'trending_score'))
+        self.assertEqual(scores['Quiet'], 0)
+        self.assertEqual(scores['Robot'], 0)
+        self.assertAlmostEqual(scores['Lamp'], 3.0, places=3)
+        feed = self.client.get('/api/projects/', {'sort': 'trending'}).data['results']
+        self.assertEqual(feed[0]['title'], 'Lamp')
+
+    def test_command(self):
+        record_view(self.project.pk)
+        output = io.StringIO()
+        call_command('refresh_trending', stdout=output)
+        self.assertIn('refreshed for 1 projects', output.getvalue())
+        self.assertGreater(Project.objects.get(pk=self.project.pk).trending_score, 0)
+
+    def test_only_full_detail_responses_count_as_views(self):
+        url = f'/api/projects/{self.project.id}/'
+        etag = self.client.get(url)['ETag']
+        self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.client.get(url)
+        self.assertEqual(ProjectViewCount.objects.get(project=self.project).views, 2)
@@ -0,0 +1,239 @@
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+import tracemalloc
+from datetime import timedelta
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+
+from api import uploads
+from api.models import Attachment, Job, ProjectMember, ProjectSlideshow, Upload, UploadChunk
+
+from .base import APITestBase, TemporaryMediaMixin, make_project, make_user, pdf_bytes
+
+
+def sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class PatternStream:
+    """A request body of ``size`` bytes that is never held in memory as a whole"""
+
+    BLOCK = bytes(range(251)) * 300
+
+    def __init__(self, size):
+        self.size = size
+        self.position = 0
+
+    def read(self, size):
+        size = min(size, self.size - self.position, 65536)
+        start = self.position % 251
+        self.position += size
+        return self.BLOCK[start:start + size]
+
+    @classmethod
+    def sha256(cls, size):
+        digest, stream = hashlib.sha256(), cls(size)
+        while data := stream.read(65536):
+            digest.update(data)
+        return digest.hexdigest()
+
+
+@override_settings(UPLOAD_CHUNK_SIZE=1000, PROJECT_DOCUMENTS_ASYNC=False)
+class ChunkedUploadTests(TemporaryMediaMixin, APITestBase):
+    def setUp(self):
+        super().setUp()
+        self.chunk_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.chunk_dir, ignore_errors=True)
+        chunks = override_settings(UPLOAD_CHUNK_DIR=self.chunk_dir)
+        chunks.enable()
+        self.addCleanup(chunks.disable)
+
+        self.author = make_user('maker')
+        self.project = make_project(self.author)
+        self.attachment = Attachment.objects.create(project=self.project, attachment_type='CAD', title='Frame')
+        self.client.force_authenticate(self.author)
+
+    def start(self, data, **fields):
+        body = {
+            'project_id': self.project.id, 'target': 'attachment', 'attachment_id': self.attachment.id,
+            'filename': 'frame.STEP', 'size': len(data), **fields,
+        }
+        return self.client.post('/api/uploads/', body, format='json')
+
+    def put(self, upload_id, index, data, digest=None):
+        return self.client.put(
+            f'/api/uploads/{upload_id}/chunks/{index}/', data=data, content_type='application/octet-stream',
+            HTTP_X_CHUNK_SHA256=sha256(data) if digest is None else digest,
+        )
+
+    def complete(self, upload_id):
+        return self.client.post(f'/api/uploads/{upload_id}/complete/')
+
+    def test_resumed_attachment_upload(self):
+        data = os.urandom(3500)
+        response = self.start(data, sha256=sha256(data).upper())
+        self.assertEqual(response.status_code, 201)
+        started = response.data
+        upload_id = started['id']
+        self.assertEqual((started['chunk_size'], started['chunk_count'], started['received']), (1000, 4, []))
+        parts = [data[offset:offset + 1000] for offset in range(0, 3500, 1000)]
+        self.assertEqual(self.put(upload_id, 3, parts[3]).status_code, 200)
+        self.assertEqual(self.put(upload_id, 1, parts[1]).data, {'index': 1, 'received': 2, 'chunk_count': 4})
+
+        # Wrong checksum, wrong size, out of range, no checksum
+        response = self.put(upload_id, 0, parts[0], digest='0' * 64)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('SHA-256', str(response.data))
+        self.assertEqual(self.put(upload_id, 0, parts[0][:10]).status_code, 400)
+        self.assertEqual(self.put(upload_id, 4, parts[0]).status_code, 400)
+        self.assertEqual(self.put(upload_id, 0, parts[0], digest='').status_code, 400)
+        self.assertEqual(sorted(os.listdir(os.path.join(self.chunk_dir, upload_id))), ['1', '3'])
+
+        response = self.client.get(f'/api/uploads/{upload_id}/')
+        self.assertEqual((response.data['received'], response.data['status']), ([1, 3], 'uploading'))
+        response = self.complete(upload_id)
+        self.assertEqual((response.status_code, response.data['missing']), (400, [0, 2]))
+        self.assertEqual(self.put(upload_id, 0, parts[0]).status_code, 200)
+        self.assertEqual(self.put(upload_id, 2, parts[2]).status_code, 200)
+        # A chunk sent again replaces the first copy
+        self.assertEqual(self.put(upload_id, 2, parts[2]).status_code, 200)
+
+        response = self.complete(upload_id)
+        self.assertEqual(response.status_code, 200)
+        completed = response.data['upload']
+        self.assertEqual((completed['status'], completed['sha256']), ('complete', sha256(data)))
+        self.assertEqual(response.data['attachment']['file_upload'], '/media/attachments/frame.STEP')
+        self.attachment.refresh_from_db()
+        with self.attachment.file_upload.open('rb') as stored:
+            self.assertEqual(stored.read(), data)
+        self.assertEqual(os.stat(self.attachment.file_upload.path).st_mode & 0o777, 0o644)
+        self.assertFalse(os.path.exists(os.path.join(self.chunk_dir, upload_id)))
+        self.assertFalse(UploadChunk.objects.exists())
+
+        # Completing again is harmless; sending more chunks is not
+        response = self.complete(upload_id)
+        self.assertEqual((response.status_code, response.data['attachment']['id']), (200, self.attachment.id))
+        self.assertEqual(self.put(upload_id, 0, parts[0]).status_code, 400)
+
+    def test_slideshow_upload_is_queued_for_conversion(self):
+        data = pdf_bytes(2)
+        response = self.start(data, target='slideshow', filename='deck.pdf', attachment_id=None)
+        self.assertEqual(response.status_code, 201)
+        upload_id = response.data['id']
+        for offset in range(0, len(data), 1000):
+            self.assertEqual(self.put(upload_id, offset // 1000, data[offset:offset + 1000]).status_code, 200)
+        response = self.complete(upload_id)
+        self.assertEqual(response.status_code, 200)
+        slideshow = ProjectSlideshow.objects.get(project=self.project)
+        self.assertEqual(response.data['slideshow']['id'], slideshow.id)
+        with slideshow.original_file.open('rb') as stored:
+            self.assertEqual(stored.read(), data)
+        self.assertEqual(slideshow.conversion_status, 'pending')
+        self.assertTrue(Job.objects.filter(kind='convert_slideshow').exists())
+        self.assertEqual(self.start(data, target='slideshow', filename='deck.pptx').status_code, 400)
+
+    @override_settings(UPLOAD_MAX_SIZE=2000, SLIDESHOW_MAX_SIZE=1000)
+    def test_size_limits_depend_on_the_target(self):
+        self.assertEqual(self.start(b'').status_code, 400)
+        self.assertEqual(self.start(b'x' * 2000).status_code, 201)
+        self.assertEqual(self.start(b'x' * 2001).status_code, 400)
+        slideshow = {'target': 'slideshow', 'filename': 'deck.pdf', 'attachment_id': None}
+        self.assertEqual(self.start(b'x' * 1000, **slideshow).status_code, 201)
+        response = self.start(b'x' * 1001, **slideshow)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('size', response.data)
+        # The same cap as a multipart upload
+        response = self.client.post(
+            f'/api/projects/{self.project.id}/slideshow/',
+            {'original_file': SimpleUploadedFile('deck.pdf', b'x' * 1001, 'application/pdf')}, format='multipart',
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_validation_and_permissions(self):
+        data = b'x' * 10
+        self.assertEqual(self.start(data, attachment_id=None).status_code, 400)
+        self.assertEqual(self.start(data, sha256='zz').status_code, 400)
+        other = Attachment.objects.create(
+            project=make_project(self.author, title='Other'), attachment_type='CAD', title='Frame',
+        )
+        self.assertEqual(self.start(data, attachment_id=other.id).status_code, 400)
+        response = self.start(data, filename='../../etc/passwd')
+        self.assertEqual(response.data['filename'], 'passwd')
+        upload_id = response.data['id']
+
+        self.client.force_authenticate(make_user('intruder'))
+        self.assertEqual(self.start(data).status_code, 403)
+        self.assertEqual(self.client.get(f'/api/uploads/{upload_id}/').status_code, 404)
+        self.assertEqual(self.put(upload_id, 0, data).status_code, 404)
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get(f'/api/uploads/{upload_id}/').status_code, 401)
+
+        self.client.force_authenticate(self.author)
+        self.assertEqual(self.put(upload_id, 0, data).status_code, 200)
+        self.assertEqual(self.client.delete(f'/api/uploads/{upload_id}/').status_code, 204)
+        self.assertFalse(os.path.exists(os.path.join(self.chunk_dir, upload_id)))
+
+    def test_chunks_are_refused_once_the_uploader_loses_access(self):
+        member = make_user('member')
+        membership = ProjectMember.objects.create(
+            project=self.project, user=member, role='Manage', contribution='Wiring',
+        )
+        self.client.force_authenticate(member)
+        data = b'z' * 1500
+        upload_id = self.start(data).data['id']
+        self.assertEqual(self.put(upload_id, 0, data[:1000]).status_code, 200)
+
+        membership.delete()
+        self.assertEqual(self.put(upload_id, 1, data[1000:]).status_code, 403)
+        self.assertEqual(self.complete(upload_id).status_code, 403)
+
+    def test_whole_file_checksum_mismatch(self):
+        data = b'abc' * 500
+        upload_id = self.start(data, sha256='1' * 64).data['id']
+        self.put(upload_id, 0, data[:1000])
+        self.put(upload_id, 1, data[1000:])
+        self.assertEqual(self.complete(upload_id).status_code, 400)
+        self.assertEqual(Upload.objects.get(pk=upload_id).status, 'failed')
+        self.attachment.refresh_from_db()
+        self.assertFalse(self.attachment.file_upload)
+        self.assertFalse(os.path.exists(os.path.join(self.chunk_dir, upload_id)))
+
+    def test_clean_uploads(self):
+        data = b'y' * 10
+        idle, active = self.start(data).data['id'], self.start(data).data['id']
+        self.put(idle, 0, data)
+        self.put(active, 0, data)
+        Upload.objects.filter(pk=idle).update(updated_at=timezone.now() - timedelta(days=2))
+        orphan = os.path.join(self.chunk_dir, 'orphan')
+        os.makedirs(orphan)
+        os.utime(orphan, (0, 0))
+
+        output = io.StringIO()
+        call_command('clean_uploads', stdout=output)
+        self.assertIn('Removed 1 uploads and 1 orphaned', output.getvalue())
+        self.assertEqual([str(pk) for pk in Upload.objects.values_list('pk', flat=True)], [active])
+        self.assertFalse(os.path.exists(os.path.join(self.chunk_dir, idle)))
+        self.assertTrue(os.path.exists(os.path.join(self.chunk_dir, active)))
+
+    def test_large_files_are_streamed(self):
+        size = 24 * 1024 * 1024
+        upload = Upload.objects.create(
+            user=self.author, project=self.project, target='attachment', attachment=self.attachment,
+            filename='big.bin', size=size, chunk_size=size // 2,
+        )
+        digest = PatternStream.sha256(size // 2)
+        tracemalloc.start()
+        for index in range(2):
+            uploads.write_chunk(upload, index, PatternStream(size // 2), size // 2, digest)
+        uploads.complete_upload(upload)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        self.assertLess(peak, 2 * 1024 * 1024)
+        self.attachment.refresh_from_db()
+        self.assertEqual(self.attachment.file_upload.size, size)
@@ -0,0 +1,125 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+
+from api.models import Project, ProjectMember
+from api.permissions import can_view_project, project_access
+
+from .base import APITestBase, make_project, make_user
+
+
+class VisibilityTests(TestCase):
+    def setUp(self):
+        self.author = make_user('maker')
+        self.member = make_user('member')
+        self.outsider = make_user('outsider')
+        self.published = make_project(self.author, title='Published')
+        self.private = make_project(self.author, status='private', title='Private')
+        make_project(self.author, status='draft', title='Draft')
+        ProjectMember.objects.create(project=self.private, user=self.member, contribution='Wiring')
+        ProjectMember.objects.create(project=self.published, user=self.member, contribution='Wiring')
+        ProjectMember.objects.create(project=self.published, user=self.outsider, contribution='Testing')
+
+    def titles(self, user):
+        return sorted(Project.objects.visible_to(user).values_list('title', flat=True))
+
+    def test_visible_to(self):
+        self.assertEqual(self.titles(None), ['Published'])
+        self.assertEqual(self.titles(self.outsider), ['Published'])
+        self.assertEqual(self.titles(self.member), ['Private', 'Published'])
+        self.assertEqual(self.titles(self.author), ['Draft', 'Private', 'Published'])
+
+    def test_involving(self):
+        involved = Project.objects.involving(self.member).order_by('title')
+        self.assertEqual(list(involved.values_list('title', flat=True)), ['Private', 'Published'])
+
+
+class VisibilityPlanTests(TestCase):
+    """Guards the plans of the feed's visibility queries: membership is an
+    EXISTS subquery, so rows never need de-duplicating, and each query reads
+    an index in feed order instead of sorting."""
+
+    def setUp(self):
+        self.author = make_user('maker')
+        self.member = make_user('member')
+        for i in range(30):
+            project = make_project(self.author, status=('published', 'draft', 'private')[i % 3], title=f'P{i}')
+        ProjectMember.objects.create(project=project, user=self.member, contribution='Wiring')
+        if connection.vendor == 'postgresql':
+            # Tables this small would otherwise always be scanned sequentially
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def feed_page(self, user):
+        return Project.objects.visible_to(user).order_by('-created_at', '-id')[:20]
+
+    def assert_no_deduplication(self, queryset):
+        sql = str(queryset.query).upper()
+        self.assertNotIn('DISTINCT', sql)
+        self.assertNotIn('JOIN', sql)
+        plan = queryset.explain()
+        for step in ('DISTINCT', 'TEMP B-TREE', 'Unique', 'HashAggregate', 'Sort'):
+            self.assertNotIn(step, plan)
+        return plan
+
+    def test_anonymous_feed_uses_status_created_index(self):
+        plan = self.assert_no_deduplication(self.feed_page(None))
+        self.assertIn('api_project_status_created_idx', plan)
+
+    def test_member_feed_checks_membership_with_exists(self):
+        queryset = self.feed_page(self.member)
+        self.assertIn('EXISTS', str(queryset.query).upper())
+        plan = self.assert_no_deduplication(queryset)
+        self.assertIn('api_project_newest_idx', plan)
+
+
+@override_settings(PROJECT_ACCESS_CACHE_TTL=300)
+class ProjectAccessCacheTests(APITestBase):
+    def setUp(self):
+        super().setUp()
+        self.author = make_user('maker')
+        self.member = make_user('member')
+        self.newcomer = make_user('newcomer')
+        self.project = make_project(self.author, status='private')
+        self.membership = ProjectMember.objects.create(
+            project=self.project, user=self.member, role='Manage', contribution='Wiring',
+        )
+
+    def status_for(self, user):
+        self.client.force_authenticate(user)
+        return self.client.get(f'/api/projects/{self.project.id}/').status_code
+
+    def test_reassigned_membership_revokes_the_previous_user(self):
+        self.assertEqual(self.status_for(self.member), 200)
+        self.assertEqual(self.status_for(self.newcomer), 403)
+        self.client.force_authenticate(self.author)
+        response = self.client.patch(
+            f'/api/projects/{self.project.id}/team-members/{self.membership.id}/',
+            {'user_id': self.newcomer.id}, format='json',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.status_for(self.member), 403)
+        self.assertEqual(self.status_for(self.newcomer), 200)
+
+    def test_nested_member_sync_revokes_replaced_users(self):
+        self.assertEqual(self.status_for(self.member), 200)
+        self.client.force_authenticate(self.author)
+        response = self.client.patch(f'/api/projects/{self.project.id}/', {'team_members_data': [
+            {'id': self.membership.id, 'user_id': self.newcomer.id, 'role': 'View', 'contribution': 'Wiring'},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.status_for(self.member), 403)
+        self.assertEqual(self.status_for(self.newcomer), 200)
+
+    def test_access_cached_before_the_commit_is_dropped_on_commit(self):
+        self.assertTrue(can_view_project(self.member, self.project))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.membership.delete()
+            # A concurrent request still seeing the membership caches it again
+            cache.set(f'project-access:{self.member.id}', {'accessible': {self.project.id}, 'manageable': set()})
+        self.assertFalse(can_view_project(self.member, self.project))
+
+    @override_settings(PROJECT_ACCESS_CACHE_TTL=0)
+    def test_no_caching_with_a_ttl_of_zero(self):
+        project_access(self.member)
+        self.assertIsNone(cache.get(f'project-access:{self.member.id}'))
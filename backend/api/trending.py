@@ -0,0 +1,94 @@
+"""
+Time-decayed trending scores.
+
+Each comment, bookmark and project view adds its weight to the project's
+score, and that contribution halves every TRENDING_HALF_LIFE_HOURS.
+``manage.py refresh_trending`` recomputes ``Project.trending_score`` from the
+activity of the last TRENDING_HORIZON_DAYS days and resets every other
+project to zero. Run it periodically, e.g. every 15 minutes from cron.
+``sort=trending`` is then a scan of the (trending_score, id) index.
+
+Views are counted per project and day in ProjectViewCount, so a page view
+costs one UPDATE rather than a row of its own.
+"""
+
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .caching import bump_model_version
+
+# Relative weight of one event of each kind
+COMMENT_WEIGHT = 3.0
+BOOKMARK_WEIGHT = 5.0
+VIEW_WEIGHT = 1.0
+
+
+def record_view(project_id, day=None):
+    """Count one view of a project for ``day`` (default today)"""
+    from .models import ProjectViewCount
+
+    day = day or timezone.localdate()
+    counts = ProjectViewCount.objects.filter(project_id=project_id, date=day)
+    if counts.update(views=F('views') + 1):
+        return
+    try:
+        with transaction.atomic():
+            ProjectViewCount.objects.create(project_id=project_id, date=day, views=1)
+    except IntegrityError:
+        # A concurrent request created today's row first
+        counts.update(views=F('views') + 1)
+
+
+def compute_scores(now=None):
+    """Decayed activity score of every project with activity inside the horizon"""
+    from .models import Bookmark, Comment, ProjectViewCount
+
+    now = now or timezone.now()
+    since = now - timedelta(days=settings.TRENDING_HORIZON_DAYS)
+    half_life = settings.TRENDING_HALF_LIFE_HOURS * 3600
+    scores = defaultdict(float)
+
+    def add(project_id, at, weight):
+        age = max((now - at).total_seconds(), 0)
+        scores[project_id] += weight * 0.5 ** (age / half_life)
+
+    for model, weight in ((Comment, COMMENT_WEIGHT), (Bookmark, BOOKMARK_WEIGHT)):
+        rows = model.objects.filter(created_at__gte=since).order_by().values_list('project_id', 'created_at')
+        for project_id, created_at in rows.iterator():
+            add(project_id, created_at, weight)
+
+    views = (
+        ProjectViewCount.objects.filter(date__gte=since.date())
+        .order_by().values_list('project_id', 'date', 'views')
+    )
+    tz = timezone.get_current_timezone()
+    for project_id, day, count in views.iterator():
+        # A day's views are counted as happening at noon
+        add(project_id, datetime.combine(day, time(12), tzinfo=tz), VIEW_WEIGHT * count)
+
+    return scores
+
+
+def refresh_trending_scores(now=None, batch_size=1000):
+    """Write fresh scores to Project.trending_score; returns how many are non-zero"""
+    from .models import Project
+
+    scores = compute_scores(now)
+    stale = set(Project.objects.filter(trending_score__gt=0).values_list('pk', flat=True)) - set(scores)
+    stale = list(stale)
+    with transaction.atomic():
+        for start in range(0, len(stale), batch_size):
+            Project.objects.filter(pk__in=stale[start:start + batch_size]).update(trending_score=0)
+        Project.objects.bulk_update(
+            [Project(pk=project_id, trending_score=score) for project_id, score in scores.items()],
+            ['trending_score'],
+            batch_size=batch_size,
+        )
+    # Bulk updates send no signals; expire cached feed pages explicitly
+    bump_model_version(Project)
+    return len(scores)
@@ -0,0 +1,182 @@
+"""
+Chunked, resumable uploads for attachment files and slideshow PDFs.
+
+A client starts an Upload with the file's name and size and gets back the
+chunk size to use. It then PUTs the chunks, in any order and as often as
+needed, each with its SHA-256 in the X-Chunk-SHA256 header; every chunk is
+streamed from the request to its own file under UPLOAD_CHUNK_DIR and kept
+only if the digest matches. After an interruption the client asks which
+chunks arrived and sends the rest. Completing the upload joins the chunks
+into one file, checks it against the SHA-256 sent at the start (if any) and
+stores it on the target: an Attachment's file_upload, or the project's
+slideshow, which is then queued for conversion.
+
+File contents pass through memory COPY_BUFFER bytes at a time, so a worker
+handling a large upload stays the same size. Uploads left unfinished for
+UPLOAD_EXPIRY seconds are removed by ``manage.py clean_uploads``.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from .models import ProjectSlideshow, Upload, UploadChunk
+
+COPY_BUFFER = 64 * 1024
+
+
+class AssembledFile(File):
+    """The joined chunks. Storages that support it move the file into
+    place rather than copying it."""
+
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def chunk_dir(upload):
+    return os.path.join(settings.UPLOAD_CHUNK_DIR, str(upload.pk))
+
+
+def chunk_path(upload, index):
+    return os.path.join(chunk_dir(upload), str(index))
+
+
+def expected_chunk_size(upload, index):
+    if index == upload.chunk_count - 1:
+        return upload.size - index * upload.chunk_size
+    return upload.chunk_size
+
+
+def discard_chunks(upload):
+    shutil.rmtree(chunk_dir(upload), ignore_errors=True)
+
+
+def write_chunk(upload, index, stream, content_length, sha256):
+    """Store chunk ``index`` read from ``stream`` if its size and SHA-256 match.
+    Sending a chunk again replaces it."""
+    if upload.status != 'uploading':
+        raise ValidationError({'detail': f'The upload is {upload.status} and takes no more chunks.'})
+    if not 0 <= index < upload.chunk_count:
+        raise ValidationError({'index': f'Chunks are numbered 0 to {upload.chunk_count - 1}.'})
+    expected = expected_chunk_size(upload, index)
+    if content_length != expected:
+        raise ValidationError({'detail': f'Chunk {index} must be {expected} bytes, got {content_length}.'})
+    sha256 = (sha256 or '').strip().lower()
+    if not sha256:
+        raise ValidationError({'detail': 'The X-Chunk-SHA256 header is required.'})
+
+    os.makedirs(chunk_dir(upload), exist_ok=True)
+    digest = hashlib.sha256()
+    fd, temp_path = tempfile.mkstemp(dir=chunk_dir(upload), prefix='.chunk-')
+    try:
+        with os.fdopen(fd, 'wb') as temp_file:
+            remaining = expected
+            while remaining:
+                data = stream.read(min(COPY_BUFFER, remaining))
+                if not data:
+                    raise ValidationError({'detail': f'Chunk {index} ended after {expected - remaining} bytes.'})
+                digest.update(data)
+                temp_file.write(data)
+                remaining -= len(data)
+        if digest.hexdigest() != sha256:
+            raise ValidationError({'detail': f'Chunk {index} does not match its SHA-256; send it again.'})
+        os.replace(temp_path, chunk_path(upload, index))
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    UploadChunk.objects.update_or_create(upload=upload, index=index, defaults={'size': expected, 'sha256': sha256})
+    Upload.objects.filter(pk=upload.pk).update(updated_at=timezone.now())
+
+
+def missing_chunks(upload):
+    return sorted(set(range(upload.chunk_count)) - set(upload.received_chunks()))
+
+
+def _assemble(upload):
+    """Join the chunks into one file in the chunk directory; returns its path and SHA-256"""
+    digest = hashlib.sha256()
+    fd, path = tempfile.mkstemp(dir=chunk_dir(upload), prefix='.assembled-')
+    try:
+        with os.fdopen(fd, 'wb') as output:
+            for index in range(upload.chunk_count):
+                with open(chunk_path(upload, index), 'rb') as chunk:
+                    while data := chunk.read(COPY_BUFFER):
+                        digest.update(data)
+                        output.write(data)
+        if os.path.getsize(path) != upload.size:
+            raise ValidationError({'detail': 'The stored chunks do not add up to the file size.'})
+    except BaseException:
+        os.remove(path)
+        raise
+    return path, digest.hexdigest()
+
+
+def _attach(upload, path):
+    """Store the assembled file on the upload's target and return the target row"""
+    with open(path, 'rb') as handle:
+        file = AssembledFile(handle, name=upload.filename)
+        if upload.target == 'attachment':
+            attachment = upload.attachment
+            attachment.file_upload.save(upload.filename, file)
+            return attachment
+        slideshow, _ = ProjectSlideshow.objects.get_or_create(project=upload.project)
+        slideshow.original_file.save(upload.filename, file)
+    # Converted by the background worker (manage.py run_jobs)
+    from .slides import queue_conversion
+    queue_conversion(slideshow)
+    return slideshow
+
+
+def complete_upload(upload):
+    """Assemble a fully received upload onto its target; returns the target row.
+
+    Completing an upload that already completed returns its target again,
+    so a client that lost the response can simply retry.
+    """
+    if upload.status == 'complete':
+        return upload.attachment if upload.target == 'attachment' else upload.project.slideshow
+    missing = missing_chunks(upload)
+    if missing:
+        raise ValidationError({'detail': 'Some chunks have not been received.', 'missing': missing[:100]})
+    # Claimed like a job, so chunks arriving now are refused and only one request assembles
+    if not Upload.objects.filter(pk=upload.pk, status='uploading').update(
+        status='assembling', updated_at=timezone.now(),
+    ):
+        upload.refresh_from_db()
+        raise ValidationError({'detail': f'The upload is already {upload.status}.'})
+
+    try:
+        path, sha256 = _assemble(upload)
+    except BaseException:
+        Upload.objects.filter(pk=upload.pk).update(status='uploading')
+        raise
+    if upload.sha256 and sha256 != upload.sha256:
+        os.remove(path)
+        Upload.objects.filter(pk=upload.pk).update(
+            status='failed', error='The assembled file does not match the SHA-256 given at the start.',
+        )
+        discard_chunks(upload)
+        raise ValidationError({'detail': 'The assembled file does not match its SHA-256; upload it again.'})
+
+    try:
+        with transaction.atomic():
+            target = _attach(upload, path)
+            upload.status, upload.sha256 = 'complete', sha256
+            upload.save(update_fields=['status', 'sha256', 'updated_at'])
+            upload.chunks.all().delete()
+    except BaseException:
+        Upload.objects.filter(pk=upload.pk).update(status='uploading')
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    discard_chunks(upload)
+    return target
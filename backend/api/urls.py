@@ -22,6 +22,19 @@ urlpatterns = [
     # Project endpoints
     path('projects/', views.ProjectListCreateView.as_view(), name='project_list_create'),
     path('projects/<int:pk>/', views.ProjectDetailView.as_view(), name='project_detail'),
+    path('projects/<int:project_id>/changes/', views.project_changes_view, name='project_changes'),
+    path('projects/<int:project_id>/team-members/', views.ProjectChildListCreateView.as_view(resource='team_members'), name='project_team_members'),
+    path('projects/<int:project_id>/team-members/reorder/', views.ProjectChildReorderView.as_view(resource='team_members'), name='project_team_members_reorder'),
+    path('projects/<int:project_id>/team-members/<int:pk>/', views.ProjectChildDetailView.as_view(resource='team_members'), name='project_team_members_detail'),
+    path('projects/<int:project_id>/work-attributions/', views.ProjectChildListCreateView.as_view(resource='work_attributions'), name='project_work_attributions'),
+    path('projects/<int:project_id>/work-attributions/reorder/', views.ProjectChildReorderView.as_view(resource='work_attributions'), name='project_work_attributions_reorder'),
+    path('projects/<int:project_id>/work-attributions/<int:pk>/', views.ProjectChildDetailView.as_view(resource='work_attributions'), name='project_work_attributions_detail'),
+    path('projects/<int:project_id>/bill-of-materials/', views.ProjectChildListCreateView.as_view(resource='bill_of_materials'), name='project_bill_of_materials'),
+    path('projects/<int:project_id>/bill-of-materials/reorder/', views.ProjectChildReorderView.as_view(resource='bill_of_materials'), name='project_bill_of_materials_reorder'),
+    path('projects/<int:project_id>/bill-of-materials/<int:pk>/', views.ProjectChildDetailView.as_view(resource='bill_of_materials'), name='project_bill_of_materials_detail'),
+    path('projects/<int:project_id>/attachments/', views.ProjectChildListCreateView.as_view(resource='attachments'), name='project_attachments'),
+    path('projects/<int:project_id>/attachments/reorder/', views.ProjectChildReorderView.as_view(resource='attachments'), name='project_attachments_reorder'),
+    path('projects/<int:project_id>/attachments/<int:pk>/', views.ProjectChildDetailView.as_view(resource='attachments'), name='project_attachments_detail'),
     
     # Comment endpoints
     path('projects/<int:project_id>/comments/', views.ProjectCommentListCreateView.as_view(), name='project_comments'),
@@ -47,10 +60,19 @@ urlpatterns = [
     # Slideshow endpoints
     path('projects/<int:project_id>/slideshow/', views.upload_slideshow, name='upload_slideshow'),
     path('projects/<int:project_id>/slideshow/get/', views.get_slideshow, name='get_slideshow'),
+    path('projects/<int:project_id>/slideshow/status/', views.slideshow_status, name='slideshow_status'),
     path('projects/<int:project_id>/slideshow/delete/', views.delete_slideshow, name='delete_slideshow'),
+    
+    # Chunked upload endpoints
+    path('uploads/', views.start_upload_view, name='start_upload'),
+    path('uploads/<uuid:upload_id>/', views.upload_detail_view, name='upload_detail'),
+    path('uploads/<uuid:upload_id>/chunks/<int:index>/', views.upload_chunk_view, name='upload_chunk'),
+    path('uploads/<uuid:upload_id>/complete/', views.complete_upload_view, name='complete_upload'),
 
     
     # Search endpoints
     path('search/', views.global_search_view, name='global_search'),
     path('components/search/', views.search_components_view, name='search_components'),
+    path('components/popular/', views.popular_components_view, name='popular_components'),
+    path('autocomplete/', views.autocomplete_view, name='autocomplete'),
 ] 
\ No newline at end of file
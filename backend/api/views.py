@@ -1,23 +1,56 @@
 from rest_framework import generics, status, permissions
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
+from django.conf import settings
 from django.contrib.auth import authenticate
 from django.contrib.auth.models import User
+from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
-from django.db.models import Q, Count
 from django.utils import timezone
-from datetime import timedelta
-from .models import Category, Project, Component, Step, Comment, Message, Bookmark, ProjectMember, ProjectSlideshow, BillOfMaterialItem
+from django.utils.cache import get_conditional_response
+from django.utils.decorators import method_decorator
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F, Q, Max
+from .models import (
+    Category, Project, Component, Step, Comment, Message, Bookmark, ProjectMember, ProjectSlideshow,
+    BillOfMaterialItem, CatalogComponent, WorkAttribution, Attachment, UserProfile, Upload
+)
 from .serializers import (
     UserSerializer, UserProfileSerializer, CategorySerializer, ProjectListSerializer,
-    ProjectDetailSerializer, ProjectCreateUpdateSerializer, CommentSerializer, CommentReplySerializer, MessageSerializer,
-    AdminUserSerializer, BookmarkSerializer, ProjectSlideshowSerializer, SlideshowUploadSerializer
+    ProjectDetailSerializer, ProjectCreateUpdateSerializer, CommentSerializer, CommentReplySerializer, CommentTree,
+    CommentThreadSlice, CommentThreadSerializer, ProjectSearchResultSerializer,
+    AdminUserSerializer, ProjectSlideshowSerializer, SlideshowUploadSerializer,
+    CatalogComponentSerializer, ProjectMemberSerializer, WorkAttributionSerializer, BillOfMaterialItemSerializer,
+    AttachmentSerializer, UploadSerializer
 )
+from .autocomplete import suggest_components, suggest_users
+from .caching import cache_anonymous_get
+from .documents import document_state, fresh_document, schedule_rebuild
+from .images import variant_urls
+from .pagination import CountingKeysetPagination, KeysetPagination
+from .permissions import can_manage_project, can_view_project, view_denied_message
+from .rows import BookmarkRows, MessageRows, ProjectCardRows
+from .search import get_search_backend
+from .slides import queue_conversion
+from .trending import record_view
+from .uploads import complete_upload, missing_chunks, write_chunk
 from rest_framework.permissions import IsAdminUser
-import subprocess
-import sys
-import os
+import hashlib
+
+
+MANAGE_DENIED_MESSAGE = 'You can only modify your own or managed projects.'
+
+
+def _int_query_param(request, name, default, maximum):
+    """Read a positive integer query parameter, clamped to ``maximum``"""
+    try:
+        value = int(request.query_params.get(name, default))
+    except (TypeError, ValueError):
+        value = default
+    return max(0, min(value, maximum))
 
 
 # Authentication Views
@@ -86,19 +119,58 @@ def user_search_view(request):
     if not query:
         return Response([], status=status.HTTP_200_OK)
     
-    # Limit search results to prevent performance issues
-    users = User.objects.filter(
-        Q(username__icontains=query) |
-        Q(first_name__icontains=query) |
-        Q(last_name__icontains=query) |
-        Q(email__icontains=query)
-    ).exclude(id=request.user.id)[:20]  # Exclude current user and limit results
+    # Ranked typeahead lookup; one spare id in case the current user is among them
+    user_ids, _ = suggest_users(query, limit=21)
+    user_ids = [user_id for user_id in user_ids if user_id != request.user.id][:20]
+    users = User.objects.select_related('profile').in_bulk(user_ids)
+    
+    return Response(UserSerializer([users[user_id] for user_id in user_ids if user_id in users], many=True).data)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def autocomplete_view(request):
+    """Compact typeahead suggestions for users or BOM components.
+
+    Answers within AUTOCOMPLETE_BUDGET_MS; ``partial`` is true when the lookup
+    was cut off and the results are empty for that reason.
+    """
+    query = request.GET.get('q', '').strip()
+    kind = request.GET.get('kind', 'components')
+    limit = _int_query_param(request, 'limit', 10, 20) or 10
+    
+    if not query:
+        return Response({'query': query, 'results': [], 'partial': False})
+    
+    if kind == 'users':
+        user_ids, partial = suggest_users(query, limit=limit)
+        users = User.objects.select_related('profile').in_bulk(user_ids)
+        results = []
+        for user_id in user_ids:
+            user = users.get(user_id)
+            if user is None:
+                continue
+            profile = user.profile if hasattr(user, 'profile') else None
+            avatar = profile.avatar if profile is not None else None
+            results.append({
+                'id': user.id,
+                'username': user.username,
+                'first_name': user.first_name,
+                'last_name': user.last_name,
+                'avatar': avatar.url if avatar else None,
+                'avatar_variants': variant_urls(profile, 'avatar') if profile is not None else None,
+            })
+    elif kind == 'components':
+        results, partial = suggest_components(query, request.GET.get('type', '').strip(), limit=limit)
+    else:
+        return Response({'error': 'kind must be "users" or "components"'}, status=status.HTTP_400_BAD_REQUEST)
     
-    return Response(UserSerializer(users, many=True).data)
+    return Response({'query': query, 'results': results, 'partial': partial})
 
 
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
+@cache_anonymous_get(User, UserProfile)
 def user_detail_view(request, username):
     """Get public user profile by username (no email)"""
     user = get_object_or_404(User, username=username)
@@ -119,11 +191,12 @@ def user_projects_view(request, user_id):
         author=user,
         status__in=['published', 'pending']
     )
-    serializer = ProjectListSerializer(projects, many=True)
-    return Response(serializer.data)
+    cards = ProjectCardRows(request)
+    return Response(cards.data(cards.values(projects)))
 
 
 # Category Views
+@method_decorator(cache_anonymous_get(Category), name='list')
 class CategoryListView(generics.ListAPIView):
     """List all categories"""
     queryset = Category.objects.all()
@@ -133,10 +206,22 @@ class CategoryListView(generics.ListAPIView):
 
 
 # Project Views
+@method_decorator(cache_anonymous_get(Project, Category, Comment, Bookmark, User, UserProfile), name='list')
 class ProjectListCreateView(generics.ListCreateAPIView):
-    """List projects and create new project"""
+    """List projects and create new project.
+
+    The feed is keyset-paginated on the sort's stored key plus id (see
+    CountingKeysetPagination); requests with ``?page=`` get numbered pages.
+    """
     queryset = Project.objects.all()
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    # Unique, indexed orderings for each ?sort=
+    feed_orderings = {
+        'newest': ('-created_at', '-id'),
+        'popular': ('-comment_count', '-id'),  # comment count as a proxy for popularity
+        'trending': ('-trending_score', '-id'),  # kept fresh by the refresh_trending command
+        'most_respects': ('-bookmark_count', '-id'),  # bookmarks count as "respects"
+    }
     
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -147,20 +232,9 @@ class ProjectListCreateView(generics.ListCreateAPIView):
         serializer.save(author=self.request.user)
     
     def get_queryset(self):
-        user = self.request.user if self.request.user.is_authenticated else None
-        queryset = Project.objects.all()
-
-        # Public visitors see only published projects
-        if user is None:
-            queryset = queryset.filter(status='published')
-        # Non-staff authenticated users see their own projects, published projects, and private projects they're members of
-        elif not user.is_staff:
-            queryset = queryset.filter(
-                Q(status='published') | 
-                Q(author=user) |
-                Q(team_members__user=user)  # Include private projects where user is a member
-            ).distinct()
-        # Staff users see everything
+        # Published projects, plus the user's own and those they're a member of
+        # (everything for staff)
+        queryset = Project.objects.visible_to(self.request.user)
 
         # Additional optional filters
         category = self.request.query_params.get('category')
@@ -185,37 +259,37 @@ class ProjectListCreateView(generics.ListCreateAPIView):
 
         # Search functionality
         if search_query:
-            queryset = queryset.filter(
-                Q(title__icontains=search_query) |
-                Q(description__icontains=search_query) |
-                Q(elevator_pitch__icontains=search_query) |
-                Q(story_content__icontains=search_query) |
-                Q(author__username__icontains=search_query) |
-                Q(category__name__icontains=search_query)
-            )
+            queryset = get_search_backend().filter(queryset, search_query)
 
         # Sorting
-        sort_param = self.request.query_params.get('sort', 'newest')
-        
-        if sort_param == 'newest':
-            queryset = queryset.order_by('-created_at')
-        elif sort_param == 'popular':
-            # Order by comment count as a proxy for popularity
-            queryset = queryset.annotate(comment_count=Count('comments')).order_by('-comment_count', '-created_at')
-        elif sort_param == 'trending':
-            # Projects with recent comments (last 7 days)
-            week_ago = timezone.now() - timedelta(days=7)
-            queryset = queryset.annotate(
-                recent_comments=Count('comments', filter=Q(comments__created_at__gte=week_ago))
-            ).order_by('-recent_comments', '-created_at')
-        elif sort_param == 'most_respects':
-            # For now, use comment count as proxy for "respects"
-            queryset = queryset.annotate(comment_count=Count('comments')).order_by('-comment_count', '-created_at')
-        else:
-            # Default to newest
-            queryset = queryset.order_by('-created_at')
+        queryset = queryset.order_by(*self.get_feed_ordering())
 
         return queryset
+    
+    def list(self, request, *args, **kwargs):
+        # Cards are built from .values() rows rather than model instances
+        queryset = self.filter_queryset(self.get_queryset())
+        cards = ProjectCardRows(request)
+        rows = cards.values(queryset, *(term.lstrip('-') for term in self.get_feed_ordering()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(cards.data(page))
+        return Response(cards.data(rows))
+    
+    def get_feed_ordering(self):
+        sort_param = self.request.query_params.get('sort', 'newest')
+        # Default to newest
+        return self.feed_orderings.get(sort_param, self.feed_orderings['newest'])
+    
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if 'page' in self.request.query_params:
+                self._paginator = super().paginator
+            else:
+                # Walk the sort's index from the last seen row instead of OFFSET
+                self._paginator = CountingKeysetPagination(ordering=self.get_feed_ordering())
+        return self._paginator
 
 
 class ProjectDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -232,62 +306,343 @@ class ProjectDetailView(generics.RetrieveUpdateDestroyAPIView):
         obj = super().get_object()
         # Only allow project author, staff, or manager collaborator to update/delete
         if self.request.method in ['PUT', 'PATCH', 'DELETE']:
-            user = self.request.user
-            is_admin = user.is_staff
-            is_author = obj.author == user
-            is_manager = ProjectMember.objects.filter(project=obj, user=user, role='Manage').exists()
-            if not (is_author or is_admin or is_manager):
-                self.permission_denied(
-                    self.request, 
-                    message='You can only modify your own or managed projects.'
-                )
-        # Prevent non-authenticated or non-owner from viewing drafts/pending/private
-        if obj.status not in ['published', 'private']:
-            user = self.request.user if self.request.user.is_authenticated else None
-            if user is None or (not user.is_staff and obj.author != user):
-                self.permission_denied(
-                    self.request,
-                    message='This project is not published.'
-                )
-        # For private projects, check if user is a member
-        elif obj.status == 'private':
-            user = self.request.user if self.request.user.is_authenticated else None
-            if user is None or (not user.is_staff and obj.author != user and not obj.team_members.filter(user=user).exists()):
-                self.permission_denied(
-                    self.request,
-                    message='This project is private and you are not a member.'
-                )
+            if not can_manage_project(self.request.user, obj):
+                self.permission_denied(self.request, message=MANAGE_DENIED_MESSAGE)
+        # Drafts/pending are limited to author and staff, private projects to members
+        if not can_view_project(self.request.user, obj):
+            self.permission_denied(self.request, message=view_denied_message(obj))
         return obj
+    
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        
+        # Revalidations are answered with 304 before any serialization; only
+        # full responses count as views
+        etag = _project_etag(instance)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            record_view(instance.pk)
+            response = self.document_response(instance)
+        response['ETag'] = etag
+        return response
+    
+    def document_response(self, instance):
+        # Published projects are served from their stored document while it
+        # is fresh; sparse and browsable responses are always built live
+        if 'fields' in self.request.query_params or not isinstance(self.request.accepted_renderer, JSONRenderer):
+            return Response(self.get_serializer(instance).data)
+        document = fresh_document(instance)
+        if document is not None:
+            return HttpResponse(document, content_type='application/json')
+        if instance.status == 'published':
+            schedule_rebuild(instance.pk)
+        return Response(self.get_serializer(instance).data)
+
+
+def _project_etag(project):
+    """Strong ETag for a project's detail payload.
+    
+    Edits to the project itself move ``updated_at``; edits to its members,
+    BOM, attachments, steps or comments, and to the users, profiles and
+    category it shows, move ``children_updated_at``. Both are part of the
+    document state (api.documents) along with the counters, so the ETag
+    changes exactly when the stored document goes stale. There is no
+    Last-Modified: counters change without moving either timestamp.
+    """
+    state = f'{project.pk}:{document_state(project)}'
+    return '"%s"' % hashlib.sha1(state.encode('utf-8')).hexdigest()
+
+
+# Project sub-resource views
+PROJECT_CHILD_RESOURCES = {
+    'team_members': (ProjectMember, ProjectMemberSerializer),
+    'work_attributions': (WorkAttribution, WorkAttributionSerializer),
+    'bill_of_materials': (BillOfMaterialItem, BillOfMaterialItemSerializer),
+    'attachments': (Attachment, AttachmentSerializer),
+}
+
+
+def _get_visible_project(request, project_id):
+    project = get_object_or_404(Project, pk=project_id)
+    if not can_view_project(request.user, project):
+        raise PermissionDenied(view_denied_message(project))
+    return project
+
+
+def _get_project_for(request, project_id):
+    """Fetch a project, applying the same read/write rules as ProjectDetailView"""
+    if request.method in permissions.SAFE_METHODS:
+        return _get_visible_project(request, project_id)
+    project = get_object_or_404(Project, pk=project_id)
+    if not can_manage_project(request.user, project):
+        raise PermissionDenied(MANAGE_DENIED_MESSAGE)
+    return project
+
+
+def _child_queryset(model, project):
+    queryset = model.objects.filter(project=project)
+    if model is ProjectMember:
+        queryset = queryset.select_related('user__profile')
+    return queryset
+
+
+# SQLSTATE classes of IntegrityError, and the SQLite messages for the same
+UNIQUE_VIOLATION = ('23505', 'UNIQUE constraint failed')
+FOREIGN_KEY_VIOLATION = ('23503', 'FOREIGN KEY constraint failed', 'invalid foreign key')
+
+
+def _is_violation(exc, kind):
+    code, *messages = kind
+    return getattr(exc.__cause__, 'pgcode', None) == code or any(message in str(exc) for message in messages)
+
+
+def _save_child(serializer, conflict_message, **fields):
+    """Save a child row in a savepoint and report constraint failures as 400s.
+    
+    Foreign keys are checked when the transaction commits, so they are
+    checked here at once: a user deleted since validation would otherwise
+    fail the commit with a 500.
+    """
+    model = serializer.Meta.model
+    try:
+        with transaction.atomic():
+            instance = serializer.save(**fields)
+            connection.check_constraints(table_names=[model._meta.db_table])
+            return instance
+    except IntegrityError as exc:
+        if _is_violation(exc, UNIQUE_VIOLATION):
+            raise ValidationError({'detail': conflict_message})
+        if _is_violation(exc, FOREIGN_KEY_VIOLATION):
+            raise ValidationError({
+                'detail': f'This {model._meta.verbose_name} refers to a row that no longer exists.'
+            })
+        raise
+
+
+def _create_child(project, serializer):
+    """Save a validated child row at the end of the project's list"""
+    serializer.validated_data.pop('id', None)
+    model = serializer.Meta.model
+    last = model.objects.filter(project=project).aggregate(last=Max('position'))['last']
+    return _save_child(
+        serializer, f'This {model._meta.verbose_name} already exists on the project.',
+        project=project, position=0 if last is None else last + 1,
+    )
+
+
+def _update_child(serializer):
+    serializer.validated_data.pop('id', None)  # rows can't be re-keyed
+    return _save_child(serializer, 'This change conflicts with another row of the project.')
+
+
+def _reorder_children(project, model, order):
+    """Rewrite ``position`` so rows follow ``order``, a list of every row id"""
+    rows = {row.id: row for row in model.objects.filter(project=project)}
+    if not isinstance(order, list) or sorted(map(str, order)) != sorted(map(str, rows)):
+        raise ValidationError({'order': 'Must list the id of every row exactly once.'})
+    changed = []
+    for position, row_id in enumerate(order):
+        row = rows[int(row_id)]
+        if row.position != position:
+            row.position = position
+            changed.append(row)
+    model.objects.bulk_update(changed, ['position'])
+    if changed:
+        # bulk_update sends no signals
+        Project.objects.filter(pk=project.pk).update(children_updated_at=timezone.now())
+
+
+class ProjectChildMixin:
+    """Shared setup for the per-row endpoints of a project's team members,
+    work attributions, BOM items and attachments. ``resource`` is one of
+    PROJECT_CHILD_RESOURCES and is passed to as_view() from urls.py."""
+    resource = None
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = None
+    
+    @property
+    def model(self):
+        return PROJECT_CHILD_RESOURCES[self.resource][0]
+    
+    def get_serializer_class(self):
+        return PROJECT_CHILD_RESOURCES[self.resource][1]
+    
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        # Check access to the project before validating any payload
+        self.get_project()
+    
+    def get_project(self):
+        if not hasattr(self, '_project'):
+            self._project = _get_project_for(self.request, self.kwargs['project_id'])
+        return self._project
+    
+    def get_queryset(self):
+        return _child_queryset(self.model, self.get_project())
+
+
+class ProjectChildListCreateView(ProjectChildMixin, generics.ListCreateAPIView):
+    """List a project's rows of one kind in display order, or append a row"""
+    
+    def perform_create(self, serializer):
+        _create_child(self.get_project(), serializer)
+
+
+class ProjectChildDetailView(ProjectChildMixin, generics.RetrieveUpdateDestroyAPIView):
+    """Retrieve, update or delete a single row without resending the project"""
+    
+    def perform_update(self, serializer):
+        _update_child(serializer)
+
+
+class ProjectChildReorderView(ProjectChildMixin, generics.GenericAPIView):
+    """Set the display order of a project's rows from a list of ids"""
+    
+    def post(self, request, *args, **kwargs):
+        project = self.get_project()
+        with transaction.atomic():
+            _reorder_children(project, self.model, request.data.get('order'))
+        serializer = self.get_serializer(self.get_queryset(), many=True)
+        return Response(serializer.data)
+
+
+@api_view(['PATCH'])
+@permission_classes([permissions.IsAuthenticated])
+def project_changes_view(request, project_id):
+    """Apply a batch of JSON-Patch style operations to a project's rows atomically.
+    
+    Paths name a resource of PROJECT_CHILD_RESOURCES and a row id:
+    ``add /bill_of_materials``, ``replace /attachments/12`` (partial update),
+    ``remove /team_members/3`` and ``replace /work_attributions/order``
+    (value is the list of row ids). Either every operation applies or none do.
+    """
+    project = _get_project_for(request, project_id)
+    operations = request.data
+    if not isinstance(operations, list):
+        raise ValidationError({'detail': 'Expected a list of operations.'})
+    
+    context = {'request': request}
+    results = []
+    with transaction.atomic():
+        for index, operation in enumerate(operations):
+            try:
+                results.append(_apply_child_operation(project, operation, context))
+            except ValidationError as exc:
+                raise ValidationError({'operations': {index: exc.detail}})
+    return Response({'results': results})
+
+
+def _apply_child_operation(project, operation, context):
+    if not isinstance(operation, dict):
+        raise ValidationError('Each operation must be an object.')
+    op = operation.get('op')
+    parts = str(operation.get('path', '')).strip('/').split('/')
+    if parts[0] not in PROJECT_CHILD_RESOURCES or len(parts) > 2:
+        raise ValidationError({'path': f'Unknown path "{operation.get("path")}".'})
+    model, serializer_class = PROJECT_CHILD_RESOURCES[parts[0]]
+    value = operation.get('value')
+    
+    if op == 'add' and (len(parts) == 1 or parts[1] == '-'):
+        serializer = serializer_class(data=value, context=context)
+        serializer.is_valid(raise_exception=True)
+        return serializer_class(_create_child(project, serializer), context=context).data
+    if op == 'replace' and len(parts) == 2 and parts[1] == 'order':
+        _reorder_children(project, model, value)
+        return None
+    if op in ('replace', 'remove') and len(parts) == 2 and parts[1].isdigit():
+        row = _child_queryset(model, project).filter(pk=parts[1]).first()
+        if row is None:
+            raise ValidationError({'path': f'No row at "{operation.get("path")}".'})
+        if op == 'remove':
+            row.delete()
+            return None
+        serializer = serializer_class(row, data=value, partial=True, context=context)
+        serializer.is_valid(raise_exception=True)
+        return serializer_class(_update_child(serializer), context=context).data
+    raise ValidationError({'op': f'Unsupported operation "{op}" on "{operation.get("path")}".'})
 
 
 # Comment Views
-class ProjectCommentListCreateView(generics.ListCreateAPIView):
-    """List comments for a project and create new comment"""
+class CommentThreadListMixin:
+    """Cursor-paginated listing of comment threads.
+
+    Each page is keyed on (created_at, id) and every comment carries at most
+    ``?replies=`` replies per level down to ``?depth=`` levels, plus a
+    ``replies_next`` link for the rest of its thread.
+    """
+    thread_ordering = ('-created_at', '-id')
+    default_thread_depth = 2
+    default_replies_per_thread = 3
+    max_replies_per_thread = 50
+    
+    def list_threads(self, request, queryset):
+        paginator = KeysetPagination(ordering=self.thread_ordering)
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        depth = _int_query_param(request, 'depth', self.default_thread_depth, settings.COMMENT_TREE_MAX_DEPTH)
+        per_thread = _int_query_param(
+            request, 'replies', self.default_replies_per_thread, self.max_replies_per_thread
+        )
+        context = self.get_serializer_context()
+        context['comment_tree'] = CommentThreadSlice(page, depth, per_thread)
+        serializer = CommentThreadSerializer(page, many=True, context=context)
+        return paginator.get_paginated_response(serializer.data)
+
+
+class ProjectCommentListCreateView(CommentThreadListMixin, generics.ListCreateAPIView):
+    """List comments for a project and create new comment.
+
+    ``?mode=cursor`` switches the listing to bounded, cursor-paginated threads.
+    """
     serializer_class = CommentSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     
     def get_queryset(self):
         project_id = self.kwargs['project_id']
         # Only return top-level comments (no parent)
-        return Comment.objects.filter(project_id=project_id, parent=None)
+        return Comment.objects.filter(project_id=project_id, parent=None).select_related('author__profile')
+    
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        # Replies for the whole page are loaded lazily with a single query
+        context['comment_tree'] = CommentTree.for_project(self.kwargs['project_id'])
+        return context
+    
+    def list(self, request, *args, **kwargs):
+        _get_visible_project(request, self.kwargs['project_id'])
+        if request.query_params.get('mode') == 'cursor':
+            return self.list_threads(request, self.get_queryset())
+        return super().list(request, *args, **kwargs)
     
     def perform_create(self, serializer):
-        project_id = self.kwargs['project_id']
-        project = get_object_or_404(Project, id=project_id)
+        project = _get_visible_project(self.request, self.kwargs['project_id'])
         comment = serializer.save(author=self.request.user, project=project)
         
         # Create message notification
         create_comment_message(comment)
 
 
-class CommentReplyCreateView(generics.CreateAPIView):
-    """Create a reply to a comment"""
+class CommentReplyCreateView(CommentThreadListMixin, generics.ListCreateAPIView):
+    """Create a reply to a comment, or page through its replies (oldest first)"""
     serializer_class = CommentReplySerializer
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    thread_ordering = ('created_at', 'id')
+    
+    def get_queryset(self):
+        return Comment.objects.filter(parent_id=self.kwargs['comment_id']).select_related('author__profile')
+    
+    def get_parent_comment(self):
+        """The comment replied to, if its project is visible to the user"""
+        comment = get_object_or_404(Comment.objects.select_related('project'), id=self.kwargs['comment_id'])
+        if not can_view_project(self.request.user, comment.project):
+            raise PermissionDenied(view_denied_message(comment.project))
+        return comment
+    
+    def list(self, request, *args, **kwargs):
+        self.get_parent_comment()
+        return self.list_threads(request, self.get_queryset())
     
     def perform_create(self, serializer):
-        comment_id = self.kwargs['comment_id']
-        parent_comment = get_object_or_404(Comment, id=comment_id)
+        parent_comment = self.get_parent_comment()
         
         # Create the reply
         reply = serializer.save(
@@ -316,17 +671,12 @@ def user_involved_projects_view(request, user_id=None):
     if user_id is None:
         user = request.user
     else:
-        from django.contrib.auth.models import User
         user = get_object_or_404(User, id=user_id)
-    from .models import Project
-    # Projects where user is author
-    authored = Project.objects.filter(author=user)
-    # Projects where user is a team member
-    team_member = Project.objects.filter(team_members__user=user)
-    # Union, remove duplicates
-    projects = (authored | team_member).distinct()
-    serializer = ProjectListSerializer(projects, many=True)
-    return Response(serializer.data)
+    # Projects the user authored or is a team member of, limited to those the
+    # requesting user may see
+    projects = Project.objects.involving(user).visible_to(request.user)
+    cards = ProjectCardRows(request)
+    return Response(cards.data(cards.values(projects)))
 
 # Message utility functions
 def create_comment_message(comment):
@@ -361,8 +711,8 @@ def create_like_message(user, project):
 def user_messages(request):
     """Get user's messages"""
     messages = Message.objects.filter(recipient=request.user)
-    serializer = MessageSerializer(messages, many=True)
-    return Response(serializer.data)
+    rows = MessageRows()
+    return Response(rows.data(rows.values(messages)))
 
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
@@ -456,9 +806,12 @@ def bookmark_toggle(request, project_id):
 @permission_classes([permissions.IsAuthenticated])
 def user_bookmarks(request):
     """Get user's bookmarked projects"""
-    bookmarks = Bookmark.objects.filter(user=request.user).select_related('project')
-    serializer = BookmarkSerializer(bookmarks, many=True)
-    return Response(serializer.data)
+    visible = Project.objects.visible_to(request.user)
+    bookmarks = Bookmark.objects.filter(
+        user=request.user, project__in=visible.values('pk')
+    )
+    rows = BookmarkRows(request)
+    return Response(rows.data(rows.values(bookmarks)))
 
 
 @api_view(['GET'])
@@ -480,13 +833,17 @@ def global_search_view(request):
     """Global search across projects and users"""
     query = request.GET.get('q', '').strip()
     search_type = request.GET.get('type', 'all')  # all, projects, users
-    limit = int(request.GET.get('limit', 20))
+    limit = _int_query_param(request, 'limit', 20, 100) or 20
+    page = _int_query_param(request, 'page', 1, 10000) or 1
+    offset = (page - 1) * limit
     
     results = {
         'projects': [],
         'users': [],
         'total_results': 0,
-        'query': query
+        'query': query,
+        'page': page,
+        'has_next': False,
     }
     
     if not query:
@@ -494,29 +851,16 @@ def global_search_view(request):
     
     if search_type in ['all', 'projects']:
         # Search projects - include published and private projects user has access to
-        user = request.user if request.user.is_authenticated else None
-        if user is None:
-            # Public visitors only see published projects
-            projects_queryset = Project.objects.filter(status='published')
-        elif user.is_staff:
-            # Staff see all projects
-            projects_queryset = Project.objects.all()
-        else:
-            # Regular users see published projects, their own projects, and private projects they're members of
-            projects_queryset = Project.objects.filter(
-                Q(status='published') | 
-                Q(author=user) |
-                Q(team_members__user=user)
-            ).distinct()
+        projects_queryset = Project.objects.visible_to(request.user)
         
-        projects = projects_queryset.filter(
-            Q(title__icontains=query) |
-            Q(description__icontains=query) |
-            Q(elevator_pitch__icontains=query) |
-            Q(author__username__icontains=query) |
-            Q(category__name__icontains=query)
-        )[:limit]
-        results['projects'] = ProjectListSerializer(projects, many=True).data
+        # Ranked full-text matches with highlighted snippets; one extra row
+        # tells whether another page exists
+        ranked = get_search_backend().rank(projects_queryset, query)
+        projects = list(ProjectListSerializer.setup_eager_loading(ranked, request)[offset:offset + limit + 1])
+        results['has_next'] = len(projects) > limit
+        results['projects'] = ProjectSearchResultSerializer(
+            projects[:limit], many=True, context={'request': request}
+        ).data
     
     if search_type in ['all', 'users']:
         # Search users
@@ -525,7 +869,7 @@ def global_search_view(request):
             Q(first_name__icontains=query) |
             Q(last_name__icontains=query) |
             Q(email__icontains=query)
-        )[:limit]
+        ).order_by('username')[offset:offset + limit]
         results['users'] = UserSerializer(users, many=True).data
     
     results['total_results'] = len(results['projects']) + len(results['users'])
@@ -538,20 +882,14 @@ def global_search_view(request):
 def upload_slideshow(request, project_id):
     """Upload a PowerPoint or PDF file and convert to images"""
     project = get_object_or_404(Project, id=project_id)
-    if project.author != request.user:
+    if not can_manage_project(request.user, project):
         return Response({'error': 'You do not have permission to edit this project'}, status=status.HTTP_403_FORBIDDEN)
     slideshow, _ = ProjectSlideshow.objects.get_or_create(project=project)
     serializer = SlideshowUploadSerializer(slideshow, data=request.data, partial=True)
     if serializer.is_valid():
         slideshow = serializer.save()
-        # Trigger conversion in background
-        try:
-            script_path = os.path.join(os.path.dirname(__file__), '..', 'convert_slides.py')
-            subprocess.Popen([
-                sys.executable, script_path, str(slideshow.id)
-            ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        except Exception as e:
-            print(f"Error triggering conversion: {e}")
+        # Converted by the background worker (manage.py run_jobs)
+        queue_conversion(slideshow)
         return Response({
             'message': 'File uploaded successfully. Conversion in progress...',
             'slideshow': ProjectSlideshowSerializer(slideshow).data
@@ -560,21 +898,44 @@ def upload_slideshow(request, project_id):
 
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
+@cache_anonymous_get(Project, ProjectSlideshow)
 def get_slideshow(request, project_id):
     """Get slideshow data for a project"""
     project = get_object_or_404(Project, id=project_id)
+    if not can_view_project(request.user, project):
+        return Response({'error': view_denied_message(project)}, status=status.HTTP_403_FORBIDDEN)
     try:
         slideshow = ProjectSlideshow.objects.get(project=project)
         return Response(ProjectSlideshowSerializer(slideshow).data)
     except ProjectSlideshow.DoesNotExist:
         return Response({'error': 'Slideshow not found'}, status=status.HTTP_404_NOT_FOUND)
 
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def slideshow_status(request, project_id):
+    """Conversion status and progress of a project's slideshow, for polling after an upload"""
+    project = get_object_or_404(Project, id=project_id)
+    if not can_view_project(request.user, project):
+        return Response({'error': view_denied_message(project)}, status=status.HTTP_403_FORBIDDEN)
+    slideshow = ProjectSlideshow.objects.filter(project=project).annotate(
+        slides_count=Count('slides', filter=Q(slides__generation=F('generation')))
+    ).values('id', 'conversion_status', 'conversion_progress', 'conversion_error', 'slides_count').first()
+    if slideshow is None:
+        return Response({'error': 'Slideshow not found'}, status=status.HTTP_404_NOT_FOUND)
+    return Response({
+        'id': slideshow['id'],
+        'status': slideshow['conversion_status'],
+        'progress': slideshow['conversion_progress'],
+        'error': slideshow['conversion_error'],
+        'slides_count': slideshow['slides_count'],
+    })
+
 @api_view(['DELETE'])
 @permission_classes([permissions.IsAuthenticated])
 def delete_slideshow(request, project_id):
     """Delete slideshow for a project"""
     project = get_object_or_404(Project, id=project_id)
-    if project.author != request.user:
+    if not can_manage_project(request.user, project):
         return Response({'error': 'You do not have permission to edit this project'}, status=status.HTTP_403_FORBIDDEN)
     try:
         slideshow = ProjectSlideshow.objects.get(project=project)
@@ -584,6 +945,75 @@ def delete_slideshow(request, project_id):
         return Response({'error': 'Slideshow not found'}, status=status.HTTP_404_NOT_FOUND)
 
 
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def start_upload_view(request):
+    """Start a chunked upload of an attachment file or slideshow PDF (see api.uploads)"""
+    serializer = UploadSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    project = get_object_or_404(Project, pk=serializer.validated_data['project_id'])
+    if not can_manage_project(request.user, project):
+        return Response({'error': 'You do not have permission to edit this project'}, status=status.HTTP_403_FORBIDDEN)
+    attachment_id = serializer.validated_data.get('attachment_id')
+    if attachment_id and not Attachment.objects.filter(pk=attachment_id, project=project).exists():
+        raise ValidationError({'attachment_id': 'No such attachment on this project.'})
+    upload = serializer.save(user=request.user, chunk_size=settings.UPLOAD_CHUNK_SIZE)
+    return Response(UploadSerializer(upload).data, status=status.HTTP_201_CREATED)
+
+
+def _get_upload(request, upload_id):
+    return get_object_or_404(Upload, pk=upload_id, user=request.user)
+
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([permissions.IsAuthenticated])
+def upload_detail_view(request, upload_id):
+    """State of an upload, with the chunks received so far (to resume it), or cancel it"""
+    upload = _get_upload(request, upload_id)
+    if request.method == 'DELETE':
+        upload.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    return Response(UploadSerializer(upload).data)
+
+
+@api_view(['PUT'])
+@permission_classes([permissions.IsAuthenticated])
+def upload_chunk_view(request, upload_id, index):
+    """Store one chunk, sent as the raw request body with its SHA-256 in X-Chunk-SHA256"""
+    upload = _get_upload(request, upload_id)
+    # Checked on every chunk: the user may have been removed from the team since the upload started
+    if not can_manage_project(request.user, upload.project):
+        return Response({'error': 'You do not have permission to edit this project'}, status=status.HTTP_403_FORBIDDEN)
+    try:
+        content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        content_length = 0
+    # Read straight from the request stream; request.data would buffer the body
+    write_chunk(upload, index, request.stream, content_length, request.headers.get('X-Chunk-SHA256'))
+    return Response({'index': index, 'received': upload.chunks.count(), 'chunk_count': upload.chunk_count})
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def complete_upload_view(request, upload_id):
+    """Assemble a fully received upload and store it on its attachment or slideshow"""
+    upload = _get_upload(request, upload_id)
+    if not can_manage_project(request.user, upload.project):
+        return Response({'error': 'You do not have permission to edit this project'}, status=status.HTTP_403_FORBIDDEN)
+    missing = missing_chunks(upload) if upload.status == 'uploading' else []
+    if missing:
+        # Listed so the client can send them and try again
+        return Response({'error': 'Some chunks have not been received.', 'missing': missing},
+                        status=status.HTTP_400_BAD_REQUEST)
+    target = complete_upload(upload)
+    data = {'upload': UploadSerializer(upload).data}
+    if upload.target == 'attachment':
+        data['attachment'] = AttachmentSerializer(target).data
+    else:
+        data['slideshow'] = ProjectSlideshowSerializer(target).data
+    return Response(data)
+
+
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def search_components_view(request):
@@ -594,30 +1024,20 @@ def search_components_view(request):
     if not query:
         return Response([], status=status.HTTP_200_OK)
     
-    # Build the queryset
-    queryset = BillOfMaterialItem.objects.filter(name__icontains=query)
-    
-    # Filter by item type if specified
-    if item_type:
-        queryset = queryset.filter(item_type=item_type)
-    
-    # Get unique components (group by name and item_type to avoid duplicates)
-    from django.db.models import Max
-    components = queryset.values('name', 'item_type', 'description', 'link').annotate(
-        latest_id=Max('id')
-    ).order_by('name')[:20]  # Limit to 20 results
-    
-    # Format the response
-    results = []
-    for component in components:
-        results.append({
-            'id': component['latest_id'],
-            'name': component['name'],
-            'item_type': component['item_type'],
-            'description': component['description'],
-            'link': component['link']
-        })
-    
+    results, _ = suggest_components(query, item_type)
     return Response(results, status=status.HTTP_200_OK)
 
 
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def popular_components_view(request):
+    """Most used components across all bills of materials"""
+    item_type = request.GET.get('type', '').strip()
+    limit = _int_query_param(request, 'limit', 20, 100) or 20
+    
+    components = CatalogComponent.objects.filter(usage_count__gt=0)
+    if item_type:
+        components = components.filter(item_type=item_type)
+    components = components.order_by('-usage_count', 'name')[:limit]
+    
+    return Response(CatalogComponentSerializer(components, many=True).data, status=status.HTTP_200_OK)
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark list serialization: ModelSerializer + DRF's stdlib JSONRenderer
+against the .values() row builders in api/rows.py + FastJSONRenderer.
+
+Project cards, messages and bookmarks are timed at list sizes 20, 100 and
+1000 on a throwaway test database (the configured database name with a
+test_ prefix), so existing data is never touched:
+
+    python benchmark_serialization.py --repeat 20
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import django
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'buildhub_backend.settings')
+django.setup()
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import setup_test_environment
+from rest_framework.renderers import JSONRenderer
+
+from api import renderers
+from api.models import Bookmark, Category, Message, Project, UserProfile
+from api.rows import BookmarkRows, MessageRows, ProjectCardRows
+from api.serializers import BookmarkSerializer, MessageSerializer, ProjectListSerializer
+
+SIZES = (20, 100, 1000)
+
+
+def seed(count):
+    """``count`` projects, plus as many messages and bookmarks for one reader"""
+    users = User.objects.bulk_create(
+        [User(username=f'bench_user_{i}', password='!') for i in range(50)]
+    )
+    UserProfile.objects.bulk_create(
+        [UserProfile(user=user, bio='Maker', skills=['Arduino', 'CAD'], location='Lab') for user in users]
+    )
+    category = Category.objects.create(name='Benchmark')
+    projects = Project.objects.bulk_create(
+        [
+            Project(
+                title=f'Project {i}', description='A benchmark project. ' * 20,
+                elevator_pitch='Short pitch for the card. ' * 5, story_content='<p>Story</p>' * 200,
+                author=users[i % len(users)], category=category, difficulty='Beginner', status='published',
+            )
+            for i in range(count)
+        ],
+        batch_size=1000,
+    )
+    reader = users[0]
+    Message.objects.bulk_create(
+        [
+            Message(recipient=reader, sender=users[i % len(users)], message_type='comment',
+                    title=f'New comment {i}', content='Someone commented on your project.')
+            for i in range(count)
+        ],
+        batch_size=1000,
+    )
+    Bookmark.objects.bulk_create([Bookmark(user=reader, project=project) for project in projects], batch_size=1000)
+    return reader
+
+
+def timed(func, repeat):
+    func()  # warm up caches
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    stdlib_json = JSONRenderer()
+    fast_json = renderers.FastJSONRenderer()
+    print(f'FastJSONRenderer uses {"orjson" if renderers.orjson else "the stdlib (orjson not installed)"}')
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        reader = seed(max(SIZES))
+        endpoints = [
+            (
+                'projects',
+                lambda size: ProjectListSerializer.setup_eager_loading(Project.objects.order_by('-created_at', '-id'))[:size],
+                lambda queryset: ProjectListSerializer(queryset, many=True).data,
+                lambda size: Project.objects.order_by('-created_at', '-id')[:size],
+                ProjectCardRows(),
+            ),
+            (
+                'messages',
+                lambda size: Message.objects.filter(recipient=reader)[:size],
+                lambda queryset: MessageSerializer(queryset, many=True).data,
+                lambda size: Message.objects.filter(recipient=reader)[:size],
+                MessageRows(),
+            ),
+            (
+                'bookmarks',
+                lambda size: Bookmark.objects.filter(user=reader).select_related('user__profile').prefetch_related(
+                    'project__author__profile', 'project__category'
+                )[:size],
+                lambda queryset: BookmarkSerializer(queryset, many=True).data,
+                lambda size: Bookmark.objects.filter(user=reader)[:size],
+                BookmarkRows(),
+            ),
+        ]
+
+        print(f'\n{"list":<10} {"size":>5} {"serializer+json":>16} {"rows+fast json":>15} {"speedup":>8}')
+        for name, serializer_queryset, serialize, rows_queryset, rows in endpoints:
+            for size in SIZES:
+                # Clone the queryset on every run so nothing is served from its result cache
+                slow = timed(lambda: stdlib_json.render(serialize(serializer_queryset(size))), args.repeat)
+                fast = timed(lambda: fast_json.render(rows.data(rows.values(rows_queryset(size)))), args.repeat)
+                print(f'{name:<10} {size:>5} {slow:>13.2f} ms {fast:>12.2f} ms {slow / fast:>7.1f}x')
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark slideshow page rendering: the old single-process loop (PyMuPDF
+PNG bytes decoded and re-encoded with PIL) against api.pdf_render with 1, 2,
+4, ... worker processes.
+
+A synthetic deck of text, vector shapes and a photo-like image per page is
+generated in a temp directory, so no database or uploaded file is needed:
+
+    python benchmark_slides.py --pages 200 --workers 1 2 4 8
+"""
+
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import fitz  # PyMuPDF for PDF processing
+from PIL import Image
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+from api.pdf_render import ZOOM, render_pages
+
+
+def make_deck(path, pages):
+    """A 16:9 deck with a title, bullet text, shapes and a gradient image on every page"""
+    gradient = Image.linear_gradient('L').resize((640, 360)).convert('RGB')
+    buffer = io.BytesIO()
+    gradient.save(buffer, 'JPEG', quality=85)
+    picture = buffer.getvalue()
+
+    doc = fitz.open()
+    for number in range(pages):
+        page = doc.new_page(width=960, height=540)
+        page.insert_text((40, 60), f'Slide {number + 1}: build log', fontsize=32)
+        for line in range(8):
+            page.insert_text((40, 120 + line * 28), f'- Step {line + 1}: solder, flash and test the board ' * 2, fontsize=14)
+        for shape in range(20):
+            page.draw_circle((520 + shape * 18, 420), 14 + shape % 5, color=(0.1, 0.3, 0.8), fill=(0.9, 0.5, 0.1))
+        page.insert_image(fitz.Rect(600, 60, 920, 240), stream=picture)
+    doc.save(path)
+    doc.close()
+
+
+def render_with_pil(pdf_path, output_dir):
+    """The conversion loop before api.pdf_render"""
+    images = []
+    with fitz.open(pdf_path) as doc:
+        for page_num in range(len(doc)):
+            pix = doc.load_page(page_num).get_pixmap(matrix=fitz.Matrix(ZOOM, ZOOM))
+            img = Image.open(io.BytesIO(pix.tobytes('png')))
+            img_path = os.path.join(output_dir, f'slide_{page_num + 1}.png')
+            img.save(img_path, 'PNG')
+            images.append(img_path)
+    return images
+
+
+def timed(func, pdf_path):
+    with tempfile.TemporaryDirectory() as output_dir:
+        started = time.perf_counter()
+        func(pdf_path, output_dir)
+        return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=200)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    print(f'{os.cpu_count()} CPUs, {args.pages} pages at {ZOOM}x zoom')
+    with tempfile.TemporaryDirectory() as temp_dir:
+        pdf_path = os.path.join(temp_dir, 'deck.pdf')
+        make_deck(pdf_path, args.pages)
+
+        baseline = timed(render_with_pil, pdf_path)
+        print(f'\n{"renderer":<22} {"seconds":>8} {"pages/s":>8} {"speedup":>8}')
+        print(f'{"PIL round-trip":<22} {baseline:>8.2f} {args.pages / baseline:>8.1f} {1:>7.1f}x')
+        for workers in args.workers:
+            elapsed = timed(lambda pdf, out: render_pages(pdf, out, workers=workers), pdf_path)
+            label = f'direct, {workers} worker{"s" if workers > 1 else ""}'
+            print(f'{label:<22} {elapsed:>8.2f} {args.pages / elapsed:>8.1f} {baseline / elapsed:>7.1f}x')
+
+
+if __name__ == '__main__':
+    main()
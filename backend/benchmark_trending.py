@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Benchmark the trending feed: the old per-request Count() annotation against
+the precomputed trending_score column.
+
+Runs against a throwaway test database (the configured database name with a
+test_ prefix), so existing data is never touched:
+
+    python benchmark_trending.py --projects 100000
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+
+import django
+
+# Add the project root to the Python path
+project_root = Path(__file__).parent
+sys.path.insert(0, str(project_root))
+
+# Setup Django
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'buildhub_backend.settings')
+django.setup()
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import Count, Q
+from django.test.utils import setup_test_environment
+from django.utils import timezone
+
+from api.models import Bookmark, Category, Comment, Project
+from api.trending import refresh_trending_scores
+
+PAGE_SIZE = 20
+
+
+def seed(project_count, active_ratio, seed_value):
+    """Create users, projects and recent comments/bookmarks with bulk inserts"""
+    rng = random.Random(seed_value)
+    users = User.objects.bulk_create(
+        [User(username=f'bench_user_{i}', password='!') for i in range(200)]
+    )
+    category = Category.objects.create(name='Benchmark')
+    Project.objects.bulk_create(
+        [
+            Project(
+                title=f'Project {i}', description='Benchmark project', author=rng.choice(users),
+                category=category, difficulty='Beginner', status='published',
+            )
+            for i in range(project_count)
+        ],
+        batch_size=5000,
+    )
+    project_ids = list(Project.objects.values_list('id', flat=True))
+    active = rng.sample(project_ids, int(len(project_ids) * active_ratio))
+
+    comments, bookmarks = [], []
+    for project_id in active:
+        author = rng.choice(users)
+        comments.extend(
+            Comment(project_id=project_id, author=author, body='Nice build')
+            for _ in range(rng.randint(1, 8))
+        )
+        bookmarks.extend(
+            Bookmark(project_id=project_id, user=user) for user in rng.sample(users, rng.randint(0, 4))
+        )
+    Comment.objects.bulk_create(comments, batch_size=5000)
+    Bookmark.objects.bulk_create(bookmarks, batch_size=5000)
+    if connection.vendor == 'postgresql':
+        # Fresh planner statistics, as autovacuum would have on a live database
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+    return len(comments), len(bookmarks)
+
+
+def timed(label, func, repeat):
+    func()  # warm up caches
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    elapsed = (time.perf_counter() - started) / repeat * 1000
+    print(f'  {label:<44} {elapsed:9.2f} ms')
+    return elapsed
+
+
+def legacy_trending_page(page):
+    """The query ProjectListCreateView used to run for sort=trending"""
+    week_ago = timezone.now() - timedelta(days=7)
+    queryset = Project.objects.filter(status='published').annotate(
+        recent_comments=Count('comments', filter=Q(comments__created_at__gte=week_ago))
+    ).order_by('-recent_comments', '-created_at')
+    queryset.count()  # PageNumberPagination counts every page
+    return list(queryset[(page - 1) * PAGE_SIZE:page * PAGE_SIZE])
+
+
+def trending_page(after=None):
+    queryset = Project.objects.filter(status='published').order_by('-trending_score', '-id')
+    if after is not None:
+        queryset = queryset.filter(
+            Q(trending_score__lt=after.trending_score) | Q(trending_score=after.trending_score, id__lt=after.id)
+        )
+    return list(queryset[:PAGE_SIZE])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--projects', type=int, default=100000)
+    parser.add_argument('--active', type=float, default=0.1, help='share of projects with recent activity')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        started = time.perf_counter()
+        comments, bookmarks = seed(args.projects, args.active, args.seed)
+        print(f'Seeded {args.projects} projects, {comments} comments, {bookmarks} bookmarks '
+              f'in {time.perf_counter() - started:.1f}s on {connection.vendor}')
+
+        started = time.perf_counter()
+        scored = refresh_trending_scores()
+        print(f'refresh_trending scored {scored} projects in {(time.perf_counter() - started) * 1000:.0f} ms\n')
+
+        deep_page = max(1, args.projects // PAGE_SIZE // 2)
+        after = Project.objects.filter(status='published').order_by('-trending_score', '-id')[
+            (deep_page - 1) * PAGE_SIZE - 1
+        ] if deep_page > 1 else None
+
+        print('First page:')
+        timed('annotate Count() + COUNT(*) + OFFSET', lambda: legacy_trending_page(1), args.repeat)
+        timed('trending_score index scan', lambda: trending_page(), args.repeat)
+        print(f'Page {deep_page}:')
+        timed('annotate Count() + COUNT(*) + OFFSET', lambda: legacy_trending_page(deep_page), args.repeat)
+        timed('trending_score keyset', lambda: trending_page(after), args.repeat)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
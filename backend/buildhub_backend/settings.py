@@ -5,9 +5,11 @@ Generated by 'django-admin startproject' using Django 4.2.7.
 """
 
 from pathlib import Path
+from corsheaders.defaults import default_headers
 from decouple import config
 from datetime import timedelta
 import os
+import sys
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -38,6 +40,7 @@ INSTALLED_APPS = [
     'rest_framework',
     'rest_framework_simplejwt',
     'corsheaders',
+    'django.contrib.postgres',
     'api',
 ]
 
@@ -140,10 +143,12 @@ MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 # File upload settings
-# Maximum size, in bytes, of a request (50MB)
+# Maximum size, in bytes, of a request body other than file uploads (50MB)
 DATA_UPLOAD_MAX_MEMORY_SIZE = 52428800  # 50MB
-# Maximum size in bytes of request data (50MB)
-FILE_UPLOAD_MAX_MEMORY_SIZE = 52428800  # 50MB
+# Uploaded files larger than this are streamed to a temporary file instead
+# of being held in memory (2.5MB, Django's default). Large files should use
+# the chunked upload API (api.uploads).
+FILE_UPLOAD_MAX_MEMORY_SIZE = config('FILE_UPLOAD_MAX_MEMORY_SIZE', default=2621440, cast=int)
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
@@ -160,8 +165,105 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
+    # orjson-backed JSON when installed, DRF's stdlib JSON otherwise
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
+# Cache shared by the project access cache and the anonymous response cache.
+# CACHE_BACKEND is redis (CACHE_LOCATION URL, needs the redis package; the
+# default unless DEBUG is on), locmem (per process; the default with DEBUG),
+# file (CACHE_LOCATION directory, shared by processes on one host) or dummy
+# (no caching). The test suite always runs against locmem, which stands in
+# for Redis without a server.
+CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'buildhub'),
+    'file': ('django.core.cache.backends.filebased.FileBasedCache', os.path.join(BASE_DIR, 'cache')),
+    'redis': ('django.core.cache.backends.redis.RedisCache', 'redis://127.0.0.1:6379/1'),
+    'dummy': ('django.core.cache.backends.dummy.DummyCache', ''),
+}
+TESTING = sys.argv[1:2] == ['test']
+CACHE_BACKEND, CACHE_DEFAULT_LOCATION = CACHE_BACKENDS[
+    'locmem' if TESTING else config('CACHE_BACKEND', default='locmem' if DEBUG else 'redis')
+]
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': config('CACHE_LOCATION', default=CACHE_DEFAULT_LOCATION),
+        'KEY_PREFIX': 'buildhub',
+    }
+}
+
+# Seconds anonymous GET responses stay cached (api.caching)
+ANONYMOUS_CACHE_TIMEOUT = config('ANONYMOUS_CACHE_TIMEOUT', default=60, cast=int)
+
+# Maximum nesting depth rendered for comment reply trees. Replies below this
+# depth are omitted from the payload but still counted in reply_count.
+COMMENT_TREE_MAX_DEPTH = config('COMMENT_TREE_MAX_DEPTH', default=20, cast=int)
+
+# Text search configuration used for project tsvectors on PostgreSQL
+SEARCH_TEXT_CONFIG = config('SEARCH_TEXT_CONFIG', default='english')
+
+# Typeahead: per-keystroke statement timeout (PostgreSQL) and the in-process
+# cache used for prefixes of up to AUTOCOMPLETE_CACHE_MAX_PREFIX characters
+AUTOCOMPLETE_BUDGET_MS = config('AUTOCOMPLETE_BUDGET_MS', default=150, cast=int)
+AUTOCOMPLETE_CACHE_MAX_PREFIX = config('AUTOCOMPLETE_CACHE_MAX_PREFIX', default=3, cast=int)
+AUTOCOMPLETE_CACHE_ENTRIES = config('AUTOCOMPLETE_CACHE_ENTRIES', default=1024, cast=int)
+AUTOCOMPLETE_CACHE_TTL = config('AUTOCOMPLETE_CACHE_TTL', default=60, cast=int)
+
+# Trending: activity weight halves every TRENDING_HALF_LIFE_HOURS; activity
+# older than TRENDING_HORIZON_DAYS is ignored by the refresh_trending command
+TRENDING_HALF_LIFE_HOURS = config('TRENDING_HALF_LIFE_HOURS', default=48, cast=float)
+TRENDING_HORIZON_DAYS = config('TRENDING_HORIZON_DAYS', default=14, cast=int)
+
+# Seconds a user's accessible/manageable project ids stay cached (api.permissions).
+# 0 turns the cache off, the default for a per-process cache: a membership
+# change could only be dropped from the worker process that made it
+PROJECT_ACCESS_CACHE_TTL = config(
+    'PROJECT_ACCESS_CACHE_TTL', default=0 if CACHE_BACKEND.endswith('LocMemCache') else 300, cast=int,
+)
+
+# Rebuild stored project detail documents in the job worker (manage.py
+# run_jobs) after each change (api.documents); when off they are rebuilt
+# inline once the change commits
+PROJECT_DOCUMENTS_ASYNC = config('PROJECT_DOCUMENTS_ASYNC', default=True, cast=bool)
+
+# Background jobs (api.jobs), run by `manage.py run_jobs`: jobs run at once per
+# worker process, attempts before a job fails, seconds before the first retry
+# (doubling after each attempt), seconds after which a running job's worker is
+# presumed dead, and seconds between polls of an empty queue
+JOB_WORKER_CONCURRENCY = config('JOB_WORKER_CONCURRENCY', default=2, cast=int)
+JOB_MAX_ATTEMPTS = config('JOB_MAX_ATTEMPTS', default=3, cast=int)
+JOB_RETRY_BACKOFF = config('JOB_RETRY_BACKOFF', default=30, cast=int)
+JOB_LOCK_TIMEOUT = config('JOB_LOCK_TIMEOUT', default=1800, cast=int)
+JOB_POLL_INTERVAL = config('JOB_POLL_INTERVAL', default=2, cast=float)
+
+# Processes rendering the pages of one slideshow PDF (api.pdf_render); decks
+# of under 8 pages are always rendered in the job worker itself
+SLIDE_RENDER_WORKERS = config('SLIDE_RENDER_WORKERS', default=min(os.cpu_count() or 1, 4), cast=int)
+
+# Seconds a content-addressed file (api.blobs) must have been unreferenced
+# before `manage.py gc_blobs` deletes it
+BLOB_GC_GRACE = config('BLOB_GC_GRACE', default=3600, cast=int)
+
+# Chunked uploads (api.uploads): chunks are kept in UPLOAD_CHUNK_DIR until the
+# upload completes, or until it has been idle for UPLOAD_EXPIRY seconds and
+# `manage.py clean_uploads` removes it. UPLOAD_MAX_SIZE caps attachments;
+# slideshow PDFs are capped at SLIDESHOW_MAX_SIZE however they are uploaded,
+# as every page of them is rendered
+UPLOAD_CHUNK_DIR = config('UPLOAD_CHUNK_DIR', default=os.path.join(BASE_DIR, 'upload_chunks'))
+UPLOAD_CHUNK_SIZE = config('UPLOAD_CHUNK_SIZE', default=5 * 1024 * 1024, cast=int)
+UPLOAD_MAX_SIZE = config('UPLOAD_MAX_SIZE', default=2 * 1024 * 1024 * 1024, cast=int)
+SLIDESHOW_MAX_SIZE = config('SLIDESHOW_MAX_SIZE', default=20 * 1024 * 1024, cast=int)
+UPLOAD_EXPIRY = config('UPLOAD_EXPIRY', default=86400, cast=int)
+
 # JWT settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
@@ -182,6 +284,9 @@ CORS_ALLOWED_ORIGINS = [
 
 CORS_ALLOW_CREDENTIALS = True
 
+# Chunk checksums of the chunked upload API
+CORS_ALLOW_HEADERS = (*default_headers, 'x-chunk-sha256')
+
 # Security settings for production
 if not DEBUG:
     SECURE_BROWSER_XSS_FILTER = True
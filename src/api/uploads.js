@@ -0,0 +1,82 @@
+import api from './config';
+
+// Chunked, resumable uploads (backend: api/uploads.py). The file is sent in
+// the chunk size the server picks, each chunk with its SHA-256, so nothing
+// large is ever buffered on the server and a dropped connection only costs
+// the chunk in flight. The upload id is remembered per file, so picking the
+// same file again after a failure (or a reload) sends only the missing chunks.
+
+const CHUNK_RETRIES = 3;
+
+const storageKey = ({ projectId, target, attachmentId, file }) =>
+  `upload:${projectId}:${target}:${attachmentId || ''}:${file.name}:${file.size}:${file.lastModified}`;
+
+const sha256Hex = async (blob) => {
+  const digest = await crypto.subtle.digest('SHA-256', await blob.arrayBuffer());
+  return Array.from(new Uint8Array(digest), (byte) => byte.toString(16).padStart(2, '0')).join('');
+};
+
+const resumableUpload = async (key) => {
+  const uploadId = localStorage.getItem(key);
+  if (!uploadId) return null;
+  try {
+    const response = await api.get(`/uploads/${uploadId}/`);
+    if (response.data.status === 'uploading') return response.data;
+  } catch (error) {
+    // Expired or removed; start over
+  }
+  localStorage.removeItem(key);
+  return null;
+};
+
+const putChunk = async (upload, file, index) => {
+  const chunk = file.slice(index * upload.chunk_size, (index + 1) * upload.chunk_size);
+  const checksum = await sha256Hex(chunk);
+  for (let attempt = 1; ; attempt += 1) {
+    try {
+      return await api.put(`/uploads/${upload.id}/chunks/${index}/`, chunk, {
+        headers: { 'Content-Type': 'application/octet-stream', 'X-Chunk-SHA256': checksum },
+      });
+    } catch (error) {
+      const status = error.response?.status;
+      // Network errors, server errors and a chunk that arrived corrupted (400) are retried
+      const retryable = !status || status >= 500 || status === 400;
+      if (!retryable || attempt >= CHUNK_RETRIES) throw error;
+      await new Promise((resolve) => setTimeout(resolve, 1000 * 2 ** (attempt - 1)));
+    }
+  }
+};
+
+// Upload `file` to an attachment (target 'attachment' with attachmentId) or
+// to the project's slideshow (target 'slideshow'). onProgress receives a
+// fraction between 0 and 1. Resolves with the completion response: the
+// upload plus the updated attachment or slideshow.
+export const uploadInChunks = async ({ projectId, target, attachmentId, file, onProgress }) => {
+  const key = storageKey({ projectId, target, attachmentId, file });
+  let upload = await resumableUpload(key);
+  if (!upload) {
+    const response = await api.post('/uploads/', {
+      project_id: projectId,
+      target,
+      attachment_id: attachmentId || null,
+      filename: file.name,
+      size: file.size,
+    });
+    upload = response.data;
+    localStorage.setItem(key, upload.id);
+  }
+
+  const received = new Set(upload.received);
+  const report = () => onProgress && onProgress(received.size / upload.chunk_count);
+  report();
+  for (let index = 0; index < upload.chunk_count; index += 1) {
+    if (received.has(index)) continue;
+    await putChunk(upload, file, index);
+    received.add(index);
+    report();
+  }
+
+  const response = await api.post(`/uploads/${upload.id}/complete/`);
+  localStorage.removeItem(key);
+  return response.data;
+};
@@ -63,7 +63,7 @@ const CommentItem = ({ comment, projectId, onCommentAdded, depth = 0 }) => {
           <div className="flex-shrink-0">
             <Link to={`/users/${comment.author.username}`}>
               <img
-                src={comment.author.profile?.avatar || `/default-avatar.svg`}
+                src={comment.author.profile?.avatar_variants?.small || comment.author.profile?.avatar || `/default-avatar.svg`}
                 alt={comment.author.username}
                 className="w-10 h-10 rounded-full"
               />
@@ -58,7 +58,7 @@ const Navigation = () => {
   // Get avatar from user.profile if available
   let avatarUrl = null;
   if (user && user.profile && user.profile.avatar) {
-    avatarUrl = getFullAvatarUrl(user.profile.avatar);
+    avatarUrl = getFullAvatarUrl(user.profile.avatar_variants?.small || user.profile.avatar);
   }
 
   return (
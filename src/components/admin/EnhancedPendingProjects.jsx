@@ -511,7 +511,7 @@ const EnhancedPendingProjects = ({ setPendingCount }) => {
     setLoading(true);
     try {
       const [projectsRes, categoriesRes] = await Promise.all([
-        api.get('/projects/?status=pending'),
+        api.get('/projects/?status=pending&expand=description,elevator_pitch,story_content'),
         api.get('/categories/')
       ]);
       const projects = projectsRes.data.results || projectsRes.data;
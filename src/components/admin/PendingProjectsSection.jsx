@@ -240,7 +240,7 @@ const PendingProjectsSection = () => {
     setLoading(true);
     setError(null);
     try {
-      const response = await api.get('/projects/?status=pending');
+      const response = await api.get('/projects/?status=pending&expand=description,elevator_pitch,story_content');
       const projects = response.data.results || response.data;
       setPendingProjects(projects);
       // If a project is selected, update it with the latest data
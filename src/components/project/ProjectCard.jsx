@@ -175,7 +175,8 @@ const ProjectCard = ({ project }) => {
   <div className="bg-white rounded-lg shadow-lg overflow-hidden transform hover:-translate-y-2 transition-all duration-300 cursor-pointer group hover:shadow-2xl relative">
     <div className="relative overflow-hidden">
       <img
-        src={getFullCoverImageUrl(project.cover_image) || 'https://placehold.co/600x400/6366f1/ffffff?text=Project'}
+        src={getFullCoverImageUrl(project.cover_image_variants?.card || project.cover_image) || 'https://placehold.co/600x400/6366f1/ffffff?text=Project'}
+        loading="lazy"
         alt={project.title}
         className="w-full h-48 object-cover group-hover:scale-110 transition-transform duration-300"
         onError={e => { 
@@ -235,11 +236,11 @@ const ProjectCard = ({ project }) => {
       </p>
       <div className="flex items-center justify-between mb-4">
         <div className="flex items-center text-gray-500 text-sm">
-          {project.author?.profile?.avatar ? (
+          {project.author?.avatar ? (
             <Link to={`/users/${project.author.username}`}>
               <img
                 className="w-8 h-8 rounded-full mr-2 ring-2 ring-gray-200 object-cover bg-white"
-                src={getFullAvatarUrl(project.author.profile.avatar)}
+                src={getFullAvatarUrl(project.author.avatar_variants?.small || project.author.avatar)}
                 alt={project.author?.username}
                 onError={e => { e.target.onerror = null; e.target.src = '/default-avatar.svg'; }}
               />
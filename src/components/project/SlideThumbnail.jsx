@@ -0,0 +1,42 @@
+import React from 'react';
+
+// One entry of a slideshow's thumbnail rail. Slides covered by the deck's
+// thumbnail strip are cut out of that single sprite image; others fall back
+// to their own thumbnail, or the full image for decks converted before
+// thumbnails existed.
+const SlideThumbnail = ({ slide, index, strip, width = 96, className = '' }) => {
+  const alt = `Slide ${slide.slide_number}`;
+
+  if (strip && index < strip.count) {
+    const scale = width / strip.tile_width;
+    const spriteWidth = Math.min(strip.count, strip.columns) * strip.tile_width * scale;
+    const x = (index % strip.columns) * strip.tile_width * scale;
+    const y = Math.floor(index / strip.columns) * strip.tile_height * scale;
+    return (
+      <div
+        role="img"
+        aria-label={alt}
+        className={`rounded ${className}`}
+        style={{
+          width,
+          height: strip.tile_height * scale,
+          backgroundImage: `url(${strip.url})`,
+          backgroundSize: `${spriteWidth}px auto`,
+          backgroundPosition: `-${x}px -${y}px`,
+        }}
+      />
+    );
+  }
+
+  return (
+    <img
+      src={slide.thumbnail || slide.image}
+      alt={alt}
+      loading="lazy"
+      style={{ width }}
+      className={`h-auto rounded ${className}`}
+    />
+  );
+};
+
+export default SlideThumbnail;
@@ -2,6 +2,7 @@ import React, { useEffect, useRef, useState } from 'react';
 import { BookOpenIcon, PresentationChartBarIcon } from '@heroicons/react/24/outline';
 import { useTranslation } from '../../hooks/useTranslation';
 import api from '../../api/config';
+import { uploadInChunks } from '../../api/uploads';
 import { EditorContent, useEditor } from '@tiptap/react';
 import StarterKit from '@tiptap/starter-kit';
 import { Image } from '@tiptap/extension-image';
@@ -15,6 +16,7 @@ import { Gapcursor } from '@tiptap/extension-gapcursor';
 import { Color } from '@tiptap/extension-color';
 import { TextStyle } from '@tiptap/extension-text-style';
 import { useLocation } from 'react-router-dom';
+import SlideThumbnail from './SlideThumbnail';
 
 /** Enhanced Toolbar component for Tiptap editor */
 const TiptapToolbar = ({ editor }) => {
@@ -479,23 +481,12 @@ const StoryTab = ({ formData, updateFormData, errors, projectId }) => {
       return;
     }
 
-    if (file.size > 20 * 1024 * 1024) { // 20MB
-      setSlideshowError('File size must be less than 20MB.');
-      return;
-    }
-
     setUploadingSlideshow(true);
     setSlideshowError(null);
 
     try {
-      const formData = new FormData();
-      formData.append('original_file', file);
-      formData.append('title', 'Project Slideshow');
-      formData.append('description', 'Project presentation slides');
-
-      await api.post(`/projects/${projectId}/slideshow/`, formData, {
-        headers: { 'Content-Type': 'multipart/form-data' },
-      });
+      // Sent in chunks, so large decks upload reliably and can resume
+      await uploadInChunks({ projectId, target: 'slideshow', file });
 
       setSlideshowLoading(true);
       startPollingForConversion();
@@ -508,8 +499,9 @@ const StoryTab = ({ formData, updateFormData, errors, projectId }) => {
 
   const startPollingForConversion = () => {
     let attempts = 0;
-    const maxAttempts = 30; // 30 attempts = 60 seconds max
+    const maxAttempts = 90; // 90 attempts = 3 minutes max (conversions wait in a queue)
     const pollInterval = 2000; // 2 seconds between attempts
+    let shownSlides = 0;
     
     const poll = async () => {
       if (attempts >= maxAttempts) {
@@ -519,10 +511,28 @@ const StoryTab = ({ formData, updateFormData, errors, projectId }) => {
       }
       
       try {
+        const statusRes = await api.get(`/projects/${projectId}/slideshow/status/`);
+        if (statusRes.data.status === 'failed') {
+          setSlideshowError(statusRes.data.error || t('slideshowUploadError'));
+          setSlideshowLoading(false);
+          return;
+        }
+        if (statusRes.data.status !== 'ready') {
+          // A first conversion publishes slides page by page; show them as they arrive
+          if (statusRes.data.slides_count > shownSlides) {
+            const res = await api.get(`/projects/${projectId}/slideshow/get/`);
+            if (res.data && res.data.slides && res.data.slides.length > 0) {
+              setSlideshow(res.data);
+              shownSlides = res.data.slides.length;
+            }
+          }
+          // Still queued or processing, continue polling
+          attempts++;
+          setTimeout(poll, pollInterval);
+          return;
+        }
         const res = await api.get(`/projects/${projectId}/slideshow/get/`);
-        console.log('Polling response:', res.data);
         if (res.data && res.data.slides && res.data.slides.length > 0) {
-          console.log('Conversion completed!', res.data.slides.length, 'slides');
           setSlideshow(res.data);
           setCurrentSlide(0);
           setSlideshowError(null);
@@ -776,7 +786,7 @@ const StoryTab = ({ formData, updateFormData, errors, projectId }) => {
             <h3 className="text-lg font-semibold text-gray-900">{t('projectSlideshow')}</h3>
           </div>
           
-          {slideshowLoading || conversionSuccess ? (
+          {(slideshowLoading && !(slideshow && slideshow.slides && slideshow.slides.length > 0)) || conversionSuccess ? (
             <SlideshowProcessingAnimation 
               message={t('slideshowProcessing')} 
               isSuccess={conversionSuccess}
@@ -786,7 +796,9 @@ const StoryTab = ({ formData, updateFormData, errors, projectId }) => {
               {/* Slideshow Display */}
               <div className="relative mb-4">
                 <img
-                  src={slideshow.slides[currentSlide].image}
+                  src={slideshow.slides[currentSlide].preview || slideshow.slides[currentSlide].image}
+                  srcSet={slideshow.slides[currentSlide].srcset || undefined}
+                  sizes="(min-width: 1024px) 896px, 100vw"
                   alt={`Slide ${currentSlide + 1}`}
                   className="w-full h-auto rounded-lg shadow-md"
                 />
@@ -818,22 +830,27 @@ const StoryTab = ({ formData, updateFormData, errors, projectId }) => {
                 </div>
               </div>
               
-              {/* Slide Indicators */}
-              <div className="flex justify-center space-x-2 mb-4">
-                {slideshow.slides.map((_, index) => (
+              {/* Thumbnail Rail */}
+              <div className="flex space-x-2 overflow-x-auto pb-2 mb-4">
+                {slideshow.slides.map((slide, index) => (
                   <button
-                    key={index}
+                    key={slide.id}
                     onClick={() => goToSlide(index)}
-                    className={`w-3 h-3 rounded-full transition-all ${
-                      index === currentSlide ? 'bg-indigo-600' : 'bg-gray-300 hover:bg-gray-400'
+                    className={`flex-shrink-0 rounded border-2 transition-all ${
+                      index === currentSlide ? 'border-indigo-600' : 'border-transparent hover:border-gray-300'
                     }`}
-                  />
+                  >
+                    <SlideThumbnail slide={slide} index={index} strip={slideshow.thumbnail_strip} />
+                  </button>
                 ))}
               </div>
               
               {/* Slide Counter */}
               <div className="text-center text-sm text-gray-600 mb-4">
                 {t('currentSlide', { current: currentSlide + 1, total: slideshow.slides.length })}
+                {slideshowLoading && (
+                  <div className="text-xs text-indigo-600 mt-1">{t('slideshowProcessing')}</div>
+                )}
               </div>
               
               {/* Remove Button */}
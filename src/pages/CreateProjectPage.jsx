@@ -3,6 +3,7 @@ import { useNavigate, useLocation } from 'react-router-dom';
 import { useAuth } from '../contexts/AuthContext';
 import { useTranslation } from '../hooks/useTranslation';
 import api from '../api/config';
+import { uploadInChunks } from '../api/uploads';
 import BasicsTab from '../components/project/BasicsTab';
 import TeamTab from '../components/project/TeamTab';
 import ThingsTab from '../components/project/ThingsTab';
@@ -304,9 +305,6 @@ const CreateProjectPage = () => {
           formDataToSend.append(`attachments_data[${idx}].description`, a.description);
         if (a.repository_link)
           formDataToSend.append(`attachments_data[${idx}].repository_link`, a.repository_link);
-        if (a.file_upload && a.file_upload instanceof File) {
-          formDataToSend.append(`attachments_data[${idx}].file_upload`, a.file_upload);
-        }
       });
 
       const endpoint = editId ? `/projects/${editId}/` : '/projects/';
@@ -318,6 +316,21 @@ const CreateProjectPage = () => {
         },
       });
 
+      // Attachment files go through the chunked upload API once their rows
+      // exist. The save leaves exactly the submitted rows, positioned in the
+      // order they were sent, so each file goes to the row at its own index
+      // (two attachments may share a type and title)
+      if (safeAttachments.some((a) => a.file_upload instanceof File)) {
+        const projectId = response.data.id;
+        const { data: rows } = await api.get(`/projects/${projectId}/attachments/`);
+        for (const [idx, a] of safeAttachments.entries()) {
+          const row = rows[idx];
+          if (a.file_upload instanceof File && row) {
+            await uploadInChunks({ projectId, target: 'attachment', attachmentId: row.id, file: a.file_upload });
+          }
+        }
+      }
+
       const wasNew = !editId;
       if (wasNew) {
         // After creating new project, switch to edit mode to prevent duplicates
@@ -5,6 +5,7 @@ import { useTranslation } from '../hooks/useTranslation';
 import api from '../api/config';
 import CommentForm from '../components/CommentForm';
 import CommentList from '../components/CommentList';
+import SlideThumbnail from '../components/project/SlideThumbnail';
 
 import { 
   PencilSquareIcon, 
@@ -443,7 +444,7 @@ const ProjectDetailPage = () => {
         {project.cover_image && (
           <div className="mb-12">
             <img
-              src={getFullCoverImageUrl(project.cover_image)}
+              src={getFullCoverImageUrl(project.cover_image_variants?.detail || project.cover_image)}
               alt="Cover"
               className="w-full h-80 object-cover rounded-xl shadow-lg"
             />
@@ -487,7 +488,9 @@ const ProjectDetailPage = () => {
                   {/* Main Slide */}
                   <div className="relative mb-4">
                     <img
-                      src={slideshow.slides[currentSlide].image}
+                      src={slideshow.slides[currentSlide].preview || slideshow.slides[currentSlide].image}
+                      srcSet={slideshow.slides[currentSlide].srcset || undefined}
+                      sizes="(min-width: 1024px) 768px, 100vw"
                       alt={`Slide ${slideshow.slides[currentSlide].slide_number}`}
                       className="w-full rounded-lg shadow-lg max-h-96 object-contain bg-white"
                     />
@@ -521,22 +524,18 @@ const ProjectDetailPage = () => {
                   
                   {/* Thumbnails */}
                   {slideshow.slides.length > 1 && (
-                    <div className="flex justify-center gap-2 mb-4">
+                    <div className="flex justify-center gap-2 mb-4 overflow-x-auto">
                       {slideshow.slides.map((slide, idx) => (
                         <button
                           key={slide.id}
                           onClick={() => goToSlide(idx)}
-                          className={`w-16 h-10 object-cover rounded border-2 transition-all ${
+                          className={`flex-shrink-0 rounded border-2 transition-all ${
                             idx === currentSlide 
                               ? 'border-purple-600 opacity-100' 
                               : 'border-gray-300 opacity-60 hover:opacity-80'
                           }`}
                         >
-                          <img
-                            src={slide.image}
-                            alt={`Slide ${slide.slide_number}`}
-                            className="w-full h-full object-cover rounded"
-                          />
+                          <SlideThumbnail slide={slide} index={idx} strip={slideshow.thumbnail_strip} width={60} />
                         </button>
                       ))}
                     </div>
@@ -600,8 +599,9 @@ const ProjectDetailPage = () => {
                             {item.image && (
                               <div className="mb-3">
                                 <img
-                                  src={item.image}
+                                  src={item.image_variants?.card || item.image}
                                   alt={item.name}
+                                  loading="lazy"
                                   className="w-full h-32 object-cover rounded-md"
                                   onError={(e) => {
                                     e.target.style.display = 'none';
@@ -886,22 +886,18 @@ const ProjectDetailPage = () => {
 
             {/* Thumbnails */}
             {slideshow.slides.length > 1 && (
-              <div className="absolute bottom-20 left-1/2 -translate-x-1/2 flex gap-2">
+              <div className="absolute bottom-20 left-1/2 -translate-x-1/2 flex gap-2 max-w-full overflow-x-auto">
                 {slideshow.slides.map((slide, idx) => (
                   <button
                     key={slide.id}
                     onClick={() => goToSlide(idx)}
-                    className={`w-12 h-8 object-cover rounded border-2 transition-all ${
+                    className={`flex-shrink-0 rounded border-2 transition-all ${
                       idx === currentSlide 
                         ? 'border-white opacity-100' 
                         : 'border-gray-400 opacity-60 hover:opacity-80'
                     }`}
                   >
-                    <img
-                      src={slide.image}
-                      alt={`Slide ${slide.slide_number}`}
-                      className="w-full h-full object-cover rounded"
-                    />
+                    <SlideThumbnail slide={slide} index={idx} strip={slideshow.thumbnail_strip} width={44} />
                   </button>
                 ))}
               </div>